@@ -0,0 +1,462 @@
+"""
+Society Generator benchmark suite.
+
+Times Person.run per agent, Population.run (scalar and vectorized paths), population construction from the PDCL table, and GA.run generations.
+Simulation cases run a steady-state workload (see steady_population): a population built with DEFAULT_SCHEMA dies out within a few time periods, which would time mostly empty ticks.
+Every case runs in a fresh process, so each result's peak RSS is its own.
+
+usage: python bench.py run --output bench.json
+       python bench.py compare baseline.json bench.json --threshold 0.1
+"""
+
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter, time
+import numpy as np
+from sim_config.person import Person
+from sim_config.population import Population
+from sim_config.optimization.GA import GA
+# module imports
+
+
+SIZES = (1000, 10000, 100000, 1000000)
+QUICK_SIZES = (1000, 10000)
+SCALAR_MAX = 10000
+# the scalar path is only timed up to this many agents
+
+GA_SHAPES = ((50, 8), (50, 96), (500, 96), (5000, 96))
+# (candidates, genes) of the timed GA generations
+
+STEADY_SCHEMA = [[0.5, 0.0]] * 4
+# [consumption, production] of every resource in the steady-state workload (people live off their stock instead of working)
+
+STEADY_STOCK = 50.0
+# starting amount of every resource held by each person in the steady-state workload (100 time periods of consumption)
+
+STEADY_AGE = 1 / 40
+# scales the PDCL ages (0 to 40) down to 0 to 1, where the age-based death chance stays below 1% per time period
+
+
+# ========
+# WORKLOAD
+# ========
+
+
+def steady_population(size, vectorized=True):
+    """
+    Builds a population that keeps most of its people alive over the timed time periods.
+    Young people with a resource stock and no work to do mostly die of infection and old age (under 0.5% per time period), so every tick processes about 'size' people.
+
+    :param size: population size
+    :param vectorized: run time periods through the tick kernel
+    :type size: int
+    :type vectorized: bool
+    :return: steady-state population
+    :rtype: Population
+    """
+
+    population = Population(size, schema=STEADY_SCHEMA, vectorized=vectorized, seed=0)
+    state = population.state
+    rows = len(state)
+
+    state.age[:rows] *= STEADY_AGE
+
+    for name in ("food", "water", "shelter", "clothing"):
+        getattr(state, name)[:rows] = STEADY_STOCK
+
+    state.totals.update(state.recompute_totals())
+    # running aggregates follow the edited columns
+
+    return population
+
+
+# =====
+# CASES
+# =====
+# Each case returns its elapsed seconds and work counters for 1 repetition
+# =====
+
+
+def bench_person_run(size, ticks):
+    """
+    Times per-agent Person.run calls over the living rows of a population.
+
+    :param size: population size
+    :param ticks: number of time periods
+    :type size: int
+    :type ticks: int
+    :return: elapsed seconds and work counters
+    :rtype: dict
+    """
+
+    population = steady_population(size, vectorized=False)
+    state = population.state
+    people = [Person.view(state, row) for row in range(len(state))]
+    schema = np.asarray(STEADY_SCHEMA, dtype=np.float64).tolist()
+    agent_ticks = 0
+
+    start = perf_counter()
+
+    for _ in range(ticks):
+        for row in np.flatnonzero(state.is_alive).tolist():
+            people[row].run(schema)
+            agent_ticks += 1
+
+    return {"seconds": perf_counter() - start, "ticks": ticks, "agent_ticks": agent_ticks}
+
+
+def bench_population_run(size, ticks, vectorized):
+    """
+    Times Population.run.
+
+    :param size: population size
+    :param ticks: number of time periods
+    :param vectorized: time the tick kernel instead of per-person Person.run calls
+    :type size: int
+    :type ticks: int
+    :type vectorized: bool
+    :return: elapsed seconds and work counters
+    :rtype: dict
+    """
+
+    population = steady_population(size, vectorized)
+    agent_ticks = 0
+    seconds = 0.0
+
+    for _ in range(ticks):
+        start = perf_counter()
+        population.run()
+        seconds += perf_counter() - start
+
+        agent_ticks += len(population.alive_rows) + population.deaths
+        # people processed this time period (the survivors plus those who died during it)
+
+    return {"seconds": seconds, "ticks": ticks, "agent_ticks": agent_ticks}
+
+
+def bench_construction(size):
+    """
+    Times population construction from the PDCL table.
+
+    :param size: population size
+    :type size: int
+    :return: elapsed seconds and work counters
+    :rtype: dict
+    """
+
+    start = perf_counter()
+    population = Population(size, seed=0)
+    seconds = perf_counter() - start
+
+    return {"seconds": seconds, "agents": len(population.state)}
+
+
+def bench_ga_run(candidates, genes, generations):
+    """
+    Times GA.run generations on random genomes and fitness values.
+
+    :param candidates: number of candidates per generation
+    :param genes: number of genes per candidate
+    :param generations: number of generations
+    :type candidates: int
+    :type genes: int
+    :type generations: int
+    :return: elapsed seconds and work counters
+    :rtype: dict
+    """
+
+    rng = np.random.default_rng(0)
+    ga = GA(seed=0)
+    genomes = rng.uniform(0, 2, (candidates, genes))
+    fitness = [rng.random(candidates) for _ in range(generations)]
+    # fitness values are drawn up front so only the GA is timed
+
+    start = perf_counter()
+
+    for generation in range(generations):
+        genomes = ga.run(genomes, fitness[generation])
+
+    return {"seconds": perf_counter() - start, "generations": generations}
+
+
+CASES = {
+    "person_run": bench_person_run,
+    "population_run": bench_population_run,
+    "construction": bench_construction,
+    "ga_run": bench_ga_run
+}
+
+THROUGHPUT = {
+    "person_run": "agent_ticks_per_second",
+    "population_run": "agent_ticks_per_second",
+    "construction": "agents_per_second",
+    "ga_run": "generations_per_second"
+}
+# rate of each case compared against baselines (higher is better)
+
+
+# =========
+# MEASURING
+# =========
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process.
+
+    :return: peak RSS in megabytes
+    :rtype: float
+    """
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+
+
+def measure(name, params, repeat):
+    """
+    Runs a case several times and keeps its fastest repetition.
+
+    :param name: case name (see CASES)
+    :param params: case keyword arguments
+    :param repeat: number of repetitions
+    :type name: str
+    :type params: dict
+    :type repeat: int
+    :return: benchmark result
+    :rtype: dict
+    """
+
+    runs = [CASES[name](**params) for _ in range(repeat)]
+    best = min(runs, key=lambda run: run["seconds"])
+    seconds = best["seconds"]
+
+    result = {"name": name, "params": params, "repeat": repeat}
+    result.update(best)
+
+    for counter in ("ticks", "agent_ticks", "agents", "generations"):
+        if counter in best:
+            result[counter + "_per_second"] = best[counter] / seconds if seconds else 0.0
+
+    result["throughput"] = result[THROUGHPUT[name]]
+
+    if name == "person_run":
+        result["seconds_per_agent"] = seconds / best["agent_ticks"] if best["agent_ticks"] else 0.0
+
+    result["peak_rss_mb"] = peak_rss()
+
+    return result
+
+
+def plan(sizes, ticks, scalar_max, ga_shapes, generations):
+    """
+    Lists the cases of a suite run.
+
+    :param sizes: population sizes
+    :param ticks: time periods per population run
+    :param scalar_max: largest population size timed on the scalar path
+    :param ga_shapes: (candidates, genes) of the GA cases
+    :param generations: generations per GA case
+    :type sizes: list of int
+    :type ticks: int
+    :type scalar_max: int
+    :type ga_shapes: list of tuple
+    :type generations: int
+    :return: (case name, case keyword arguments) pairs
+    :rtype: list of tuple
+    """
+
+    cases = []
+
+    for size in sizes:
+        cases.append(("construction", {"size": size}))
+
+        if size <= scalar_max:
+            cases.append(("person_run", {"size": size, "ticks": ticks}))
+            cases.append(("population_run", {"size": size, "ticks": ticks, "vectorized": False}))
+
+        cases.append(("population_run", {"size": size, "ticks": ticks, "vectorized": True}))
+
+    for candidates, genes in ga_shapes:
+        cases.append(("ga_run", {"candidates": candidates, "genes": genes, "generations": generations}))
+
+    return cases
+
+
+def run_suite(cases, repeat, isolate=True):
+    """
+    Runs benchmark cases.
+
+    :param cases: (case name, case keyword arguments) pairs
+    :param repeat: repetitions per case
+    :param isolate: run every case in a fresh process (otherwise peak RSS is the suite's running peak)
+    :type cases: list of tuple
+    :type repeat: int
+    :type isolate: bool
+    :return: benchmark results
+    :rtype: list of dict
+    """
+
+    results = []
+
+    for name, params in cases:
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                result = executor.submit(measure, name, params, repeat).result()
+        else:
+            result = measure(name, params, repeat)
+
+        print("{:<16} {:<60} {:>14.1f}/s {:>9.1f} MB".format(name, json.dumps(params), result["throughput"], result["peak_rss_mb"]), file=sys.stderr)
+        results.append(result)
+
+    return results
+
+
+# ==========
+# COMPARISON
+# ==========
+
+
+def case_key(result):
+    """
+    Identifies a benchmark case across result files.
+
+    :param result: benchmark result
+    :type result: dict
+    :return: case name and parameters
+    :rtype: str
+    """
+
+    return result["name"] + " " + json.dumps(result["params"], sort_keys=True)
+
+
+def compare(baseline, current, threshold):
+    """
+    Flags cases that got slower, or used more memory, than a baseline by more than a relative threshold.
+
+    :param baseline: baseline results
+    :param current: current results
+    :param threshold: tolerated relative change (e.g. 0.1 for 10%)
+    :type baseline: list of dict
+    :type current: list of dict
+    :type threshold: float
+    :return: (case key, baseline throughput, current throughput, throughput change, RSS change, regression flag) rows
+    :rtype: list of tuple
+    """
+
+    reference = {case_key(result): result for result in baseline}
+    rows = []
+
+    for result in current:
+        key = case_key(result)
+
+        if key not in reference:
+            continue
+            # cases missing from the baseline cannot regress
+
+        old = reference[key]
+        speed = result["throughput"] / old["throughput"] - 1 if old["throughput"] else 0.0
+        memory = result["peak_rss_mb"] / old["peak_rss_mb"] - 1 if old["peak_rss_mb"] else 0.0
+
+        rows.append((key, old["throughput"], result["throughput"], speed, memory, speed < -threshold or memory > threshold))
+
+    return rows
+
+
+# ===
+# CLI
+# ===
+
+
+def parse_args(argv):
+    """
+    Parses command line arguments.
+
+    :param argv: command line arguments (without the program name)
+    :type argv: list of str
+    :return: parsed arguments
+    :rtype: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(description="Society Generator benchmark suite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmark suite")
+    run.add_argument("--sizes", type=lambda text: [int(size) for size in text.split(",")], help="comma-separated population sizes (default 1000,10000,100000,1000000)")
+    run.add_argument("--quick", action="store_true", help="only time 1k and 10k agent populations and the smaller GA shapes")
+    run.add_argument("--ticks", type=int, default=10, help="time periods per population run")
+    run.add_argument("--generations", type=int, default=20, help="generations per GA case")
+    run.add_argument("--repeat", type=int, default=3, help="repetitions per case (the fastest is kept)")
+    run.add_argument("--scalar-max", type=int, default=SCALAR_MAX, help="largest population size timed on the scalar path")
+    run.add_argument("--in-process", action="store_true", help="run every case in this process (peak RSS is then cumulative)")
+    run.add_argument("--output", help="path of the JSON results (printed to stdout if not given)")
+
+    diff = commands.add_parser("compare", help="compare results against a baseline")
+    diff.add_argument("baseline", help="baseline JSON results")
+    diff.add_argument("current", help="current JSON results")
+    diff.add_argument("--threshold", type=float, default=0.1, help="tolerated relative slowdown or memory growth")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Entry point to benchmark execution.
+
+    :param argv: command line arguments (defaults to sys.argv)
+    :type argv: list of str
+    :return: process exit status (1 if compare finds a regression)
+    :rtype: int
+    """
+
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+
+        with open(args.current) as file:
+            current = json.load(file)["results"]
+
+        rows = compare(baseline, current, args.threshold)
+
+        for key, old, new, speed, memory, regressed in rows:
+            print("{:<8} {:<90} {:>14.1f} -> {:>14.1f}/s {:>+7.1%} speed {:>+7.1%} RSS".format("REGRESS" if regressed else "ok", key, old, new, speed, memory))
+
+        return 1 if any(row[-1] for row in rows) else 0
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    ga_shapes = GA_SHAPES[:2] if args.quick else GA_SHAPES
+
+    results = run_suite(plan(sizes, args.ticks, args.scalar_max, ga_shapes, args.generations), args.repeat, not args.in_process)
+
+    report = {
+        "meta": {
+            "timestamp": time(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpus": multiprocessing.cpu_count()
+        },
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
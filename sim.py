@@ -1,38 +1,238 @@
 """
 Society Generator simulation.
 
+Runs headless by default; --paced restores the original delay between time periods, and --interactive asks for the run time.
+
+usage: python sim.py --ticks 1000 --size 10000 --seed 0 --runs 10 --output result.json
+
 :author: Max Milazzo
 """
 
 
-import sim_config
-from time import sleep
+import argparse
+import json
+import math
+import os
+import sys
+from time import sleep, perf_counter
+from sim_config.society import Society
+from sim_config.population import Population
+from sim_config.optimization.islands import IslandModel
+from sim_config.metrics import MetricsWriter, collect
+from sim_config.profiler import PROFILER
+from sim_config.storage import CHUNK_SIZE, PREFETCH
 
 
-def run_handle(sim_society):
+def run_handle(sim_society, delay=0, metrics=None, profile=None):
     """
+    Moves the society forward 1 unit in time.
+
+    :param sim_society: society being simulated
+    :param delay: seconds to wait after the time period (paced mode)
+    :param metrics: writer that receives the time period's statistics
+    :param profile: writer that receives the time period's per-phase profile (see profiler.Profiler.collect)
+    :type sim_society: Society
+    :type delay: float
+    :type metrics: MetricsWriter
+    :type profile: MetricsWriter
     """
-    
+
     sim_society.run()
-    sleep(0.1)
-    
-    # statistics can be printed here
+
+    if metrics is not None:
+        metrics.append(collect(sim_society.population))
+        # per-tick statistics are streamed to disk by the writer thread
+
+    if profile is not None:
+        profile.append(PROFILER.collect(sim_society.population.state.tick))
+
+    if delay:
+        sleep(delay)
+
     # GUI code could be placed here if user wants a display
 
 
-def main():
+def finite(value):
+    """
+    Converts a score to a JSON-safe value.
+
+    :param value: score (population.EXTINCT_SCORE, i.e. -inf, for an extinct population)
+    :type value: float
+    :return: score, or None if it is missing or not finite
+    :rtype: float
+    """
+
+    if value is None or not math.isfinite(value):
+        return None
+
+    return float(value)
+
+
+def parse_args(argv):
+    """
+    Parses command line arguments.
+
+    :param argv: command line arguments (without the program name)
+    :type argv: list of str
+    :return: parsed arguments
+    :rtype: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(description="Society Generator simulation.")
+    parser.add_argument("--ticks", type=int, help="number of time periods to simulate (required unless --interactive)")
+    parser.add_argument("--size", type=int, default=1000, help="population size")
+    parser.add_argument("--seed", type=int, default=0, help="base seed for optimization and simulation")
+    parser.add_argument("--runs", type=int, default=0, help="number of GA generations run before simulating (0 skips optimization)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes used for GA candidate evaluation (0 uses every core)")
+    parser.add_argument("--islands", type=int, default=0, help="run the GA as this many islands in separate processes, migrating every 5 generations on a ring (0 runs a single GA)")
+    parser.add_argument("--output", help="path of the JSON run summary")
+    parser.add_argument("--metrics", help="directory that receives the per-tick metrics stream (chunked .npy files)")
+    parser.add_argument("--archive", help="path of the append-only archive of dead people's final records")
+    parser.add_argument("--storage", help="directory of memory-mapped person columns, for populations larger than memory (ticks run in chunks)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="people per chunk of an out-of-core population")
+    parser.add_argument("--prefetch", type=int, default=PREFETCH, help="chunks read ahead of the one being processed")
+    parser.add_argument("--checkpoint", help="directory holding the GA and population checkpoints; a run is resumed from them if they exist")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="generations (GA) and time periods (simulation) between checkpoints")
+    parser.add_argument("--profile", action="store_true", help="time every simulation phase; the totals are added to the run summary, and a per-tick breakdown is streamed to the 'profile' subdirectory of --metrics")
+    parser.add_argument("--paced", action="store_true", help="wait 0.1 s after every time period (GUI-friendly mode)")
+    parser.add_argument("--interactive", action="store_true", help="ask for the simulation run time")
+
+    args = parser.parse_args(argv)
+
+    if args.ticks is None and not args.interactive:
+        parser.error("--ticks is required unless --interactive is given")
+
+    if args.islands and args.runs > 0 and args.checkpoint:
+        parser.error("--checkpoint cannot be used with --islands (island GA state is not checkpointed)")
+
+    return args
+
+
+def main(argv=None):
     """
     Entry point to simulation execution.
+
+    :param argv: command line arguments (defaults to sys.argv)
+    :type argv: list of str
+    :return: process exit status
+    :rtype: int
     """
-    
-    sim_society = Society()
-    sim_society.optimize(runs=1000)
-    
-    count = input("Enter desired simulation run time > ")
-    
-    for _ in range(count):
-        run_handle(sim_society)
+
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    islands = IslandModel(islands=args.islands, seed=args.seed) if args.islands else None
+    sim_society = Society(size=args.size, workers=args.workers or None, seed=args.seed, archive=args.archive, islands=islands, storage=args.storage, chunk_size=args.chunk_size, prefetch=args.prefetch)
+
+    ga_checkpoint = population_checkpoint = None
+
+    if args.checkpoint:
+        os.makedirs(args.checkpoint, exist_ok=True)
+        ga_checkpoint = os.path.join(args.checkpoint, "ga.ckpt")
+        population_checkpoint = os.path.join(args.checkpoint, "population.ckpt")
+
+    if args.runs > 0:
+        sim_society.optimize(runs=args.runs, checkpoint=ga_checkpoint, checkpoint_every=args.checkpoint_every)
+
+    done = 0
+
+    if population_checkpoint is not None and os.path.exists(population_checkpoint):
+        if sim_society.population is not None:
+            sim_society.population.close()
+
+        sim_society.population = Population.restore(population_checkpoint)
+        done = sim_society.population.state.tick
+        # resumes the simulation where the latest checkpoint left it
+
+    count = args.ticks
+
+    if count is None:
+        count = int(input("Enter desired simulation run time > "))
+
+    delay = 0.1 if args.paced else 0
+    metrics = MetricsWriter(args.metrics) if args.metrics else None
+    profile = None
+
+    if args.profile:
+        PROFILER.enable()
+        PROFILER.reset()
+        # only the simulation is profiled, not the optimization
+
+        if args.metrics:
+            profile = MetricsWriter(os.path.join(args.metrics, "profile"), dtype=PROFILER.dtype())
+
+    sim_society.populate()
+    # the summary reads the population even if no time period is run
+
+    agent_ticks = 0
+    start = perf_counter()
+
+    try:
+        for tick in range(done, count):
+            run_handle(sim_society, delay, metrics, profile)
+            agent_ticks += len(sim_society.population.alive_rows) + sim_society.population.deaths
+            # people processed this time period (the survivors plus those who died during it)
+
+            if population_checkpoint is not None and ((tick + 1) % args.checkpoint_every == 0 or tick + 1 == count):
+                sim_society.population.checkpoint(population_checkpoint)
+
+    except Exception as error:
+        print("Simulation Error:", error, file=sys.stderr)
+        return 1
+
+    finally:
+        if metrics is not None:
+            metrics.close()
+
+        if profile is not None:
+            profile.close()
+
+        PROFILER.disable()
+
+        if sim_society.population is not None:
+            sim_society.population.close()
+
+    elapsed = perf_counter() - start
+    dropped = sum(writer.dropped for writer in (metrics, profile) if writer is not None)
+    # records the writer threads could not keep up with (see MetricsWriter.append)
+
+    if dropped:
+        print("Warning: {} metrics records were dropped because writing to disk fell behind the simulation".format(dropped), file=sys.stderr)
+
+    ran = max(count - done, 0)
+    # time periods run by this invocation ('ticks' is the total, including those restored from a checkpoint)
+    aggregates = sim_society.population.state.totals
+    # the summary is read from the running aggregates, which stay in memory after an out-of-core population is closed
+
+    summary = {
+        "ticks": count,
+        "ran": ran,
+        "size": args.size,
+        "seed": args.seed,
+        "runs": args.runs,
+        "genome": sim_society.genome,
+        "fitness": finite(sim_society.fitness),
+        "alive": int(round(aggregates["alive"].sum())),
+        "satisfaction": finite(sim_society.population.scores().sum()),
+        "seconds": elapsed,
+        "ticks_per_second": ran / elapsed if elapsed else 0.0,
+        "agent_ticks_per_second": agent_ticks / elapsed if elapsed else 0.0,
+        "dropped": dropped
+    }
+
+    if args.profile:
+        summary["profile"] = PROFILER.summary()
+
+    print("{ran} of {ticks} ticks in {seconds:.3f} s: {ticks_per_second:.1f} ticks/s, {agent_ticks_per_second:.0f} agent-ticks/s".format(**summary))
+
+    for label, totals in summary.get("profile", {}).items():
+        print("  {:<32} {:>10.4f} s {:>10} calls".format(label, totals["seconds"], totals["calls"]))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=2, allow_nan=False)
+
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,3 +1,3 @@
 # adds config files to module
 
-__all__ = ["person", "population", "society"]
\ No newline at end of file
+__all__ = ["person", "population", "society", "state", "kernel", "rng", "metrics", "profiler", "contact", "actions", "ledger", "archive", "checkpoint", "storage"]
\ No newline at end of file
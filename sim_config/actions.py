@@ -0,0 +1,343 @@
+"""
+Batched person action scheduler.
+Every living person may take 1 additional action per time period (see the Population._a_* functions).
+Actions are chosen for everyone at once, partners are found through a neighbourhood index, conflicts are resolved by fixed rules, and all effects are applied from the same start-of-phase snapshot, so results never depend on the order people are processed in.
+Each action is one vectorized _a_* function applying its effects to everyone who chose it.
+"""
+
+
+import numpy as np
+from .ledger import RESOURCES, pool_account
+# module imports
+
+
+ACTIONS = ("kill", "steal_per", "donate_per", "sex", "steal_pop", "donate_pop")
+# in priority order: when several actions target the same person, the first one listed wins
+
+PARTNER_ACTIONS = ("kill", "steal_per", "donate_per", "sex")
+# actions that need a partner (pool actions act on the community resources)
+
+STEAL_SHARE = 0.5
+# share of a victim's (or community pool's) resource taken by a robbery
+
+DONATE_SHARE = 0.5
+# share of a giver's resource handed over by a donation
+
+THEFT_DISSATISFACTION = 1
+# satisfaction lost by a robbery victim
+
+DONATION_SATISFACTION = 1
+# satisfaction gained by a giver
+
+SEX_SATISFACTION = 5
+KILL_DISSATISFACTION = 5
+
+FEATURES = ("age", "satisfaction", "rested", "infection", "work_ability", "consumption_ratio", "food", "water", "shelter", "clothing")
+# state columns a decision policy sees, in feature matrix order
+
+
+def features(state, rows):
+    """
+    Builds the decision feature matrix of a set of people.
+
+    :param state: population state
+    :param rows: state rows
+    :type state: PopulationState
+    :type rows: numpy.ndarray
+    :return: one row of FEATURES per person
+    :rtype: numpy.ndarray
+    """
+
+    return np.stack([getattr(state, name)[rows].astype(np.float64) for name in FEATURES], axis=1)
+
+
+# ================
+# ACTION FUNCTIONS
+# ================
+# conventionally these functions begin with "_a_"
+# each function applies its action for the people who chose it ('chosen', indices into the phase's rows), reading only the start-of-phase snapshot 'snap' (see ActionScheduler.step)
+# resource transfers are recorded in the ledger and settled after the phase
+# ================
+
+
+def _a_kill(state, snap, chosen, ledger):
+    # killers' satisfaction changes uniformly in [-2, 1); victims die once every other effect has been applied
+    rows = snap["rows"][chosen]
+    victims = snap["partners"][chosen]
+
+    np.add.at(state.satisfaction, rows, -2 + 3 * state.uniform("kill", rows))
+    np.add.at(state.satisfaction, victims, -KILL_DISSATISFACTION)
+
+    return victims
+
+
+def _a_sex(state, snap, chosen, ledger):
+    # infection progresses (or starts) in the partner of an infected person; returns the parent pairs of the births
+    rows = snap["rows"][chosen]
+    partners = snap["partners"][chosen]
+
+    np.add.at(state.satisfaction, rows, SEX_SATISFACTION)
+    np.add.at(state.satisfaction, partners, SEX_SATISFACTION)
+    np.add.at(state.infection, partners, snap["infected"][chosen])
+    np.add.at(state.infection, rows, snap["partner_infected"][chosen])
+
+    fertile = state.sex[rows] != state.sex[partners]
+
+    return np.stack((rows[fertile], partners[fertile]), axis=1)
+
+
+def _a_steal_per(state, snap, chosen, ledger):
+    # robbers take a share of one of their victim's resources
+    items = snap["items"][chosen]
+    victims = snap["partners"][chosen]
+
+    ledger.record(victims, snap["rows"][chosen], items, STEAL_SHARE * snap["partner_holdings"][items, chosen])
+    np.add.at(state.satisfaction, victims, -THEFT_DISSATISFACTION)
+
+
+def _a_donate_per(state, snap, chosen, ledger):
+    # givers hand a share of one of their resources to their partner
+    items = snap["items"][chosen]
+    givers = snap["rows"][chosen]
+
+    ledger.record(givers, snap["partners"][chosen], items, DONATE_SHARE * snap["holdings"][items, chosen])
+    np.add.at(state.satisfaction, givers, DONATION_SATISFACTION)
+
+
+def _a_steal_pop(state, snap, chosen, ledger):
+    # robbers of the same community pool split its stolen share evenly
+    items = snap["items"][chosen]
+    slot = snap["batches"][chosen] * len(RESOURCES) + items
+    robbers = np.bincount(slot, minlength=state.batches * len(RESOURCES))
+
+    ledger.record(pool_account(snap["batches"][chosen]), snap["rows"][chosen], items, STEAL_SHARE * snap["pools"][slot] / robbers[slot])
+
+
+def _a_donate_pop(state, snap, chosen, ledger):
+    # givers hand a share of one of their resources to their community pool
+    items = snap["items"][chosen]
+    givers = snap["rows"][chosen]
+
+    ledger.record(givers, pool_account(snap["batches"][chosen]), items, DONATE_SHARE * snap["holdings"][items, chosen])
+    np.add.at(state.satisfaction, givers, DONATION_SATISFACTION)
+
+
+class ActionScheduler:
+
+    def __init__(self, chances, contacts=None, policy=None):
+        """
+        ActionScheduler constructor.
+
+        :param chances: action name -> chance per time period that a person takes the action (see ACTIONS)
+        :param contacts: contact graph whose contacts are the partner candidates (None pairs people at random within each population copy)
+        :param policy: decision tree choosing actions from each person's FEATURES, with one output per action plus a last "no action" output (replaces the chances)
+        :type chances: dict
+        :type contacts: ContactGraph
+        :type policy: DT
+        """
+
+        unknown = set(chances) - set(ACTIONS)
+
+        if unknown:
+            raise ValueError("unknown actions: {}".format(", ".join(sorted(unknown))))
+
+        self.chances = np.array([chances.get(name, 0.0) for name in ACTIONS], dtype=np.float64)
+
+        if (self.chances < 0).any() or self.chances.sum() > 1:
+            raise ValueError("action chances must be non-negative and sum to at most 1")
+
+        self.contacts = contacts
+        self.policy = policy
+
+
+# ================
+# ACTION SELECTION
+# ================
+
+
+    def choose(self, state, rows):
+        """
+        Picks the action of every person (-1 for no action), from the policy if there is one and at random otherwise.
+
+        :param state: population state
+        :param rows: rows of the living people
+        :type state: PopulationState
+        :type rows: numpy.ndarray
+        :return: index into ACTIONS of each person's action
+        :rtype: numpy.ndarray
+        """
+
+        if self.policy is not None:
+            actions = self.policy.decide(features(state, rows))
+            return np.where(actions < len(ACTIONS), actions, -1)
+
+        bounds = np.cumsum(self.chances)
+        actions = np.searchsorted(bounds, state.uniform("action", rows), side="right")
+
+        return np.where(actions < len(ACTIONS), actions, -1)
+
+
+    def partners(self, state, rows):
+        """
+        Finds a partner candidate for every person through the neighbourhood index.
+        With a contact graph, the partner is a random contact; otherwise people are shuffled within their population copy and each is paired with the next person in the shuffled ring.
+
+        :param state: population state
+        :param rows: rows of the living people
+        :type state: PopulationState
+        :type rows: numpy.ndarray
+        :return: partner row of each person (-1 if none)
+        :rtype: numpy.ndarray
+        """
+
+        draws = state.uniform("partner", rows)
+
+        if self.contacts is not None:
+            partners = np.full(len(rows), -1, dtype=np.int64)
+            covered = rows < self.contacts.size
+
+            for indptr, indices, _ in self.contacts.layers.values():
+                if indptr[-1] == 0:
+                    continue
+
+                start = indptr[rows[covered]]
+                degree = indptr[rows[covered] + 1] - start
+                has = (degree > 0) & (partners[covered] == -1)
+                # the first layer with a contact supplies the partner
+
+                picked = indices[np.minimum(start + (draws[covered] * degree).astype(np.int64), indptr[-1] - 1)]
+                partners[np.flatnonzero(covered)[has]] = picked[has]
+
+            return partners
+
+        batch = state.batch[rows]
+        order = np.lexsort((draws, batch))
+        # shuffled ring of each population copy
+
+        sorted_batch = batch[order]
+        following = np.roll(order, -1)
+        block_end = np.r_[sorted_batch[1:] != sorted_batch[:-1], True]
+        block_start = np.flatnonzero(np.r_[True, sorted_batch[1:] != sorted_batch[:-1]])
+        following[block_end] = order[np.repeat(block_start, np.diff(np.r_[block_start, len(order)]))][block_end]
+        # the last person of a copy's ring is paired with the first
+
+        partners = np.empty(len(rows), dtype=np.int64)
+        partners[order] = rows[following]
+        partners[partners == rows] = -1
+        # a person alone in their copy has no partner
+
+        return partners
+
+
+# ===================
+# CONFLICT RESOLUTION
+# ===================
+
+
+    @staticmethod
+    def resolve(state, rows, actions, partners):
+        """
+        Drops partner actions that cannot take place.
+        A partner must be someone else, alive at the start of the phase and in the same population copy.
+        Each person can be the target of 1 action per time period; the highest-priority action wins, then the lowest actor agent id.
+
+        :param state: population state
+        :param rows: rows of the living people
+        :param actions: chosen action of each person
+        :param partners: partner candidate of each person
+        :type state: PopulationState
+        :type rows: numpy.ndarray
+        :type actions: numpy.ndarray
+        :type partners: numpy.ndarray
+        :return: actions with failed partner actions set to -1
+        :rtype: numpy.ndarray
+        """
+
+        resolved = actions.copy()
+        targeted = np.isin(actions, [ACTIONS.index(name) for name in PARTNER_ACTIONS])
+
+        valid = targeted & (partners >= 0) & (partners != rows)
+        safe = np.where(valid, partners, 0)
+        valid &= state.is_alive[safe] & (state.batch[safe] == state.batch[rows])
+
+        actors = np.flatnonzero(valid)
+        order = actors[np.lexsort((state.agent[rows[actors]], actions[actors], partners[actors]))]
+        # grouped by target, best claim first
+
+        winner = np.ones(len(order), dtype=bool)
+        winner[1:] = partners[order[1:]] != partners[order[:-1]]
+
+        resolved[targeted] = -1
+        resolved[order[winner]] = actions[order[winner]]
+
+        return resolved
+
+
+# =======
+# EFFECTS
+# =======
+
+
+    def step(self, state, rows, pools, ledger):
+        """
+        Runs the action phase of a time period for the living people.
+        Every effect is computed from the state at the start of the phase and applied with order-independent scatter-adds; resource transfers are recorded in the ledger.
+
+        :param state: population state
+        :param rows: rows of the living people
+        :param pools: resource name -> community pool of each population copy
+        :param ledger: ledger that receives the phase's resource transfers
+        :type state: PopulationState
+        :type rows: numpy.ndarray
+        :type pools: dict
+        :type ledger: Ledger
+        :return: (parent row, parent row) pairs of the births requested by the phase
+        :rtype: numpy.ndarray
+        """
+
+        if len(rows) == 0:
+            return np.empty((0, 2), dtype=np.int64)
+
+        partners = self.partners(state, rows)
+        actions = self.resolve(state, rows, self.choose(state, rows), partners)
+        acting = actions >= 0
+
+        if not acting.any():
+            return np.empty((0, 2), dtype=np.int64)
+
+        partnered = acting & np.isin(actions, [ACTIONS.index(name) for name in PARTNER_ACTIONS])
+        touched = np.unique(np.concatenate((rows[acting], partners[partnered])))
+
+        before = state.row_totals(touched)
+
+        partner_rows = np.where(partnered, partners, 0)
+
+        snap = {
+            "rows": rows,
+            "partners": partner_rows,
+            "batches": state.batch[rows].astype(np.int64),
+            "items": np.minimum((state.uniform("item", rows) * len(RESOURCES)).astype(np.int64), len(RESOURCES) - 1),
+            "holdings": np.stack([getattr(state, name)[rows] for name in RESOURCES]),
+            "partner_holdings": np.stack([getattr(state, name)[partner_rows] for name in RESOURCES]),
+            "infected": state.infection[rows] != -1,
+            "partner_infected": state.infection[partner_rows] != -1,
+            "pools": np.stack([pools[name] for name in RESOURCES], axis=1).ravel()
+        }
+        # start-of-phase snapshot
+
+        def chosen(name):
+            return np.flatnonzero(actions == ACTIONS.index(name))
+
+        victims = _a_kill(state, snap, chosen("kill"), ledger)
+        parents = _a_sex(state, snap, chosen("sex"), ledger)
+        _a_steal_per(state, snap, chosen("steal_per"), ledger)
+        _a_donate_per(state, snap, chosen("donate_per"), ledger)
+        _a_steal_pop(state, snap, chosen("steal_pop"), ledger)
+        _a_donate_pop(state, snap, chosen("donate_pop"), ledger)
+
+        state.is_alive[victims] = False
+        # killings take effect once every other effect has been applied
+
+        state.update_totals(before, state.row_totals(touched))
+
+        return parents
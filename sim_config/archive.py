@@ -0,0 +1,77 @@
+"""
+Append-only archive of dead people's final records.
+Records are raw fixed-size structs appended to a single binary file, so an archive can be read (or memory-mapped) with one NumPy call while it is still growing.
+"""
+
+
+import numpy as np
+from .state import COLUMNS
+# module imports
+
+
+ARCHIVE_DTYPE = np.dtype([("death_tick", np.int64)] + [(name, dtype) for name, dtype in COLUMNS.items()])
+# final state of a person plus the time period in which they died
+
+
+def read_archive(path, mmap=False):
+    """
+    Reads every record written to an archive.
+
+    :param path: archive file
+    :param mmap: memory-map the file instead of reading it into memory
+    :type path: str
+    :type mmap: bool
+    :return: archived records
+    :rtype: numpy.ndarray
+    """
+
+    if mmap:
+        return np.memmap(path, dtype=ARCHIVE_DTYPE, mode="r")
+
+    return np.fromfile(path, dtype=ARCHIVE_DTYPE)
+
+
+class DeathArchive:
+
+    def __init__(self, path):
+        """
+        DeathArchive constructor; opens the archive file for appending.
+
+        :param path: archive file
+        :type path: str
+        """
+
+        self.path = path
+        self.file = open(path, "ab")
+        self.count = 0
+
+
+    def append(self, state, rows):
+        """
+        Archives the final records of dead people.
+
+        :param state: population state holding the records
+        :param rows: rows of the people being archived
+        :type state: PopulationState
+        :type rows: numpy.ndarray
+        """
+
+        if len(rows) == 0:
+            return
+
+        records = np.empty(len(rows), dtype=ARCHIVE_DTYPE)
+        records["death_tick"] = state.tick
+
+        for name in COLUMNS:
+            records[name] = getattr(state, name)[rows]
+
+        self.file.write(records.tobytes())
+        self.count += len(rows)
+
+
+    def flush(self):
+        self.file.flush()
+
+
+    def close(self):
+        self.file.close()
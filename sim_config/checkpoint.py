@@ -0,0 +1,111 @@
+"""
+Checkpoint files.
+A checkpoint is a single binary file: a magic string, a JSON header describing plain metadata and every array (dtype, shape and offset), then the raw arrays, each aligned to 64 bytes.
+Arrays are memory-mapped on load, so resuming only reads the pages that are actually used.
+Files are written under a temporary name, flushed to disk and renamed into place, so a crash mid-write leaves the previous checkpoint intact.
+Arrays are written a chunk at a time, so checkpointing memory-mapped (out-of-core) columns never loads them into memory.
+"""
+
+
+import json
+import os
+import numpy as np
+# module imports
+
+
+MAGIC = b"SOCCKPT1"
+ALIGNMENT = 64
+
+WRITE_CHUNK = 1 << 24
+# bytes of an array written at a time
+
+
+def write_checkpoint(path, arrays, meta):
+    """
+    Atomically writes a checkpoint file.
+
+    :param path: checkpoint file
+    :param arrays: array name -> array
+    :param meta: JSON-serializable metadata
+    :type path: str
+    :type arrays: dict
+    :type meta: dict
+    """
+
+    arrays = {name: np.asarray(array) for name, array in arrays.items()}
+    layout = {}
+    offset = 0
+
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        # offsets are relative to the start of the data section
+
+    header = json.dumps({"meta": meta, "arrays": layout}).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(np.uint64(len(header)).tobytes())
+        file.write(header)
+
+        for name, array in arrays.items():
+            file.seek(data_start + layout[name]["offset"])
+            array = np.atleast_1d(array)
+            step = max(1, WRITE_CHUNK // max(array[:1].nbytes, 1))
+
+            for start in range(0, len(array), step):
+                file.write(np.ascontiguousarray(array[start:start + step]).data)
+                # only one chunk of a non-contiguous or memory-mapped array is copied at a time
+
+        file.truncate(data_start + offset)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temp_path, path)
+
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+
+    try:
+        os.fsync(directory)
+        # makes the rename itself durable
+    finally:
+        os.close(directory)
+
+
+def read_checkpoint(path, mmap=True):
+    """
+    Reads a checkpoint file.
+
+    :param path: checkpoint file
+    :param mmap: memory-map the arrays copy-on-write (changes are never written back) instead of reading them
+    :type path: str
+    :type mmap: bool
+    :return: array name -> array, and metadata
+    :rtype: tuple
+    """
+
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a checkpoint file".format(path))
+
+        length = int(np.frombuffer(file.read(8), dtype=np.uint64)[0])
+        header = json.loads(file.read(length))
+
+    data_start = -(-(len(MAGIC) + 8 + length) // ALIGNMENT) * ALIGNMENT
+    arrays = {}
+
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        offset = data_start + entry["offset"]
+
+        if mmap and dtype.itemsize and int(np.prod(shape)):
+            arrays[name] = np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape)
+        else:
+            arrays[name] = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+            # empty arrays cannot be memory-mapped
+
+    return arrays, header["meta"]
@@ -0,0 +1,262 @@
+"""
+Contact-graph infection spread.
+People are linked by household and workplace contacts, each layer stored as a CSR (compressed sparse row) adjacency structure over state rows.
+Every time period, the infection pressure on each person is a sparse matrix-vector product of a layer with the infectious set, computed by walking only the infectious rows' edges.
+"""
+
+
+import numpy as np
+# module imports
+
+
+SKILL_LEVELS = 4
+# PDCL person types cycle through 4 skill levels (type % 4) for each consumption need level
+
+
+# ============
+# CSR BUILDING
+# ============
+
+
+def group_members(keys, draws, size):
+    """
+    Splits people into groups of at most 'size' members among people sharing a key, in random order.
+
+    :param keys: grouping key of each person (negative keys are left out of every group)
+    :param draws: uniform draws that shuffle people within a key
+    :param size: maximum group size
+    :type keys: numpy.ndarray
+    :type draws: numpy.ndarray
+    :type size: int
+    :return: group id of each person (-1 if none)
+    :rtype: numpy.ndarray
+    """
+
+    groups = np.full(len(keys), -1, dtype=np.int64)
+    members = np.flatnonzero(keys >= 0)
+    order = members[np.lexsort((draws[members], keys[members]))]
+    # people sorted by key, shuffled within each key
+
+    key_sorted = keys[order]
+    key_start = np.flatnonzero(np.r_[True, key_sorted[1:] != key_sorted[:-1]])
+    rank = np.arange(len(order)) - np.repeat(key_start, np.diff(np.r_[key_start, len(order)]))
+    # position of each person within their key
+
+    new_group = (rank % size == 0)
+    groups[order] = np.cumsum(new_group) - 1
+
+    return groups
+
+
+def clique_edges(groups):
+    """
+    Lists the directed edges linking every pair of people in the same group.
+
+    :param groups: group id of each row (-1 if none)
+    :type groups: numpy.ndarray
+    :return: edge source rows and edge destination rows
+    :rtype: tuple
+    """
+
+    members = np.flatnonzero(groups >= 0)
+    order = members[np.argsort(groups[members], kind="stable")]
+    _, starts, sizes = np.unique(groups[order], return_index=True, return_counts=True)
+
+    degree = np.repeat(sizes, sizes)
+    first = np.repeat(starts, sizes)
+    # group size and group start (in sorted order) of each member
+
+    offset = np.arange(degree.sum()) - np.repeat(np.cumsum(degree) - degree, degree)
+    src = np.repeat(order, degree)
+    dst = order[np.repeat(first, degree) + offset]
+
+    keep = src != dst
+    # no self-contacts
+
+    return src[keep], dst[keep]
+
+
+def to_csr(src, dst, size):
+    """
+    Builds a CSR adjacency structure from directed edges.
+
+    :param src: edge source rows
+    :param dst: edge destination rows
+    :param size: number of rows
+    :type src: numpy.ndarray
+    :type dst: numpy.ndarray
+    :type size: int
+    :return: row pointer array and column index array
+    :rtype: tuple
+    """
+
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=size), out=indptr[1:])
+
+    index_dtype = np.int32 if size < 2 ** 31 else np.int64
+    # halves edge memory for graphs of up to 2^31 rows
+
+    return indptr, dst[order].astype(index_dtype)
+
+
+def spread(indptr, indices, sources, size):
+    """
+    Counts the edges from 'sources' into every row, i.e. A^T x for the indicator vector x of the sources.
+    Only the sources' own edges are visited, so the cost follows the number of infectious contacts rather than the graph size.
+
+    :param indptr: CSR row pointer array
+    :param indices: CSR column index array
+    :param sources: source rows
+    :param size: number of rows in the result
+    :type indptr: numpy.ndarray
+    :type indices: numpy.ndarray
+    :type sources: numpy.ndarray
+    :type size: int
+    :return: number of source contacts of each row
+    :rtype: numpy.ndarray
+    """
+
+    sources = sources[sources < len(indptr) - 1]
+    # rows added after the graph was built have no contacts
+
+    starts = indptr[sources]
+    degree = indptr[sources + 1] - starts
+    edges = np.repeat(starts - (np.cumsum(degree) - degree), degree) + np.arange(degree.sum())
+
+    return np.bincount(indices[edges], minlength=size)
+
+
+# =============
+# CONTACT GRAPH
+# =============
+
+
+class ContactGraph:
+
+    def __init__(self, layers, size):
+        """
+        ContactGraph constructor.
+
+        :param layers: layer name -> (row pointer array, column index array, per-contact transmission chance)
+        :param size: number of state rows covered by the graph
+        :type layers: dict
+        :type size: int
+        """
+
+        self.layers = layers
+        self.size = size
+
+
+    @classmethod
+    def build(cls, state, ptypes, household_size=4, workplace_size=20, household_beta=0.05, workplace_beta=0.01):
+        """
+        Builds household and workplace layers over every row of a state.
+        Households are random groups of people; workplaces are random groups of people with the same (nonzero) skill level.
+
+        :param state: population state
+        :param ptypes: PDCL person type of each row
+        :param household_size: people per household
+        :param workplace_size: people per workplace
+        :param household_beta: chance per time period that an infectious household contact transmits the disease
+        :param workplace_beta: chance per time period that an infectious workplace contact transmits the disease
+        :type state: PopulationState
+        :type ptypes: numpy.ndarray
+        :type household_size: int
+        :type workplace_size: int
+        :type household_beta: float
+        :type workplace_beta: float
+        :return: contact graph
+        :rtype: ContactGraph
+        """
+
+        size = len(state)
+        rows = np.arange(size)
+
+        households = group_members(np.zeros(size, dtype=np.int64), state.uniform("household", rows), household_size)
+
+        skill = np.asarray(ptypes, dtype=np.int64) % SKILL_LEVELS
+        workplaces = group_members(np.where(skill > 0, skill, -1), state.uniform("workplace", rows), workplace_size)
+        # unskilled people (skill level 0) do not work
+
+        layers = {
+            "household": to_csr(*clique_edges(households), size) + (household_beta,),
+            "workplace": to_csr(*clique_edges(workplaces), size) + (workplace_beta,)
+        }
+
+        return cls(layers, size)
+
+
+    def replicate(self, count):
+        """
+        Builds the graph of a state replicated 'count' times (see PopulationState.replicate); copies are not linked.
+
+        :param count: number of copies
+        :type count: int
+        :return: replicated graph
+        :rtype: ContactGraph
+        """
+
+        size = self.size * count
+        layers = {}
+
+        for name, (indptr, indices, beta) in self.layers.items():
+            edges = indptr[-1]
+            copies = np.arange(count)
+
+            new_indptr = np.concatenate(([0], (indptr[1:] + edges * copies[:, None]).ravel()))
+            new_indices = (indices + (self.size * copies[:, None]).astype(indices.dtype)).ravel()
+            layers[name] = (new_indptr, new_indices.astype(np.int32 if size < 2 ** 31 else np.int64), beta)
+
+        return ContactGraph(layers, size)
+
+
+    def hazard(self, sources, size):
+        """
+        Computes the infection hazard that a set of infectious rows puts on every row.
+
+        :param sources: infectious rows
+        :param size: number of rows in the result
+        :type sources: numpy.ndarray
+        :type size: int
+        :return: hazard of each row (infection chance is 1 - exp(-hazard))
+        :rtype: numpy.ndarray
+        """
+
+        hazard = np.zeros(size)
+
+        for indptr, indices, beta in self.layers.values():
+            hazard += spread(indptr, indices, sources, size) * -np.log1p(-beta)
+            # independent chances per contact: 1 - (1 - beta)^contacts
+
+        return hazard
+
+
+    def transmit(self, state, rows):
+        """
+        Spreads the disease from the infectious people among 'rows' to their susceptible contacts among 'rows'.
+        Newly infected people start at infection level 0, like people infected at construction.
+
+        :param state: population state
+        :param rows: rows of the living people
+        :type state: PopulationState
+        :type rows: numpy.ndarray
+        :return: rows of the newly infected people
+        :rtype: numpy.ndarray
+        """
+
+        infected = state.infection[rows] != -1
+        hazard = self.hazard(rows[infected], len(state))
+
+        candidates = rows[~infected]
+        candidates = candidates[hazard[candidates] > 0]
+        # only susceptible people with an infectious contact can be infected
+
+        chance = -np.expm1(-hazard[candidates])
+        new = candidates[state.uniform("contact", candidates) < chance]
+
+        before = state.row_totals(new)
+        state.infection[new] = 0
+        state.update_totals(before, state.row_totals(new))
+
+        return new
@@ -0,0 +1,277 @@
+"""
+Whole-population tick kernel.
+Vectorized equivalents of the Person time handler and its consumption/production functions, evaluated for many rows of a PopulationState at once.
+Every branch mirrors the scalar Person method it replaces, updates are applied in the same order, and random draws come from the same (tick, agent, purpose) streams, so both paths give the same results.
+"""
+
+
+import numpy as np
+from .person import MIN_UTILITY
+# module imports
+
+
+# =================
+# AGE/SEX MULTIPLIERS
+# =================
+
+
+def age_c(age):
+    """
+    Vectorized Person.__age_c.
+
+    :param age: ages
+    :type age: numpy.ndarray
+    :return: consumption multipliers
+    :rtype: numpy.ndarray
+    """
+
+    return np.select(
+        [(age < 5) | (age > 70), (age < 16) | (age > 50)],
+        [0.5, 0.7],
+        1.0
+    )
+
+
+def age_p(age):
+    """
+    Vectorized Person.__age_p.
+
+    :param age: ages
+    :type age: numpy.ndarray
+    :return: production efficiency multipliers and intolerance multipliers
+    :rtype: tuple
+    """
+
+    young_old = (age < 5) | (age > 70)
+    teen_senior = (age < 16) | (age > 50)
+
+    eff_mult = np.select([young_old, teen_senior], [0.0, 0.3], 1.0)
+    int_mult = np.select([young_old, teen_senior], [20.0, 4.0], 1.0)
+
+    return eff_mult, int_mult
+
+
+def sex_p(sex, code):
+    """
+    Vectorized Person.__sex_p_M/__sex_p_F (the efficiency and intolerance multipliers are equal).
+
+    :param sex: sex codes
+    :param code: sex code favoured by the field of work
+    :type sex: numpy.ndarray
+    :type code: int
+    :return: multipliers
+    :rtype: numpy.ndarray
+    """
+
+    return np.where(sex == code, 1.0, 0.7)
+
+
+# ================================
+# RESOURCE PRODUCTION/CONSUMPTION
+# ================================
+# each function works on a dict of gathered columns 'p' and updates it in place
+# ================================
+
+
+def _p_food(p, w, eff_mult, int_mult):
+    w_int = p["work_intolerance"] * int_mult * w
+    factor = np.select([w_int > 1, w_int > 0.5], [1.5, 1.0], 0.5) * w_int
+
+    p["satisfaction"] -= factor
+    p["rested"] -= factor
+    p["food"] += p["work_ability"] * eff_mult * w
+
+
+def _p_water(p, w, eff_mult, int_mult):
+    w_int = p["work_intolerance"] * int_mult * w
+
+    p["satisfaction"] -= np.select([w_int > 0.5, w_int > 0.2], [2.0, 1.0], 0.3) * w_int
+    p["rested"] -= np.select([w_int > 0.5, w_int > 0.2], [1.0, 0.5], 0.1) * w_int
+    p["water"] += 10 * p["work_ability"] * eff_mult * w
+
+
+def _p_shelter(p, w, eff_mult, int_mult, draw):
+    w_int = p["work_intolerance"] * int_mult * w
+    hard = w_int > 0.7
+
+    p["satisfaction"] -= np.select([hard, w_int > 0.5], [2.0, 1.0], 0.3) * w_int
+    p["rested"] -= np.select([hard, w_int > 0.5], [4.0, 2.0], 1.0) * w_int
+    p["is_alive"] &= ~(hard & (draw < 0.1))
+    # too much construction work leads to the possibility of death
+
+    p["shelter"] += p["work_ability"] * eff_mult * w / 10
+
+
+def _p_clothing(p, w, eff_mult, int_mult):
+    w_int = p["work_intolerance"] * int_mult * w
+    light = w_int <= 0.5
+
+    p["satisfaction"] -= np.select([w_int > 1, ~light], [1.0, 0.7], 0.5) * w_int
+    p["rested"] -= np.select([w_int > 1, ~light], [0.5, 0.3], 0.0) * w_int
+    p["satisfaction"] -= np.where(light, 0.1 * w_int, 0.0)
+    # light work applies a second dissatisfaction instead of tiring
+
+    p["clothing"] += p["work_ability"] * eff_mult * w / 2
+
+
+def _consumed(stock, c):
+    # insufficient resources consume all that is available
+    return np.where(stock >= c, c, stock)
+
+
+def _c_food(p, c, age_mult):
+    c = _consumed(p["food"], c)
+    p["food"] -= c
+
+    food = 3 * p["consumption_ratio"] * age_mult * np.log(c + 1)
+    starving = food < 0.2
+
+    p["satisfaction"] += np.select(
+        [food >= 0.7, ~starving],
+        [food, -1 / np.maximum(food, MIN_UTILITY)],
+        -10 / np.maximum(food, MIN_UTILITY)
+    )
+    p["is_alive"] &= ~starving
+
+
+def _c_water(p, c, age_mult):
+    c = _consumed(p["water"], c)
+    p["water"] -= c
+
+    water = 3 * p["consumption_ratio"] * age_mult * np.log(10 * c + 1)
+    dehydrated = (water < 1) & (c < 0.4)
+
+    p["satisfaction"] += np.select(
+        [water >= 1, ~dehydrated],
+        [3.0, -1 / np.maximum(water, MIN_UTILITY)],
+        -10 / np.maximum(water, MIN_UTILITY)
+    )
+    p["is_alive"] &= ~dehydrated
+
+
+def _c_shelter(p, c):
+    c = _consumed(p["shelter"], c)
+    # personal shelter value does not decrease when used
+
+    shelter = 2 * p["consumption_ratio"] * np.log(5 * c + 1)
+    p["satisfaction"] += np.select([shelter < 1, shelter > 3], [-3.0, 1.0], 0.0)
+
+
+def _c_clothing(p, c):
+    c = _consumed(p["clothing"], c)
+    p["clothing"] -= c
+
+    clothing = 2 * p["consumption_ratio"] * np.log(10 * c + 1)
+    p["satisfaction"] += np.select([clothing > 1, clothing < 0.1], [clothing, -1.0], 0.0)
+
+
+# =============================================================================
+# =============================================================================
+
+
+KERNEL_COLUMNS = (
+    "age", "sex", "satisfaction", "rested", "rest_init", "infection", "is_alive",
+    "consumption_ratio", "work_ability", "work_intolerance",
+    "food", "water", "shelter", "clothing"
+)
+# columns read and written by the tick kernel
+
+MUTABLE_COLUMNS = ("age", "satisfaction", "rested", "infection", "is_alive", "food", "water", "shelter", "clothing")
+# columns written back after a tick
+
+
+def resource_manager(p, schema, draw):
+    """
+    Vectorized Person.__resource_manager: produces and then consumes each of the four resources.
+
+    :param p: gathered columns of the rows being processed
+    :param schema: [consumption, production] pairs for the 4 resources, shape (4, 2) or (rows, 4, 2)
+    :param draw: uniform draws used for the construction accident check
+    :type p: dict
+    :type schema: numpy.ndarray
+    :type draw: numpy.ndarray
+    """
+
+    age_eff, age_int = age_p(p["age"])
+    age_mult = age_c(p["age"])
+    sex_m = sex_p(p["sex"], 0)
+    sex_f = sex_p(p["sex"], 1)
+
+    _p_food(p, schema[..., 0, 1], age_eff, age_int)
+    _c_food(p, schema[..., 0, 0], age_mult)
+
+    _p_water(p, schema[..., 1, 1], age_eff, age_int)
+    _c_water(p, schema[..., 1, 0], age_mult)
+
+    _p_shelter(p, schema[..., 2, 1], age_eff * sex_m, age_int * sex_m, draw)
+    _c_shelter(p, schema[..., 2, 0])
+
+    _p_clothing(p, schema[..., 3, 1], age_eff * sex_f, age_int * sex_f)
+    _c_clothing(p, schema[..., 3, 0])
+
+
+def tick(state, rows, schema):
+    """
+    Vectorized Person.run for the given rows of a population state.
+
+    :param state: population state
+    :param rows: rows to move forward 1 unit in time
+    :param schema: [consumption, production] pairs for the 4 resources, shape (4, 2) or (len(rows), 4, 2)
+    :type state: PopulationState
+    :type rows: numpy.ndarray
+    :type schema: numpy.ndarray
+    :return: alive flags of the rows after the tick
+    :rtype: numpy.ndarray
+    """
+
+    schema = np.asarray(schema, dtype=np.float64)
+    p = {name: getattr(state, name)[rows] for name in KERNEL_COLUMNS}
+    # gathers the rows being processed
+
+    before = state.row_totals(rows)
+
+    p["rested"] += p["rest_init"]
+    # simulates person's rest
+
+    alive = p["is_alive"].copy()
+
+    # age iteration and age-based death chance
+    p["age"] += np.where(alive, 0.003, 0.0)
+    alive &= ~(state.uniform("age_death", rows) < p["age"] ** 2 / 100)
+
+    # person rest effect handler
+    alive &= ~(p["rested"] < 0)
+
+    # person infection handler
+    infected = alive & (p["infection"] != -1)
+    p["infection"] += infected
+    p["satisfaction"] -= np.where(infected, p["infection"], 0)
+
+    death_draw = state.uniform("infection_death", rows)
+    recover_draw = state.uniform("infection_recover", rows)
+    infection_death = infected & (death_draw * 5 < p["infection"])
+    recovered = infected & ~infection_death & (recover_draw * 3 > p["infection"])
+
+    p["infection"][recovered] = -1
+    alive &= ~infection_death
+
+    p["is_alive"] = alive
+
+    # manage daily required resource consumption for the living
+    live = np.flatnonzero(alive)
+    sub = {name: column[live] for name, column in p.items()}
+    sub_schema = schema[live] if schema.ndim == 3 else schema
+
+    resource_manager(sub, sub_schema, state.uniform("accident", rows[live]))
+
+    for name, column in sub.items():
+        p[name][live] = column
+
+    for name in MUTABLE_COLUMNS:
+        getattr(state, name)[rows] = p[name]
+        # scatters results back to the state
+
+    state.update_totals(before, state.row_totals(rows))
+    # running aggregates follow the tick's changes
+
+    return p["is_alive"]
@@ -0,0 +1,170 @@
+"""
+Per-tick resource transaction ledger.
+Transfers between people and community pools are recorded as (source, destination, resource, amount) arrays during a time period and settled together with scatter-add reductions.
+Settlement only looks at balances from before the ledger is applied, so the result does not depend on the order transfers were recorded in.
+"""
+
+
+import numpy as np
+# module imports
+
+
+RESOURCES = ("food", "water", "shelter", "clothing")
+
+
+def pool_account(batch):
+    """
+    Returns the ledger account of a population copy's community pool.
+    People are addressed by their (non-negative) state row, pools by negative accounts.
+
+    :param batch: population copies
+    :type batch: numpy.ndarray or int
+    :return: pool accounts
+    :rtype: numpy.ndarray or int
+    """
+
+    return -1 - batch
+
+
+class Ledger:
+
+    def __init__(self, audit=False, tolerance=1e-9):
+        """
+        Ledger constructor.
+
+        :param audit: check that every settlement conserves each resource, and keep a log of settlements
+        :param tolerance: relative imbalance tolerated by the audit (sums accumulate rounding error)
+        :type audit: bool
+        :type tolerance: float
+        """
+
+        self.audit = audit
+        self.tolerance = tolerance
+        self.log = []
+        self.__chunks = []
+
+
+    def __len__(self):
+        return sum(len(chunk[0]) for chunk in self.__chunks)
+
+
+    def record(self, src, dst, resource, amount):
+        """
+        Records transfers to be settled by the next apply call.
+        Every argument may be a scalar or an array with one value per transfer.
+
+        :param src: source accounts (state rows, or pool accounts, see pool_account)
+        :param dst: destination accounts
+        :param resource: resource indices (see RESOURCES)
+        :param amount: requested amounts
+        :type src: numpy.ndarray
+        :type dst: numpy.ndarray
+        :type resource: numpy.ndarray
+        :type amount: numpy.ndarray
+        """
+
+        src, dst, resource, amount = np.broadcast_arrays(
+            np.asarray(src, dtype=np.int64),
+            np.asarray(dst, dtype=np.int64),
+            np.asarray(resource, dtype=np.int64),
+            np.asarray(amount, dtype=np.float64)
+        )
+
+        if len(src):
+            self.__chunks.append((src.ravel(), dst.ravel(), resource.ravel(), amount.ravel()))
+
+
+    def apply(self, state, pools):
+        """
+        Settles every recorded transfer and clears the ledger.
+        If an account's transfers of a resource add up to more than its balance, they are scaled down together so the balance ends at 0.
+
+        :param state: population state holding the people's balances
+        :param pools: resource name -> community pool of each population copy (updated in place)
+        :type state: PopulationState
+        :type pools: dict
+        :return: settled amount of each transfer, in recording order
+        :rtype: numpy.ndarray
+        """
+
+        if not self.__chunks:
+            return np.empty(0)
+
+        src, dst, resource, amount = (np.concatenate(parts) for parts in zip(*self.__chunks))
+        self.__chunks = []
+
+        resources = len(RESOURCES)
+        keys, inverse = np.unique(np.concatenate((src, dst)) * resources + np.concatenate((resource, resource)), return_inverse=True)
+        src_slot, dst_slot = inverse[:len(src)], inverse[len(src):]
+        # only the (account, resource) pairs touched by a transfer are settled, so the cost follows the number of transfers
+
+        account, kind = keys // resources, keys % resources
+        person = account >= 0
+        rows = account[person]
+        batches = -1 - account[~person]
+
+        balance = np.empty(len(keys))
+
+        for index, name in enumerate(RESOURCES):
+            held = kind[person] == index
+            balance[np.flatnonzero(person)[held]] = getattr(state, name)[rows[held]]
+
+            pooled = kind[~person] == index
+            balance[np.flatnonzero(~person)[pooled]] = pools[name][batches[pooled]]
+
+        outgoing = np.bincount(src_slot, weights=amount, minlength=len(keys))
+        scale = np.where(outgoing > balance, np.maximum(balance, 0) / np.where(outgoing > 0, outgoing, 1), 1.0)
+        settled = amount * scale[src_slot]
+        # caps are set from opening balances, so incoming transfers never fund outgoing ones
+
+        delta = np.bincount(dst_slot, weights=settled, minlength=len(keys)) - np.bincount(src_slot, weights=settled, minlength=len(keys))
+
+        person_delta = delta[person]
+        alive = state.is_alive[rows]
+        batch = state.batch[rows]
+
+        for index, name in enumerate(RESOURCES):
+            held = kind[person] == index
+            getattr(state, name)[rows[held]] += person_delta[held]
+            # keys are unique, so each row is updated once
+
+            pooled = kind[~person] == index
+            pools[name][batches[pooled]] += delta[~person][pooled]
+
+            state.totals[name] += np.bincount(batch[held], weights=np.where(alive[held], person_delta[held], 0.0), minlength=state.batches)
+            # running aggregates follow the change in the living people's holdings
+
+        if self.audit:
+            self.__audit(state, np.bincount(kind, weights=delta, minlength=resources), amount, settled)
+
+        return settled
+
+
+    def __audit(self, state, delta, amount, settled):
+        """
+        Checks that a settlement neither created nor destroyed any resource, and logs it.
+
+        :param state: population state
+        :param delta: net balance change of each resource
+        :param amount: requested amounts
+        :param settled: settled amounts
+        :type state: PopulationState
+        :type delta: numpy.ndarray
+        :type amount: numpy.ndarray
+        :type settled: numpy.ndarray
+        """
+
+        imbalance = np.abs(delta)
+        scale = max(1.0, settled.sum())
+
+        self.log.append({
+            "tick": state.tick,
+            "transfers": len(amount),
+            "requested": float(amount.sum()),
+            "settled": float(settled.sum()),
+            "capped": int((settled < amount).sum()),
+            "imbalance": imbalance.tolist()
+        })
+
+        if (imbalance > self.tolerance * scale).any():
+            raise RuntimeError("Ledger settlement at tick {} does not conserve resources (imbalance {})".format(state.tick, imbalance.tolist()))
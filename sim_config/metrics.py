@@ -0,0 +1,325 @@
+"""
+Streaming per-tick metrics.
+Metrics are gathered into a preallocated ring buffer by the tick loop and flushed in chunks by a background thread to numbered .npy files in a directory.
+Each chunk file is written under a temporary name and renamed into place, so a run's metrics can be read while it is still going.
+"""
+
+
+import os
+import threading
+import numpy as np
+# module imports
+
+
+METRICS_DTYPE = np.dtype([
+    ("tick", np.int64),
+    ("alive", np.int64),
+    ("satisfaction_mean", np.float64),
+    ("satisfaction_p10", np.float64),
+    ("satisfaction_p50", np.float64),
+    ("satisfaction_p90", np.float64),
+    ("infected", np.float64),
+    ("food", np.float64),
+    ("water", np.float64),
+    ("shelter", np.float64),
+    ("clothing", np.float64),
+    ("community_food", np.float64),
+    ("community_water", np.float64),
+    ("community_shelter", np.float64),
+    ("community_clothing", np.float64),
+    ("births", np.int64),
+    ("deaths", np.int64)
+])
+# one record per tick (infected is the prevalence among the living, resources are totals held by the living)
+
+PERCENTILES = (10, 50, 90)
+# satisfaction percentiles of the records
+
+SELECTION_BINS = 1024
+SELECTION_LIMIT = 1 << 20
+# chunked percentiles narrow the range of each wanted value with histograms of this many bins until at most this many values are left
+
+
+def _order_statistics(chunks, ranks):
+    """
+    Finds the values at some ranks of the sorted concatenation of value chunks, with a bounded amount of memory.
+    Each rank's value range is narrowed by a histogram pass over the chunks until few enough values are left in it to gather.
+
+    :param chunks: function returning a new iterator over the value chunks (called once per pass)
+    :param ranks: 0-based ranks
+    :type chunks: callable
+    :type ranks: list of int
+    :return: value at every rank
+    :rtype: list of float
+    """
+
+    low, high, count = np.inf, -np.inf, 0
+
+    for chunk in chunks():
+        if len(chunk):
+            low, high, count = min(low, chunk.min()), max(high, chunk.max()), count + len(chunk)
+
+    targets = [((low, high, True, count), rank) for rank in ranks]
+    # (value range [low, high) (closed if the flag is set), number of values in the range) and rank within the range
+    results = [None] * len(ranks)
+
+    while None in results:
+        pending = [index for index, result in enumerate(results) if result is None]
+        ranges = {targets[index][0] for index in pending}
+        # ranks sharing a value range (e.g. all of them on the first pass) share its histogram
+
+        edges = {key: np.linspace(key[0], key[1], SELECTION_BINS + 1) for key in ranges}
+        counts = {key: np.zeros(SELECTION_BINS, dtype=np.int64) for key in ranges}
+        gathered = {key: [] for key in ranges}
+
+        for chunk in chunks():
+            for key in ranges:
+                low, high, closed, count = key
+                values = chunk[(chunk >= low) & ((chunk < high) | (closed & (chunk == high)))]
+
+                if count <= SELECTION_LIMIT or low == high:
+                    gathered[key].append(np.unique(values, return_counts=True))
+                    # the distinct values of the range and their multiplicities
+                else:
+                    slots = np.minimum(np.searchsorted(edges[key], values, side="right") - 1, SELECTION_BINS - 1)
+                    counts[key] += np.bincount(slots, minlength=SELECTION_BINS)
+                    # value v is in bin j if edges[j] <= v < edges[j + 1] (the range's upper bound is in the last bin)
+
+        for key in ranges:
+            if gathered[key]:
+                distinct, inverse = np.unique(np.concatenate([part[0] for part in gathered[key]]), return_inverse=True)
+                gathered[key] = (distinct, np.cumsum(np.bincount(inverse, weights=np.concatenate([part[1] for part in gathered[key]]))))
+
+        for index in pending:
+            key, rank = targets[index]
+            low, high, closed, count = key
+
+            if gathered[key]:
+                distinct, cumulative = gathered[key]
+                results[index] = distinct[np.searchsorted(cumulative, rank, side="right")]
+                continue
+
+            cumulative = np.cumsum(counts[key])
+            slot = int(np.searchsorted(cumulative, rank, side="right"))
+            below = int(cumulative[slot - 1]) if slot else 0
+            last = slot == SELECTION_BINS - 1
+            bounds = (edges[key][slot], high if last else edges[key][slot + 1])
+
+            if counts[key][slot] == count and bounds == (low, high):
+                targets[index] = ((low, high, closed, 0), rank)
+                continue
+                # the range is too narrow to split (a few adjacent floats), so its values are gathered next
+
+            targets[index] = ((*bounds, closed and last, int(counts[key][slot])), rank - below)
+
+    return results
+
+
+def chunked_percentiles(chunks, count, q):
+    """
+    Computes percentiles of values that are only available one chunk at a time (e.g. columns of an out-of-core population).
+    Results match np.percentile of the concatenated values (linear interpolation between the closest ranks).
+
+    :param chunks: function returning a new iterator over the value chunks
+    :param count: total number of values (at least 1)
+    :param q: percentiles, between 0 and 100
+    :type chunks: callable
+    :type count: int
+    :type q: tuple
+    :return: one value per percentile
+    :rtype: numpy.ndarray
+    """
+
+    position = (count - 1) * np.true_divide(q, 100)
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, count - 1)
+    gamma = position - below
+
+    ranks = np.unique(np.concatenate((below, above))).tolist()
+    values = dict(zip(ranks, _order_statistics(chunks, ranks)))
+    a = np.array([values[rank] for rank in below.tolist()])
+    b = np.array([values[rank] for rank in above.tolist()])
+
+    return np.where(gamma >= 0.5, b - (b - a) * (1 - gamma), a + (b - a) * gamma)
+    # same interpolation as np.percentile, so in-memory and out-of-core populations report the same values
+
+
+def collect(population):
+    """
+    Gathers the metrics record of a population's latest tick.
+
+    :param population: simulated population
+    :type population: Population
+    :return: metrics record
+    :rtype: tuple
+    """
+
+    state = population.state
+    totals = {name: total.sum() for name, total in state.totals.items()}
+    alive_count = int(round(totals["alive"]))
+
+    if alive_count:
+        mean = totals["satisfaction"] / alive_count
+        infected = totals["infected"] / alive_count
+        if population.storage is None:
+            p10, p50, p90 = np.percentile(state.satisfaction[population.alive_rows], PERCENTILES)
+        else:
+            p10, p50, p90 = chunked_percentiles(lambda: population.alive_values("satisfaction"), len(population.alive_rows), PERCENTILES)
+            # the satisfaction of an out-of-core population's living is never loaded whole
+        # percentiles are the only metrics that still need a pass over the living
+    else:
+        mean = p10 = p50 = p90 = infected = np.nan
+
+    return (
+        state.tick,
+        alive_count,
+        mean, p10, p50, p90,
+        infected,
+        totals["food"],
+        totals["water"],
+        totals["shelter"],
+        totals["clothing"],
+        np.sum(population.food),
+        np.sum(population.water),
+        np.sum(population.shelter),
+        np.sum(population.clothing),
+        population.births,
+        population.deaths
+    )
+
+
+def read_metrics(path):
+    """
+    Reads every chunk written so far to a metrics directory.
+
+    :param path: metrics directory
+    :type path: str
+    :return: metrics records in tick order
+    :rtype: numpy.ndarray
+    """
+
+    names = sorted(name for name in os.listdir(path) if name.startswith("chunk_") and name.endswith(".npy"))
+
+    if not names:
+        return np.empty(0, dtype=METRICS_DTYPE)
+
+    return np.concatenate([np.load(os.path.join(path, name)) for name in names])
+
+
+class MetricsWriter:
+
+    def __init__(self, path, dtype=METRICS_DTYPE, capacity=65536, chunk=1024):
+        """
+        MetricsWriter constructor; starts the background writer thread.
+
+        :param path: directory that receives the chunk files (created if needed)
+        :param dtype: record dtype
+        :param capacity: ring buffer size in records
+        :param chunk: number of records written per chunk file
+        :type path: str
+        :type dtype: numpy.dtype
+        :type capacity: int
+        :type chunk: int
+        """
+
+        os.makedirs(path, exist_ok=True)
+
+        self.path = path
+        self.chunk = chunk
+        self.buffer = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+
+        self.head = 0
+        self.tail = 0
+        # records [tail, head) are waiting to be written (indices are taken modulo capacity)
+
+        self.dropped = 0
+        self.files = sum(1 for name in os.listdir(path) if name.startswith("chunk_") and name.endswith(".npy"))
+        # a resumed run continues the chunk numbering instead of overwriting earlier chunks
+        self.closed = False
+
+        self.__wake = threading.Event()
+        self.__thread = threading.Thread(target=self.__write_loop, name="MetricsWriter", daemon=True)
+        self.__thread.start()
+
+
+    def append(self, record):
+        """
+        Adds a record to the ring buffer without waiting on disk I/O.
+        If the writer thread has fallen a full buffer behind, the record is dropped and counted in 'dropped'.
+
+        :param record: metrics record
+        :type record: tuple
+        """
+
+        if self.head - self.tail >= self.capacity:
+            self.dropped += 1
+            return
+
+        self.buffer[self.head % self.capacity] = record
+        self.head += 1
+
+        if self.head - self.tail >= self.chunk:
+            self.__wake.set()
+
+
+    def close(self):
+        """
+        Flushes every pending record and stops the writer thread.
+        """
+
+        self.closed = True
+        self.__wake.set()
+        self.__thread.join()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# =============
+# WRITER THREAD
+# =============
+
+
+    def __write_loop(self):
+        while True:
+            self.__wake.wait(timeout=1.0)
+            self.__wake.clear()
+            # partial chunks are also flushed once a second, so readers see recent ticks
+
+            closing = self.closed
+
+            while self.head > self.tail:
+                self.__flush(min(self.head - self.tail, self.chunk))
+
+            if closing:
+                return
+
+
+    def __flush(self, count):
+        """
+        Writes the 'count' oldest pending records to the next chunk file.
+
+        :param count: number of records
+        :type count: int
+        """
+
+        indices = np.arange(self.tail, self.tail + count) % self.capacity
+        records = self.buffer[indices]
+        # copied out so the tick loop can reuse the slots once tail moves
+
+        name = os.path.join(self.path, "chunk_{:08d}.npy".format(self.files))
+        temp_name = name + ".tmp"
+
+        with open(temp_name, "wb") as file:
+            np.save(file, records)
+
+        os.replace(temp_name, name)
+
+        self.files += 1
+        self.tail += count
@@ -1,42 +1,193 @@
 """
 Decision Tree.
+Trees are assembled from linked Node objects and compiled into flat arrays (feature index, threshold, child indices and leaf values), so a whole population's feature matrix is evaluated in one level-synchronous pass instead of one recursive traversal per person.
 """
 
+
+import numpy as np
+# module imports
+
+
+LEAF = -1
+# feature index of leaf nodes
+
+
 class DT:
-    
-    def __init__(self):
+
+    def __init__(self, feature, threshold, left, right, value):
         """
+        DT constructor (see compile to build a tree from Node objects).
+        Internal node i sends a row to left[i] if row[feature[i]] <= threshold[i] and to right[i] otherwise; leaves have feature LEAF.
+
+        :param feature: feature index of each node
+        :param threshold: split threshold of each node
+        :param left: left child of each node
+        :param right: right child of each node
+        :param value: output values of each node, shape (nodes, outputs)
+        :type feature: numpy.ndarray
+        :type threshold: numpy.ndarray
+        :type left: numpy.ndarray
+        :type right: numpy.ndarray
+        :type value: numpy.ndarray
         """
 
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
 
-class Node:
+        value = np.asarray(value, dtype=np.float64)
+        self.value = value.reshape(len(value), -1)
 
-    def __init__(self):
+        self.depth = self.__depth()
+
+
+    @classmethod
+    def compile(cls, root):
         """
+        Compiles a linked tree into flat arrays, numbering nodes in breadth-first order.
+        Edge weights are folded into the leaf values: a leaf's output is its value times every weight on its path.
+
+        :param root: root node
+        :type root: Node
+        :return: compiled tree
+        :rtype: DT
         """
-        
-        self.left = None
-        self.right = None
-        
-        self.left_weight = None
-        self.right_weight = None
 
+        nodes = [(root, 1.0)]
+        feature, threshold, left, right, value = [], [], [], [], []
+        index = 0
+
+        while index < len(nodes):
+            node, scale = nodes[index]
+            index += 1
 
-    @left.setter
-    def left(self, node):
-        self.left = node
+            if node.left is None or node.right is None:
+                feature.append(LEAF)
+                threshold.append(0.0)
+                left.append(LEAF)
+                right.append(LEAF)
+                value.append(scale * np.atleast_1d(np.asarray(node.value, dtype=np.float64)))
+                continue
 
+            feature.append(node.feature)
+            threshold.append(node.threshold)
+            left.append(len(nodes))
+            nodes.append((node.left, scale * (1.0 if node.left_weight is None else node.left_weight)))
+            right.append(len(nodes))
+            nodes.append((node.right, scale * (1.0 if node.right_weight is None else node.right_weight)))
+            value.append(None)
+            # internal nodes get their value row once the output width is known
 
-    @right.setter
-    def right(self, node):
-        self.right = node
+        width = max(len(row) for row in value if row is not None)
+        value = np.array([np.zeros(width) if row is None else np.broadcast_to(row, (width,)) for row in value])
 
+        return cls(feature, threshold, left, right, value)
 
-    @left_weight.setter
-    def left_weight(self, weight):
-        self.left_weight = weight
 
+    def __len__(self):
+        return len(self.feature)
+
+
+    def __depth(self):
+        """
+        Computes the number of levels below the root.
+
+        :return: tree depth
+        :rtype: int
+        """
+
+        depth = 0
+        level = np.array([0])
+
+        while True:
+            internal = level[self.feature[level] != LEAF]
+
+            if len(internal) == 0:
+                return depth
+
+            level = np.concatenate((self.left[internal], self.right[internal]))
+            depth += 1
+
+
+# =========
+# INFERENCE
+# =========
+
+
+    def apply(self, X):
+        """
+        Finds the leaf reached by every row of a feature matrix.
+        Every row moves down one level per step, so the work is depth vectorized passes over the rows.
+
+        :param X: feature matrix, one row per sample
+        :type X: numpy.ndarray
+        :return: leaf node index of each row
+        :rtype: numpy.ndarray
+        """
+
+        X = np.asarray(X, dtype=np.float64)
+        nodes = np.zeros(len(X), dtype=np.int32)
+        samples = np.arange(len(X))
+
+        for _ in range(self.depth):
+            feature = self.feature[nodes]
+            internal = feature != LEAF
+
+            go_left = X[samples, np.maximum(feature, 0)] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, self.left[nodes], self.right[nodes]), nodes)
+            # rows already at a leaf stay there
+
+        return nodes
+
+
+    def predict(self, X):
+        """
+        Evaluates the tree for every row of a feature matrix.
+
+        :param X: feature matrix, one row per sample
+        :type X: numpy.ndarray
+        :return: output values of each row, shape (samples, outputs)
+        :rtype: numpy.ndarray
+        """
+
+        return self.value[self.apply(X)]
+
+
+    def decide(self, X):
+        """
+        Picks the highest-valued output for every row of a feature matrix (ties go to the lowest output index).
+
+        :param X: feature matrix, one row per sample
+        :type X: numpy.ndarray
+        :return: chosen output index of each row
+        :rtype: numpy.ndarray
+        """
+
+        return np.argmax(self.predict(X), axis=1)
+
+
+class Node:
+
+    def __init__(self, feature=None, threshold=0.0, value=0.0):
+        """
+        Node constructor.
+        A node with both children is a split on 'feature' (rows with a value <= 'threshold' go left); otherwise it is a leaf with output 'value'.
+
+        :param feature: feature index tested by the node
+        :param threshold: split threshold
+        :param value: leaf output value (scalar or one value per output)
+        :type feature: int
+        :type threshold: float
+        :type value: float or list
+        """
+
+        self.left = None
+        self.right = None
+
+        self.left_weight = None
+        self.right_weight = None
 
-    @right_weight.setter
-    def left_weight(self, weight):
-        self.right_weight = weight
\ No newline at end of file
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
@@ -1,154 +1,164 @@
 """
 Society Generator genetic algorithm maximizer implementation.
+The population is held as a 2-D genome matrix (candidates x genes) and every operator works on the whole matrix at once.
 
 :author: Max Milazzo
 """
 
 
-from random import random, uniform, randint
+import numpy as np
+from .selection import SELECTIONS
 # module imports
 
 
 # GA class
 class GA:
 
-    def __init__(self, mutation_chance=0.3, mutation_factor=0.3, crossover_chance=0.1, survival_chance=0.3):
+    def __init__(self, mutation_chance=0.3, mutation_factor=0.3, crossover_chance=0.1, survival_chance=0.3, offspring=None, selection="tournament", seed=None):
         """
         GA constructor.
-        
+
         :param mutation_chance: chance of mutation for each new child
         :param mutation_factor: defines the relative maximum percent that a gene can be altered during mutation
         :param crossover_chance: chance of genetic crossover occuring for each indidvual gene in all parents
         :param survival_chance: defines the cutoff percentile for parent survival
+        :param offspring: number of children bred per generation (None keeps the generation size constant)
+        :param selection: parent selection scheme, a name from selection.SELECTIONS or a callable with the same signature
+        :param seed: seed for the GA's random generator
         :type mutation_chance: float
         :type mutation_factor: float
         :type crossover_chance:float
         :type survival_chance: float
+        :type offspring: int
+        :type selection: str or callable
+        :type seed: int
         """
-        
-        self.data = []
-        self.fitness = []
+
+        self.data = np.empty((0, 0))
+        self.fitness = np.empty(0)
+        self.children = np.empty((0, 0))
         self.size = 0
         self.mutation_chance = mutation_chance
         self.mutation_factor = mutation_factor
         self.crossover_chance = crossover_chance
+        self.survival_chance = survival_chance
         self.survival_num = int(survival_chance * self.size)
+        self.offspring = offspring
+        self.rng = np.random.default_rng(seed)
+
+        if isinstance(selection, str):
+            selection = SELECTIONS[selection]
+
+        self.selection = selection
 
 
     def __select_parents(self):
         """
         Selects the best parents based on which had the highest maximization.
         """
-        
-        self.data.sort(reverse=True)
-        self.data = self.data[:self.survival_num]
 
+        survivors = np.argpartition(-self.fitness, self.survival_num - 1)[:self.survival_num]
+        # fittest parents, in no particular order
 
-    def __breed(self):
+        self.data = self.data[survivors]
+        self.fitness = self.fitness[survivors]
+        self.size = len(self.data)
+
+
+    def __breed(self, offspring):
         """
-        Combines population data to "breed" and create offspring.
-        
+        Combines population data to "breed" and create a fixed number of offspring.
+        Parent pairs are drawn from the surviving parents with the selection scheme.
+
+        :param offspring: number of children to breed
+        :type offspring: int
         :pre: parent data array size is at least 2
         """
-        
-        children = []
-        
-        for parent_1_index in range(self.size - 1):
-        # loops through parents
-        
-            for parent_2_index in range(parent_1_index + 1, self.size):
-            # selects breeding partner parent
-            
-                for interior_list_index in range(self.gene_count):
-                    
-                    child = []
-                    parent_1_data = self.data[parent_1_index][interior_list_index]
-                    parent_2_data = self.data[parent_2_index][interior_list_index]
-                    # gets data
-                        
-                    if random > 0.5:
-                    # 50% chance of getting average of traits, 25% chance of getting trait from each individual parent
-                    
-                        if random() > 0.5:
-                            child.append(parent_1_data)
-                        else:
-                            child.append(parent_2_data)
-                            
-                    else:
-                        child.append((parent_1_data + parent_2_data) / 2)
-                    
-                    children.append(child)
-        
-        self.data = children
-        self.size = len(children)
-        # sets children as new GA data values
+
+        parents = self.selection(self.fitness, 2 * offspring, self.rng).reshape(offspring, 2)
+        parent_1 = self.data[parents[:, 0]]
+        parent_2 = self.data[parents[:, 1]]
+
+        draw = self.rng.random(parent_1.shape)
+        # 50% chance of getting average of traits, 25% chance of getting trait from each individual parent
+
+        self.children = np.where(
+            draw < 0.5,
+            (parent_1 + parent_2) / 2,
+            np.where(draw < 0.75, parent_2, parent_1)
+        )
 
 
     def __crossover(self):
         """
         Crosses random genes between offspring.
         """
-        
-        for child_index in range(self.size):
-        
-            for gene_index in range(self.gene_count):
 
-                if self.crossover_chance > random():
-                
-                    crossover_child_index = randint(0, self.size)
-                    
-                    child_temp = self.data[child_index][gene_index]
-                    self.data[child_index][gene_index] = self.data[crossover_child_index][gene_index]
-                    self.data[crossover_child_index][gene_index] = child_temp
-                    # swaps genes at random index
+        count = len(self.children)
+        child_index, gene_index = np.nonzero(self.rng.random(self.children.shape) < self.crossover_chance)
+        crossover_child_index = self.rng.integers(0, count, len(child_index))
+
+        child_genes = self.children[child_index, gene_index]
+        crossover_genes = self.children[crossover_child_index, gene_index]
+
+        self.children[child_index, gene_index] = crossover_genes
+        self.children[crossover_child_index, gene_index] = child_genes
+        # swaps genes at random index (when several swaps touch the same gene the last one applied wins)
 
 
     def __mutate(self):
         """
         Mutates offspring.
         """
-        
-        for child_index in range(self.size):
-        
-            for gene_index in range(self.gene_count):
-            
-                if self.mutation_chance > random():
-                
-                    self.data[child_index][gene_index] *= (1 + self.mutation_factor) * random.uniform(-1, 1)
-                    # mutates random gene
-    
-        
+
+        mutated = self.rng.random(self.children.shape) < self.mutation_chance
+        factor = 1 + self.mutation_factor * self.rng.uniform(-1, 1, self.children.shape)
+
+        self.children *= np.where(mutated, factor, 1)
+        # mutates random genes
+
+
     def run(self, data, fitness):
         """
         Runs GA and returns its current data.
-        
-        :param data: a list of properly formatted genetic parents
+
+        :param data: properly formatted genetic parents (one row per parent)
         :param fitness: fitness values associated with data parents
-        :type data: list of list of floats
-        :type fitness: list of floats
+        :type data: numpy.ndarray or list of list of floats
+        :type fitness: numpy.ndarray or list of floats
         :return: GA data
-        :rtype: list of list of floats
+        :rtype: numpy.ndarray
         """
-        
+
         if (len(data) > 1):
         # parent data array must be of size 2 or greater
-        
-            self.data = data
-            self.size = len(data)
-            self.gene_count = len(data[0])
-            self.fitness = fitness
+
+            self.data = np.array(data, dtype=np.float64)
+            self.size, self.gene_count = self.data.shape
+            self.fitness = np.asarray(fitness, dtype=np.float64)
+            self.survival_num = max(2, int(self.survival_chance * self.size))
             # sets passed data
-            
+
+            offspring = self.offspring
+
+            if offspring is None:
+                offspring = self.size - self.survival_num
+                # generation size stays constant
+
             self.__select_parents()
-            self.__breed()
+            self.__breed(offspring)
             self.__crossover()
             self.__mutate()
             # runs GA functions
-            
+
+            self.data = np.concatenate((self.data, self.children))
+            self.size = len(self.data)
+            # surviving parents are carried into the next generation with their offspring
+
             return self.data
-            
+
         else:
         # prints usage message and returns -1 to signify error code
-        
-            print("GA Error: parent data array must be of size 2 or greater")            
+
+            print("GA Error: parent data array must be of size 2 or greater")
             return -1
\ No newline at end of file
@@ -1,3 +1,3 @@
 # adds optimization files to module
 
-__all__ = ["GA", "DT"]
\ No newline at end of file
+__all__ = ["GA", "DT", "selection", "cache", "halving", "histogram", "islands"]
\ No newline at end of file
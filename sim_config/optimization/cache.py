@@ -0,0 +1,195 @@
+"""
+Fitness memoization cache.
+Fitness values are keyed on a quantized, hashed genome together with the simulation config and seed, held in LRU order with a bounded number of entries, and can be persisted to disk between runs.
+"""
+
+
+import os
+from collections import OrderedDict
+from hashlib import blake2b
+import numpy as np
+# module imports
+
+
+class FitnessCache:
+
+    def __init__(self, maxsize=100000, quantum=1e-9, path=None):
+        """
+        FitnessCache constructor.
+
+        :param maxsize: maximum number of cached fitness values (least recently used values are evicted first)
+        :param quantum: genes that differ by less than this amount share a cache entry
+        :param path: .npz file used to persist the cache between runs (loaded now if it exists)
+        :type maxsize: int
+        :type quantum: float
+        :type path: str
+        """
+
+        self.maxsize = maxsize
+        self.quantum = quantum
+        self.path = path
+
+        self.entries = OrderedDict()
+        # key -> (fitness, simulation seconds it took to compute)
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+
+# ====
+# KEYS
+# ====
+
+
+    def genome_digest(self, genome):
+        """
+        Hashes a quantized genome.
+
+        :param genome: genes
+        :type genome: numpy.ndarray or list of floats
+        :return: 16-byte digest
+        :rtype: bytes
+        """
+
+        quantized = np.round(np.asarray(genome, dtype=np.float64) / self.quantum).astype(np.int64)
+
+        return blake2b(quantized.tobytes(), digest_size=16).digest()
+
+
+    def key(self, genome, config, seed):
+        """
+        Builds the cache key of a fitness evaluation.
+
+        :param genome: genes
+        :param config: simulation settings that affect fitness (must have a stable repr)
+        :param seed: simulation seed
+        :type genome: numpy.ndarray or list of floats
+        :type config: tuple
+        :type seed: int
+        :return: 16-byte cache key
+        :rtype: bytes
+        """
+
+        digest = blake2b(self.genome_digest(genome), digest_size=16)
+        digest.update(repr((config, seed)).encode())
+
+        return digest.digest()
+
+
+# ======
+# ACCESS
+# ======
+
+
+    def get(self, key):
+        """
+        Looks up a fitness value, counting the hit or miss.
+
+        :param key: cache key
+        :type key: bytes
+        :return: cached fitness (None if not cached)
+        :rtype: float
+        """
+
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.saved_seconds += entry[1]
+        # most recently used entries are kept at the end
+
+        return entry[0]
+
+
+    def put(self, key, fitness, seconds=0.0):
+        """
+        Stores a fitness value, evicting the least recently used values beyond 'maxsize'.
+
+        :param key: cache key
+        :param fitness: fitness value
+        :param seconds: simulation time the value took to compute
+        :type key: bytes
+        :type fitness: float
+        :type seconds: float
+        """
+
+        self.entries[key] = (fitness, seconds)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+    def stats(self):
+        """
+        Returns cache usage counters.
+
+        :return: hits, misses, hit rate, current size and simulation seconds saved by hits
+        :rtype: dict
+        """
+
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "saved_seconds": self.saved_seconds
+        }
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# ===========
+# PERSISTENCE
+# ===========
+
+
+    def save(self, path=None):
+        """
+        Writes the cache to disk (written to a temporary file first, so an interrupted save keeps the previous file).
+
+        :param path: .npz file (defaults to the constructor path)
+        :type path: str
+        """
+
+        path = path or self.path
+        temp_path = path + ".tmp"
+
+        keys = np.frombuffer(b"".join(self.entries.keys()), dtype=np.uint8).reshape(-1, 16)
+        values = np.array(list(self.entries.values()), dtype=np.float64).reshape(-1, 2)
+
+        with open(temp_path, "wb") as file:
+            np.savez(file, keys=keys, fitness=values[:, 0], seconds=values[:, 1], quantum=self.quantum)
+
+        os.replace(temp_path, path)
+
+
+    def load(self, path=None):
+        """
+        Reads cached values from disk (entries saved with a different quantum are ignored).
+
+        :param path: .npz file (defaults to the constructor path)
+        :type path: str
+        """
+
+        path = path or self.path
+
+        with np.load(path) as data:
+
+            if float(data["quantum"]) != self.quantum:
+                return
+
+            for key, fitness, seconds in zip(data["keys"], data["fitness"], data["seconds"]):
+                self.put(key.tobytes(), float(fitness), float(seconds))
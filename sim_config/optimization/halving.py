@@ -0,0 +1,152 @@
+"""
+Successive-halving (multi-fidelity) fitness evaluation.
+Every candidate is simulated for a short horizon, the weakest are culled, and the survivors are simulated again to longer horizons until the full horizon is reached.
+Simulations that fall below an alive or satisfaction floor are aborted early.
+"""
+
+
+from itertools import repeat
+import numpy as np
+# module imports
+
+
+class SuccessiveHalving:
+
+    def __init__(self, min_ticks=10, eta=3, alive_floor=0.0, satisfaction_floor=None):
+        """
+        SuccessiveHalving constructor.
+
+        :param min_ticks: horizon of the first rung
+        :param eta: horizon growth factor between rungs (the best 1/eta candidates of each rung are extended)
+        :param alive_floor: simulations whose alive fraction drops below this value are aborted
+        :param satisfaction_floor: simulations whose mean satisfaction of the living drops below this value are aborted (None disables the check)
+        :type min_ticks: int
+        :type eta: int
+        :type alive_floor: float
+        :type satisfaction_floor: float
+        """
+
+        self.min_ticks = min_ticks
+        self.eta = eta
+        self.alive_floor = alive_floor
+        self.satisfaction_floor = satisfaction_floor
+
+
+    def horizons(self, max_ticks):
+        """
+        Returns the cumulative horizon of every rung.
+
+        :param max_ticks: full simulation horizon
+        :type max_ticks: int
+        :return: rung horizons, ending with max_ticks
+        :rtype: list of ints
+        """
+
+        horizons = []
+        horizon = self.min_ticks
+
+        while horizon < max_ticks:
+            horizons.append(horizon)
+            horizon *= self.eta
+
+        horizons.append(max_ticks)
+
+        return horizons
+
+
+    def run(self, specs, max_ticks, simulate, mapper=map):
+        """
+        Evaluates candidates rung by rung.
+        Every rung simulates its candidates from the start up to the rung horizon, so only small specs and results cross process boundaries and no simulation is held between rungs.
+
+        :param specs: picklable simulation spec of every candidate (anything 'simulate' accepts)
+        :param max_ticks: full simulation horizon
+        :param simulate: function(spec, ticks, alive_floor, satisfaction_floor) simulating 'ticks' time periods from the start and returning (score, aborted, seconds)
+        :param mapper: map-like function used to run 'simulate' over the candidates of a rung (e.g. Executor.map)
+        :type specs: list
+        :type max_ticks: int
+        :type simulate: callable
+        :type mapper: callable
+        :return: fitness of every candidate, which candidates ran the full horizon without aborting, and the simulation seconds of every candidate's last rung
+        :rtype: tuple
+        """
+
+        specs = list(specs)
+        count = len(specs)
+        horizons = self.horizons(max_ticks)
+
+        scores = np.zeros(count)
+        seconds = np.zeros(count)
+        rung = np.zeros(count, dtype=int)
+        aborted = np.zeros(count, dtype=bool)
+
+        active = np.arange(count)
+
+        for level, horizon in enumerate(horizons):
+            results = mapper(
+                simulate,
+                [specs[index] for index in active],
+                repeat(horizon),
+                repeat(self.alive_floor),
+                repeat(self.satisfaction_floor)
+            )
+
+            for index, (score, stopped, elapsed) in zip(active, results):
+                scores[index] = score
+                seconds[index] = elapsed
+                rung[index] = level
+                aborted[index] = stopped
+
+            running = active[~aborted[active]]
+
+            if level == len(horizons) - 1:
+                break
+
+            keep = max(1, len(running) // self.eta)
+            order = np.argsort(-scores[running], kind="stable")
+            active = running[order[:keep]]
+            # best candidates of the rung are extended
+
+        complete = (rung == len(horizons) - 1) & ~aborted
+        fitness = self.__rank_fitness(scores, rung, aborted, len(horizons))
+
+        return fitness, complete, seconds
+
+
+    def __rank_fitness(self, scores, rung, aborted, levels):
+        """
+        Converts rung scores into fitness values that rank every candidate below those that went further.
+        Candidates that ran the full horizon keep their score; others keep their relative order but are shifted below the previous group.
+
+        :param scores: score of every candidate at the rung it stopped at
+        :param rung: last rung reached by every candidate
+        :param aborted: whether each candidate was aborted
+        :param levels: number of rungs
+        :type scores: numpy.ndarray
+        :type rung: numpy.ndarray
+        :type aborted: numpy.ndarray
+        :type levels: int
+        :return: fitness values
+        :rtype: numpy.ndarray
+        """
+
+        fitness = scores.copy()
+        floor = None
+        finite = np.isfinite(scores)
+        # candidates scored -inf (e.g. extinct societies) already rank below every other and keep their score
+
+        for level in range(levels - 1, -1, -1):
+            for stopped in (False, True):
+                group = (rung == level) & (aborted == stopped) & finite
+
+                if not group.any():
+                    continue
+
+                if floor is not None:
+                    top = scores[group].max()
+                    fitness[group] = np.nextafter(floor, -np.inf) - (top - scores[group])
+                    # group is placed just below every candidate that went further
+
+                floor = fitness[group].min()
+
+        return fitness
@@ -0,0 +1,305 @@
+"""
+Histogram-based decision tree training.
+Features are pre-binned into quantile bins, and splits are found from per-bin gradient and count histograms instead of sorting rows.
+Training streams over chunks of a simulation trace, one pass per tree level, so the trace never has to fit in memory. Each pass only builds the histograms of the smaller child of every split, and derives the larger child's as parent minus sibling.
+"""
+
+
+import numpy as np
+from .DT import DT, LEAF
+# module imports
+
+
+class QuantileBinner:
+
+    def __init__(self, bins=64):
+        """
+        QuantileBinner constructor.
+
+        :param bins: maximum number of bins per feature (at most 256)
+        :type bins: int
+        """
+
+        self.bins = bins
+        self.edges = None
+
+
+    def fit(self, sample):
+        """
+        Places bin edges at quantiles of a sample of the feature matrix.
+
+        :param sample: feature matrix sample
+        :type sample: numpy.ndarray
+        :return: the binner
+        :rtype: QuantileBinner
+        """
+
+        quantiles = np.linspace(0, 1, self.bins + 1)[1:-1]
+        self.edges = [np.unique(np.quantile(column, quantiles)) for column in np.asarray(sample, dtype=np.float64).T]
+        # duplicate quantiles (e.g. of discrete features) collapse into fewer bins
+
+        return self
+
+
+    def transform(self, X):
+        """
+        Maps a feature matrix to bin indices; bin b holds values in (edges[b - 1], edges[b]].
+
+        :param X: feature matrix
+        :type X: numpy.ndarray
+        :return: bin index of every value
+        :rtype: numpy.ndarray
+        """
+
+        X = np.asarray(X, dtype=np.float64)
+        binned = np.empty(X.shape, dtype=np.uint8)
+
+        for index, edges in enumerate(self.edges):
+            binned[:, index] = np.searchsorted(edges, X[:, index], side="left")
+
+        return binned
+
+
+    def threshold(self, feature, bin_index):
+        """
+        Returns the split threshold that sends bins <= 'bin_index' left.
+
+        :param feature: feature index
+        :param bin_index: last bin on the left
+        :type feature: int
+        :type bin_index: int
+        :return: threshold value
+        :rtype: float
+        """
+
+        return float(self.edges[feature][bin_index])
+
+
+class HistogramTrainer:
+
+    def __init__(self, max_depth=6, bins=64, min_samples_leaf=20, reg_lambda=1.0, sample_size=200000, seed=None):
+        """
+        HistogramTrainer constructor.
+
+        :param max_depth: maximum tree depth
+        :param bins: maximum number of quantile bins per feature (at most 256)
+        :param min_samples_leaf: minimum number of trace rows in a leaf
+        :param reg_lambda: L2 regularization of the leaf values
+        :param sample_size: number of trace rows sampled to place the bin edges
+        :param seed: seed of the row sampling
+        :type max_depth: int
+        :type bins: int
+        :type min_samples_leaf: int
+        :type reg_lambda: float
+        :type sample_size: int
+        :type seed: int
+        """
+
+        if not 2 <= bins <= 256:
+            raise ValueError("bins must be between 2 and 256")
+
+        self.max_depth = max_depth
+        self.bins = bins
+        self.min_samples_leaf = min_samples_leaf
+        self.reg_lambda = reg_lambda
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+
+
+    def fit(self, chunks):
+        """
+        Trains a regression tree (squared error, one or more outputs) on a streamed trace.
+
+        :param chunks: callable returning a fresh iterable of (X, y) chunks, with X of shape (rows, features) and y of shape (rows,) or (rows, outputs); it is called once per pass
+        :type chunks: callable
+        :return: trained tree (predicts the expected y of each row)
+        :rtype: DT
+        """
+
+        binner, base = self.__prepare(chunks)
+        self.binner = binner
+
+        feature, threshold, left, right, value = [LEAF], [0.0], [LEAF], [LEAF], [base]
+        histograms = dict(zip([0], self.__histograms(chunks, binner, base, DT(feature, threshold, left, right, value), [0])))
+        # node -> (gradient sums, counts) per feature and bin, for the nodes of the current level
+
+        for depth in range(self.max_depth):
+            splits = {}
+
+            for node, (gradient, count) in histograms.items():
+                split = self.__best_split(gradient, count)
+
+                if split is not None:
+                    splits[node] = split
+
+            smaller = []
+
+            for node, (split_feature, split_bin, left_stats, right_stats) in splits.items():
+                feature[node] = split_feature
+                threshold[node] = binner.threshold(split_feature, split_bin)
+                left[node], right[node] = len(feature), len(feature) + 1
+
+                for gradient, count in (left_stats, right_stats):
+                    feature.append(LEAF)
+                    threshold.append(0.0)
+                    left.append(LEAF)
+                    right.append(LEAF)
+                    value.append(base + gradient / (count + self.reg_lambda))
+
+                smaller.append(left[node] if left_stats[1] <= right_stats[1] else right[node])
+
+            if not splits or depth + 1 == self.max_depth:
+                break
+
+            tree = DT(feature, threshold, left, right, value)
+            built = dict(zip(smaller, self.__histograms(chunks, binner, base, tree, smaller)))
+            # one pass over the trace per level, for the smaller children only
+
+            level = {}
+
+            for node in splits:
+                small = left[node] if left[node] in built else right[node]
+                large = right[node] if small == left[node] else left[node]
+
+                level[small] = built[small]
+                level[large] = (histograms[node][0] - built[small][0], histograms[node][1] - built[small][1])
+                # subtraction trick: the larger child's histogram is its parent's minus its sibling's
+
+            histograms = level
+
+        return DT(feature, threshold, left, right, value)
+
+
+# ========
+# PASSES
+# ========
+
+
+    def __prepare(self, chunks):
+        """
+        First pass: samples trace rows uniformly to place the bin edges, and computes the mean target.
+
+        :param chunks: trace chunk source (see fit)
+        :type chunks: callable
+        :return: fitted binner and mean target
+        :rtype: tuple
+        """
+
+        sample = None
+        keys = np.empty(0)
+        total = 0.0
+        rows = 0
+
+        for X, y in chunks():
+            X = np.asarray(X, dtype=np.float64)
+            y = np.asarray(y, dtype=np.float64).reshape(len(X), -1)
+
+            total = total + y.sum(axis=0)
+            rows += len(X)
+
+            sample = X if sample is None else np.concatenate((sample, X))
+            keys = np.concatenate((keys, self.rng.random(len(X))))
+
+            if len(keys) > self.sample_size:
+                keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+                sample, keys = sample[keep], keys[keep]
+                # the rows with the smallest random keys form a uniform sample of the trace so far
+
+        if rows == 0:
+            raise ValueError("the trace is empty")
+
+        return QuantileBinner(self.bins).fit(sample), total / rows
+
+
+    def __histograms(self, chunks, binner, base, tree, nodes):
+        """
+        Builds the gradient and count histograms of some nodes in one pass over the trace.
+
+        :param chunks: trace chunk source (see fit)
+        :param binner: fitted binner
+        :param base: mean target
+        :param tree: tree grown so far (routes rows to their nodes)
+        :param nodes: nodes whose histograms are built
+        :type chunks: callable
+        :type binner: QuantileBinner
+        :type base: numpy.ndarray
+        :type tree: DT
+        :type nodes: list
+        :return: (gradient sums of shape (features, bins, outputs), counts of shape (features, bins)) of each node
+        :rtype: list
+        """
+
+        slots = np.full(len(tree), -1)
+        slots[nodes] = np.arange(len(nodes))
+        features = len(binner.edges)
+        cells = len(nodes) * features * self.bins
+
+        gradient = np.zeros((cells, len(base)))
+        count = np.zeros(cells)
+
+        for X, y in chunks():
+            X = np.asarray(X, dtype=np.float64)
+            y = np.asarray(y, dtype=np.float64).reshape(len(X), -1)
+
+            slot = slots[tree.apply(X)]
+            rows = slot >= 0
+
+            binned = binner.transform(X[rows]).astype(np.int64)
+            cell = ((slot[rows, None] * features + np.arange(features)) * self.bins + binned).ravel()
+            # one histogram cell per (row, feature)
+
+            count += np.bincount(cell, minlength=cells)
+
+            for output in range(len(base)):
+                gradient[:, output] += np.bincount(cell, weights=np.repeat(y[rows, output] - base[output], features), minlength=cells)
+
+        gradient = gradient.reshape(len(nodes), features, self.bins, len(base))
+        count = count.reshape(len(nodes), features, self.bins)
+
+        return list(zip(gradient, count))
+
+
+# =========
+# SPLITTING
+# =========
+
+
+    def __best_split(self, gradient, count):
+        """
+        Finds the split of a node with the largest squared-error reduction.
+
+        :param gradient: gradient sums of the node, shape (features, bins, outputs)
+        :param count: counts of the node, shape (features, bins)
+        :type gradient: numpy.ndarray
+        :type count: numpy.ndarray
+        :return: (feature, last left bin, (left gradient, left count), (right gradient, right count)), or None if no split helps
+        :rtype: tuple
+        """
+
+        left_gradient = np.cumsum(gradient, axis=1)
+        left_count = np.cumsum(count, axis=1)
+        total_gradient = left_gradient[0, -1]
+        total_count = left_count[0, -1]
+
+        right_gradient = total_gradient - left_gradient
+        right_count = total_count - left_count
+
+        gain = (
+            (left_gradient ** 2).sum(axis=2) / (left_count + self.reg_lambda)
+            + (right_gradient ** 2).sum(axis=2) / (right_count + self.reg_lambda)
+            - (total_gradient ** 2).sum() / (total_count + self.reg_lambda)
+        )
+
+        minimum = max(1, self.min_samples_leaf)
+        gain[(left_count < minimum) | (right_count < minimum)] = -np.inf
+
+        feature, bin_index = np.unravel_index(np.argmax(gain), gain.shape)
+
+        if not gain[feature, bin_index] > 1e-12:
+            return None
+
+        return (
+            int(feature), int(bin_index),
+            (left_gradient[feature, bin_index], left_count[feature, bin_index]),
+            (right_gradient[feature, bin_index], right_count[feature, bin_index])
+        )
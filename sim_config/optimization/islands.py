@@ -0,0 +1,234 @@
+"""
+Island-model genetic algorithm.
+Several GA islands evolve separate populations in their own worker processes, each evaluating its own candidates.
+Every few generations the islands send their best genomes to a coordinator over pipes, which forwards them along a ring or a random topology; migrants replace the receiving island's worst candidates.
+Migration rounds are synchronous, so results depend only on the seed and not on process timing.
+"""
+
+
+import multiprocessing
+import traceback
+import numpy as np
+from .GA import GA
+# module imports
+
+
+TOPOLOGIES = ("ring", "random")
+
+
+def _island(conn, genomes, evaluate, ga, generations, interval, migrants):
+    """
+    Island process body: runs the GA on one population and exchanges migrants through 'conn'.
+    Module level so that it can be started in a new process.
+
+    :param conn: pipe end connected to the coordinator
+    :param genomes: initial generation
+    :param evaluate: callable scoring a generation (genome matrix -> fitness values)
+    :param ga: the island's GA
+    :param generations: number of generations
+    :param interval: generations between migrations
+    :param migrants: number of genomes sent per migration
+    :type conn: multiprocessing.connection.Connection
+    :type genomes: numpy.ndarray
+    :type evaluate: callable
+    :type ga: GA
+    :type generations: int
+    :type interval: int
+    :type migrants: int
+    """
+
+    try:
+        best_genome = None
+        best_fitness = -np.inf
+
+        for generation in range(generations):
+            fitness = np.asarray(evaluate(genomes), dtype=np.float64)
+            best = int(np.argmax(fitness))
+
+            if best_genome is None or fitness[best] > best_fitness:
+                best_genome = genomes[best].copy()
+                best_fitness = float(fitness[best])
+
+            if IslandModel.migrates(generation, generations, interval):
+                top = np.argsort(-fitness, kind="stable")[:migrants]
+                conn.send(("migrants", genomes[top], fitness[top]))
+
+                incoming, incoming_fitness = conn.recv()
+                worst = np.argsort(fitness, kind="stable")[:len(incoming)]
+                genomes = genomes.copy()
+                genomes[worst] = incoming
+                fitness[worst] = incoming_fitness
+                # migrants replace the island's worst candidates before breeding
+
+            genomes = ga.run(genomes, fitness)
+
+        conn.send(("result", best_genome, best_fitness))
+
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+
+    finally:
+        conn.close()
+
+
+class IslandModel:
+
+    def __init__(self, islands=4, interval=5, migrants=2, topology="ring", seed=0, ga_options=None):
+        """
+        IslandModel constructor.
+
+        :param islands: number of islands (one worker process each)
+        :param interval: number of generations between migrations
+        :param migrants: number of best genomes each island sends per migration
+        :param topology: "ring" (island i sends to island i + 1) or "random" (a new random pairing every migration, never to itself)
+        :param seed: base seed of the islands' GAs and of the random topology
+        :param ga_options: keyword arguments of every island's GA (except seed)
+        :type islands: int
+        :type interval: int
+        :type migrants: int
+        :type topology: str
+        :type seed: int
+        :type ga_options: dict
+        """
+
+        if topology not in TOPOLOGIES:
+            raise ValueError("topology must be one of: {}".format(", ".join(TOPOLOGIES)))
+
+        self.islands = islands
+        self.interval = interval
+        self.migrants = migrants
+        self.topology = topology
+        self.seed = seed
+        self.ga_options = ga_options or {}
+
+
+    @staticmethod
+    def migrates(generation, generations, interval):
+        """
+        Tells whether islands migrate after evaluating a generation (never after the last one).
+
+        :param generation: generation index
+        :param generations: number of generations
+        :param interval: generations between migrations
+        :type generation: int
+        :type generations: int
+        :type interval: int
+        :return: migration flag
+        :rtype: bool
+        """
+
+        return interval > 0 and (generation + 1) % interval == 0 and generation + 1 < generations
+
+
+    def run(self, evaluate, generations, initial):
+        """
+        Evolves every island and returns the best genome found on any of them.
+
+        :param evaluate: picklable callable scoring a generation (genome matrix -> fitness values)
+        :param generations: number of generations per island
+        :param initial: initial generation of every island (at least 2 candidates each)
+        :type evaluate: callable
+        :type generations: int
+        :type initial: list of numpy.ndarray
+        :return: best genome, its fitness, and the (genome, fitness) best of each island
+        :rtype: tuple
+        """
+
+        if len(initial) != self.islands:
+            raise ValueError("expected one initial generation per island")
+
+        if min(len(genomes) for genomes in initial) < 2:
+            raise ValueError("every island needs at least 2 candidates")
+
+        seeds = np.random.SeedSequence(self.seed).spawn(self.islands + 1)
+        topology_rng = np.random.default_rng(seeds[-1])
+        # island GAs and the random topology draw from independent streams
+
+        context = multiprocessing.get_context()
+        connections = []
+        processes = []
+
+        for index in range(self.islands):
+            parent, child = context.Pipe()
+            ga = GA(seed=seeds[index], **self.ga_options)
+            args = (child, np.asarray(initial[index], dtype=np.float64), evaluate, ga, generations, self.interval, self.migrants)
+
+            process = context.Process(target=_island, args=args, name="GA-island-{}".format(index), daemon=True)
+            process.start()
+            child.close()
+
+            connections.append(parent)
+            processes.append(process)
+
+        try:
+            for generation in range(generations):
+                if not self.migrates(generation, generations, self.interval):
+                    continue
+
+                packets = [self.__receive(conn, "migrants") for conn in connections]
+                sources = self.__sources(topology_rng)
+
+                for conn, source in zip(connections, sources):
+                    conn.send(packets[source])
+                    # island i receives the migrants of island sources[i]
+
+            results = [self.__receive(conn, "result") for conn in connections]
+
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+
+                if process.is_alive():
+                    process.terminate()
+
+            for conn in connections:
+                conn.close()
+
+        best = max(range(self.islands), key=lambda index: results[index][1])
+
+        return results[best][0], results[best][1], results
+
+
+    def __sources(self, rng):
+        """
+        Picks which island each island receives migrants from in one migration round.
+
+        :param rng: topology random generator
+        :type rng: numpy.random.Generator
+        :return: source island of every island
+        :rtype: numpy.ndarray
+        """
+
+        if self.topology == "ring" or self.islands < 2:
+            return (np.arange(self.islands) - 1) % self.islands
+
+        while True:
+            sources = rng.permutation(self.islands)
+
+            if not (sources == np.arange(self.islands)).any():
+                return sources
+                # islands never receive their own migrants
+
+
+    @staticmethod
+    def __receive(conn, kind):
+        """
+        Receives a message of an expected kind from an island, re-raising island failures.
+
+        :param conn: pipe end connected to the island
+        :param kind: expected message kind
+        :type conn: multiprocessing.connection.Connection
+        :type kind: str
+        :return: message payload
+        :rtype: tuple
+        """
+
+        message = conn.recv()
+
+        if message[0] == "error":
+            raise RuntimeError("GA island failed:\n" + message[1])
+
+        if message[0] != kind:
+            raise RuntimeError("GA island sent '{}' while '{}' was expected".format(message[0], kind))
+
+        return message[1:]
@@ -0,0 +1,112 @@
+"""
+GA parent selection schemes.
+Every scheme takes the fitness vector of the breeding pool, the number of parents wanted and a NumPy random generator, and returns the pool indices of the chosen parents.
+"""
+
+
+import numpy as np
+# module imports
+
+
+def tournament(fitness, count, rng, size=3):
+    """
+    Tournament selection: each parent is the fittest of 'size' randomly drawn candidates.
+
+    :param fitness: fitness values of the breeding pool
+    :param count: number of parents to select
+    :param rng: random generator
+    :param size: tournament size
+    :type fitness: numpy.ndarray
+    :type count: int
+    :type rng: numpy.random.Generator
+    :type size: int
+    :return: selected pool indices
+    :rtype: numpy.ndarray
+    """
+
+    entrants = rng.integers(0, len(fitness), (count, size))
+    winners = np.argmax(fitness[entrants], axis=1)
+
+    return entrants[np.arange(count), winners]
+
+
+def _universal_sample(weights, count, rng):
+    """
+    Stochastic universal sampling: 'count' evenly spaced pointers with one random offset are laid over the cumulative weights.
+
+    :param weights: non-negative selection weights
+    :param count: number of parents to select
+    :param rng: random generator
+    :type weights: numpy.ndarray
+    :type count: int
+    :type rng: numpy.random.Generator
+    :return: selected pool indices, shuffled so that pairs do not always mate neighbours
+    :rtype: numpy.ndarray
+    """
+
+    if count == 0:
+        return np.empty(0, dtype=np.int64)
+
+    cumulative = np.cumsum(weights)
+    total = cumulative[-1]
+
+    if total <= 0:
+        return rng.integers(0, len(weights), count)
+        # no preference between candidates
+
+    pointers = (rng.random() + np.arange(count)) * (total / count)
+    selected = np.searchsorted(cumulative, pointers, side="right")
+
+    return rng.permutation(np.minimum(selected, len(weights) - 1))
+
+
+def proportional(fitness, count, rng):
+    """
+    Fitness-proportional selection using stochastic universal sampling.
+    Fitness is shifted so the least fit candidate has zero weight, since fitness values may be negative; candidates with -inf fitness are never selected.
+
+    :param fitness: fitness values of the breeding pool
+    :param count: number of parents to select
+    :param rng: random generator
+    :type fitness: numpy.ndarray
+    :type count: int
+    :type rng: numpy.random.Generator
+    :return: selected pool indices
+    :rtype: numpy.ndarray
+    """
+
+    finite = np.isfinite(fitness)
+
+    if not finite.any():
+        return rng.integers(0, len(fitness), count)
+        # no preference between candidates
+
+    return _universal_sample(np.where(finite, fitness - fitness[finite].min(), 0.0), count, rng)
+
+
+def rank(fitness, count, rng):
+    """
+    Linear rank selection: the fittest candidate gets weight n, the least fit weight 1.
+
+    :param fitness: fitness values of the breeding pool
+    :param count: number of parents to select
+    :param rng: random generator
+    :type fitness: numpy.ndarray
+    :type count: int
+    :type rng: numpy.random.Generator
+    :return: selected pool indices
+    :rtype: numpy.ndarray
+    """
+
+    weights = np.empty(len(fitness))
+    weights[np.argsort(fitness)] = np.arange(1, len(fitness) + 1)
+
+    return _universal_sample(weights, count, rng)
+
+
+SELECTIONS = {
+    "tournament": tournament,
+    "proportional": proportional,
+    "rank": rank
+}
+# selection schemes available by name
@@ -7,12 +7,49 @@ Configures person lifetime increment events.
 
 
 from math import log
-from random import random
+import numpy as np
+from .state import PopulationState, SEX_CODES
 # module imports
 
 
+MIN_UTILITY = 0.01
+# floor applied to a consumption value before it is used as a divisor (no consumption at all would otherwise divide by zero)
+
+
+def _column(name, tracked=False):
+    """
+    Builds a property that reads and writes one column of the backing state.
+
+    :param name: state column name
+    :param tracked: the column has a running aggregate over the living that must follow every write
+    :type name: str
+    :type tracked: bool
+    :return: column property
+    :rtype: property
+    """
+
+    def fget(self):
+        return getattr(self._state, name)[self._row]
+
+    def fset(self, value):
+        state = self._state
+        column = getattr(state, name)
+        old = column[self._row]
+        column[self._row] = value
+
+        if tracked and state.is_alive[self._row]:
+            state.totals[name][state.batch[self._row]] += column[self._row] - old
+            # running aggregate follows the change
+
+    return property(fget, fset)
+
+
 class Person:
 
+    __slots__ = ("_state", "_row")
+    # a person holds no attributes of its own, only its row in a PopulationState
+
+
 
 # =================
 # CLASS CONSTRUCTOR
@@ -22,9 +59,10 @@ class Person:
 # =================
 
 
-    def __init__(self, age=0, sex="R", infected=True, consumption=1, work_ability=1, work_intolerance=1, start_satisfaction=1, rest_init=10):
+    def __init__(self, age=0, sex="R", infected=True, consumption=1, work_ability=1, work_intolerance=1, start_satisfaction=1, rest_init=10, state=None, row=None):
         """
         Person class constructor.
+        Person values are written to row 'row' of 'state'; if no state is given the person gets a private single-row state.
         
         :param age: the age of a person, iterated for every single time period
         :param sex: defines the sex (as in gender, not the action of sexual intercourse) of a person
@@ -32,14 +70,28 @@ class Person:
         :param consumption: the amount that a person "needs" to consume relative to a "standard" value of 1 (larger value = more consumption needed)
         :param work_ability: how well a perosn can perform work to produce resources (larger value = more efficiency, value of 1 is "standard")
         :param work_intolerance: the rate at which a person loses satisfaction from having to work (larger value = greater dislike of work, value of 1 is "standard")
+        :param state: population state that stores this person's values
+        :param row: row of 'state' assigned to this person (a new row is added if not given)
         :type age: int
         :type sex: str (functionally of type chr)
         :type infected: bool
         :type consumption: float
         :type work_ability: float
         :type work_intolerance: float
+        :type state: PopulationState
+        :type row: int
         """
 
+        if state is None:
+            state = PopulationState(1)
+
+        if row is None:
+            row = state.add()[0]
+
+        self._state = state
+        self._row = row
+        # binds person to its state row
+
         # constant person values
         self.consumption_ratio = 1 / consumption
         self.work_ability = work_ability
@@ -50,7 +102,7 @@ class Person:
         if sex.upper() == "M" or sex.upper() == "F":
             self.sex = sex
         else:
-            if random() > 0.5:
+            if self._state.draw("sex", row) > 0.5:
                 self.sex = "M"
             else:
                 self.sex = "F"
@@ -61,7 +113,7 @@ class Person:
         self.rested = self.rest_init
 
         # time-contingent values
-        self.age = 0
+        self.age = age
         
         # infected setter computation
         if infected:
@@ -76,67 +128,193 @@ class Person:
         self.clothing = 0
 
 
+    @classmethod
+    def view(cls, state, row):
+        """
+        Returns a person bound to an existing state row without resetting its values.
+
+        :param state: population state
+        :param row: state row
+        :type state: PopulationState
+        :type row: int
+        :return: person view
+        :rtype: Person
+        """
+
+        person = cls.__new__(cls)
+        person._state = state
+        person._row = row
+
+        return person
+
+
+    @classmethod
+    def create_many(cls, state, age, infected, consumption, work_ability, work_intolerance=1, start_satisfaction=1, rest_init=10, batch=0, ptype=0, free=None):
+        """
+        Adds many people to a state at once, with the same defaults as the constructor and a random sex for each.
+        Every argument may be a scalar or an array with one value per new person.
+        
+        :param state: population state
+        :param age: ages
+        :param infected: infection flags
+        :param consumption: consumption needs
+        :param work_ability: work abilities
+        :param work_intolerance: work intolerances
+        :param start_satisfaction: starting satisfaction values
+        :param rest_init: initial rest values
+        :param batch: population copies the new people belong to
+        :param ptype: PDCL person types
+        :param free: free rows to reuse before appending new ones (see PopulationState.add)
+        :type state: PopulationState
+        :type free: numpy.ndarray
+        :return: rows of the new people
+        :rtype: numpy.ndarray
+        """
+        
+        count = len(np.asarray(age))
+        rows = state.add(count, free, batch)
+        
+        state.batch[rows] = batch
+        state.ptype[rows] = ptype
+        state.consumption_ratio[rows] = 1 / np.asarray(consumption, dtype=np.float64)
+        state.work_ability[rows] = work_ability
+        state.work_intolerance[rows] = work_intolerance
+        state.rest_init[rows] = rest_init
+        state.sex[rows] = np.where(state.uniform("sex", rows) > 0.5, 0, 1)
+        state.satisfaction[rows] = start_satisfaction
+        state.is_alive[rows] = True
+        state.rested[rows] = rest_init
+        state.age[rows] = age
+        state.infection[rows] = np.where(infected, 0, -1)
+        
+        for resource in ("food", "water", "shelter", "clothing"):
+            getattr(state, resource)[rows] = 0
+        
+        state.update_totals(state.row_totals(rows[:0]), state.row_totals(rows))
+        # new rows were not alive before
+        
+        return rows
+
+
+# ================
+# STATE COLUMNS
+# ================
+# person values are stored in the backing PopulationState
+# ================
+
+
+    age = _column("age")
+    satisfaction = _column("satisfaction", tracked=True)
+    rested = _column("rested")
+    rest_init = _column("rest_init")
+    consumption_ratio = _column("consumption_ratio")
+    work_ability = _column("work_ability")
+    work_intolerance = _column("work_intolerance")
+    food = _column("food", tracked=True)
+    water = _column("water", tracked=True)
+    shelter = _column("shelter", tracked=True)
+    clothing = _column("clothing", tracked=True)
+
+
+    @property
+    def infection(self):
+        return self._state.infection[self._row]
+
+
+    @infection.setter
+    def infection(self, value):
+        state = self._state
+        was_infected = int(state.infection[self._row] != -1)
+        state.infection[self._row] = value
+
+        if state.is_alive[self._row]:
+            state.totals["infected"][state.batch[self._row]] += int(value != -1) - was_infected
+
+
+    @property
+    def is_alive(self):
+        return bool(self._state.is_alive[self._row])
+
+
+    @is_alive.setter
+    def is_alive(self, value):
+        state = self._state
+        rows = np.array([self._row])
+        before = state.row_totals(rows)
+        state.is_alive[self._row] = value
+        state.update_totals(before, state.row_totals(rows))
+        # the person's contributions enter or leave the running aggregates
+
+
+    @property
+    def sex(self):
+        return SEX_CODES[self._state.sex[self._row]]
+
+
+    @sex.setter
+    def sex(self, value):
+        self._state.sex[self._row] = SEX_CODES.index(value.upper())
+
+
+    @property
+    def row(self):
+        return self._row
+
+
+    @property
+    def batch(self):
+        return int(self._state.batch[self._row])
+
+
 # =============================
 # PUBLIC VALUE ACCESS FUNCTIONS
 # =============================
 
 
-    @property
     def get_satisfaction(self):
         return self.satisfaction
 
     
-    @proprty
     def get_age(self):
         return self.age
         
         
-    @property
     def get_sex(self):
         return self.sex
     
     
-    @satisfy.setter
     def satisfy(self, amount):
         self.satisfaction += amount
         
         
-    @dissatisfy.setter
     def dissatisfy(self, amount):
         self.satisfaction -= amount
-
-
-    @property
-    def is_alive(self):
-        return self.is_alive
         
         
-    @property
     def infected(self):
-        return self.infected
+        return self.infection
         
     
-    @proprty
-    def rest(self, amount):
+    def rest(self, amount=None):
+        if amount is None:
+            amount = self.rest_init
+            # a full rest period restores the person's initial rest value
+        
         self.rested += amount
         
         
-    @tire.setter
     def tire(self, amount):
         self.rested -= amount
         
         
-    @die.setter
     def die(self):
         self.is_alive = False
         
         
-    @infection_progress.setter
     def infection_progress(self):
         self.infection += 1
         
         
-    @infection_state.setter
     def infection_recover(self):
         self.infection = -1
 
@@ -146,62 +324,50 @@ class Person:
 # ==========================
 
 
-    @property
     def get_food(self):
         return self.food
         
     
-    @property
     def get_water(self):
         return self.water
         
         
-    @property
     def get_shelter(self):
         return self.shelter
         
 
-    @property
     def get_clothing(self):
         return self.clothing
         
         
-    @gain_food.setter
     def gain_food(self, amount):
         self.food += amount
     
     
-    @gain_water.setter
     def gain_water(self, amount):
         self.water += amount
     
     
-    @gain_shelter.setter
     def gain_shelter(self, amount):
         self.shelter += amount
 
 
-    @gain_clothing.setter
     def gain_clothing(self, amount):
         self.clothing += amount
         
         
-    @lose_food.setter
     def lose_food(self, amount):
         self.food -= amount
         
     
-    @lose_water.setter
     def lose_water(self, amount):
         self.water -= amount
     
     
-    @lose_shelter.setter
     def lose_shelter(self, amount):
         self.shelter -= amount
     
     
-    @lose_clothing.setter
     def lose_clothing(self, amount):
         self.clothing -= amount
    
@@ -243,15 +409,15 @@ class Person:
             return self.get_food()
             # returns food amount on failure
     
-        food = 3 * self.consumption_ratio * __age_c() * log(c + 1)
+        food = 3 * self.consumption_ratio * self.__age_c() * log(c + 1)
         # relative food based on individual needs
         
         if food >= 0.7:
             self.satisfy(food)
-        elif food < 0.7 and food >= 0.2
+        elif food < 0.7 and food >= 0.2:
             self.dissatisfy(1 / food)
         else:
-            self.dissatisfy(10 / food)
+            self.dissatisfy(10 / max(food, MIN_UTILITY))
             self.die()
         
         return -1
@@ -272,7 +438,7 @@ class Person:
             return self.get_water()
             # returns water amount on failure
             
-        water = 3 * self.consumption_ratio * __age_c() * log(10 * c + 1)
+        water = 3 * self.consumption_ratio * self.__age_c() * log(10 * c + 1)
         # relative water based on individual needs
         
         if water >= 1:
@@ -280,7 +446,7 @@ class Person:
         elif water < 1 and c >= 0.4:
             self.dissatisfy(1 / water)
         else:
-            self.dissatisfy(10 / water)
+            self.dissatisfy(10 / max(water, MIN_UTILITY))
             self.die()
         
         return -1
@@ -298,7 +464,7 @@ class Person:
         if self.shelter < c:
             return self.get_shelter()
             
-        shelter = 2 * self.consumption_ratio * log(5 * C + 1)
+        shelter = 2 * self.consumption_ratio * log(5 * c + 1)
         # relative shelter based on individual needs
         
         if shelter < 1:
@@ -324,7 +490,7 @@ class Person:
             return self.get_clothing()
             # returns clothing amount on failure
             
-        clothing = 2 * self.consumption_ratio * log(10 * C + 1)
+        clothing = 2 * self.consumption_ratio * log(10 * c + 1)
         # relative clothing based on individual needs
     
         if clothing > 1:
@@ -379,7 +545,7 @@ class Person:
     
     # food production
     def _p_food(self, w):
-        eff_mult, int_mult = __age_p()
+        eff_mult, int_mult = self.__age_p()
         w_int = self.work_intolerance * int_mult * w
 
         # satisfaction calculations
@@ -403,7 +569,7 @@ class Person:
 
     # water production
     def _p_water(self, w):
-        eff_mult, int_mult = __age_p()
+        eff_mult, int_mult = self.__age_p()
         w_int = self.work_intolerance * int_mult * w
         
         # satisfaction calculations
@@ -429,8 +595,8 @@ class Person:
     def _p_shelter(self, w):
     
         # multiplier calculations
-        eff_mult_A, int_mult_A = __age_p()
-        eff_mult_S, int_mult_S = __sex_p_M()
+        eff_mult_A, int_mult_A = self.__age_p()
+        eff_mult_S, int_mult_S = self.__sex_p_M()
         eff_mult = eff_mult_A * eff_mult_S
         int_mult = int_mult_A * int_mult_S
         
@@ -441,7 +607,7 @@ class Person:
             self.dissatisfy(2 * w_int)
             self.tire(4 * w_int)
             
-            if random() < 0.1:
+            if self._state.draw("accident", self._row) < 0.1:
                 self.die()
                 # too much construction work leads to the possibility of death
             
@@ -464,8 +630,8 @@ class Person:
     def _p_clothing(self, w):
     
         # multiplier calculations
-        eff_mult_A, int_mult_A = __age_p()
-        eff_mult_S, int_mult_S = __sex_p_F()
+        eff_mult_A, int_mult_A = self.__age_p()
+        eff_mult_S, int_mult_S = self.__sex_p_F()
         eff_mult = eff_mult_A * eff_mult_S
         int_mult = int_mult_A * int_mult_S
 
@@ -518,7 +684,7 @@ class Person:
     
     # handles death possibility based on age
     def __death_age_chance(self):
-        if random() < (self.get_age() ** 2) / 100:
+        if self._state.draw("age_death", self._row) < (self.get_age() ** 2) / 100:
             self.die()
 
 
@@ -530,17 +696,17 @@ class Person:
     
     # handles infection
     def __infection_handle(self):
-        if self.infection() != -1:
+        if self.infection != -1:
         
-            self.infection_progress
-            self.dissatisfy(self.infection())
+            self.infection_progress()
+            self.dissatisfy(self.infection)
             
             # death
-            if random() * 5 < self.infection():
+            if self._state.draw("infection_death", self._row) * 5 < self.infection:
                 self.die()
             
             # recovery
-            elif random() * 3 > self.infection():
+            elif self._state.draw("infection_recover", self._row) * 3 > self.infection:
                 self.infection_recover()
                 
                 
@@ -555,15 +721,15 @@ class Person:
         resource_func_list = self.resource_funcs()
         
         for index in range(len(resource_func_list)):
-            self.resource_func_list[index][1](schema_list[index][1])
+            resource_func_list[index][1](schema_list[index][1])
             # produce resources
             
-            res = self.resource_func_list[index][0](schema_list[index][0])
+            res = resource_func_list[index][0](schema_list[index][0])
             # consume resources
             
             # handle if insufficient resources and consume all available
             if res != -1:
-                self.resource_func_list[index][0](res)
+                resource_func_list[index][0](res)
 
         
 # =============================================================================
@@ -604,5 +770,5 @@ class Person:
             self.__resource_manager(schema_list)
             # manage daily required resource consumption
             
-        return self.is_alive()
+        return self.is_alive
         # returns whether or not person is still alive
\ No newline at end of file
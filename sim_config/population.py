@@ -5,70 +5,178 @@ Defines a population (or group) containing many people.
 """
 
 
-from random import randint, uniform
-from optimization import GA, DT
+import numpy as np
+from . import kernel
+from .person import Person
+from .state import PopulationState, SEX_CODES, copy_rank
+from .archive import DeathArchive
+from .contact import ContactGraph
+from .ledger import Ledger
+from .checkpoint import write_checkpoint, read_checkpoint
+from .storage import CHUNK_SIZE, PREFETCH
+from .actions import ActionScheduler, ACTIONS
+from .optimization import DT
+
+
+DEFAULT_SCHEMA = [[1, 1], [1, 1], [1, 1], [1, 1]]
+# placeholder resource schema of [consumption, production] pairs used until schemas are generated
+
+EXTINCT_SCORE = -np.inf
+# score of a population copy in which no one is left alive (ranked below every surviving copy, whatever its satisfaction)
+
+
+# ========================
+# PERSON DATA CONSTRUCTION
+# ========================
+# List Format: [FREQUENCY, WORK_ABILITY, CONSUMPTION_NEEDS]
+# ========================
+
+PDCL = [
+
+    [0.05, 0, 0.5],  # no skill, low need
+    [0.05, 0.5, 0.5],  # low skill, low need
+    [0.1, 1, 0.5],  # med skill, low need
+    [0.05, 1.5, 0.5],  # high skill, low need
+
+    [0.05, 0, 1],  # no skill, med need
+    [0.1, 0.5, 1],  # low skill, med need
+    [0.2, 1, 1],  # med skill, med need
+    [0.1, 1.5, 1],  # high skill, med need
+
+    [0.05, 0, 1.5],  # no skill, high need
+    [0.1, 0.5, 1.5],  # low skill, high need
+    [0.1, 1, 1.5],  # med skill, high need
+    [0.05, 1.5, 1.5]  # high skill, high need
+    
+]
+# population data construction list (a person's type is their row)
+
+TYPE_COUNT = len(PDCL)
 
 
 class Population:
 
-    def __init__(self, size):
+    def __init__(self, size, schema=DEFAULT_SCHEMA, vectorized=True, seed=None, debug=False, archive=None, contacts=False, actions=None, policy=None, typed=False, storage=None, chunk_size=CHUNK_SIZE, prefetch=PREFETCH):
         """
         Population class constructor.
         
         :param size: population size
+        :param schema: resource schema shared by every person, or a stack of K schemas to simulate K independent copies of the population together (one per schema)
+        :param typed: the schema holds one resource schema per PDCL person type (shape (TYPE_COUNT, 4, 2), or (K, TYPE_COUNT, 4, 2) for K copies)
+        :param vectorized: run time periods through the whole-population tick kernel instead of per-person Person.run calls
+        :param seed: seed for the population's random number service
+        :param debug: cross-check the running aggregates against a full recompute, and audit resource conservation of the transaction ledger, after every time period
+        :param archive: path of the append-only file that receives the final records of people who die (None discards them)
+        :param contacts: spread the disease over a household/workplace contact graph every time period
+        :param actions: action name -> chance per time period that a person takes the action (None disables person actions, see actions.ACTIONS)
+        :param policy: decision tree choosing each person's action (see actions.ActionScheduler)
+        :param storage: directory of memory-mapped person columns, for populations larger than memory (None keeps the population in memory); out-of-core populations are built and ticked in chunks of 'chunk_size' people, and support neither batching nor contacts nor actions
+        :param chunk_size: people per chunk of an out-of-core population
+        :param prefetch: chunks read ahead of the one being processed
         :type size: int
+        :type schema: list or numpy.ndarray
+        :type typed: bool
+        :type vectorized: bool
+        :type seed: int
+        :type debug: bool
+        :type archive: str
+        :type contacts: bool
+        :type actions: dict
+        :type policy: DT.DT
+        :type storage: str
+        :type chunk_size: int
+        :type prefetch: int
         """
         
-        # ========================
-        # PERSON DATA CONSTRUCTION
-        # ========================
-        # List Format: [FREQUENCY, WORK_ABILITY, CONSUMPTION_NEEDS]
-        # ========================
+        self.state = PopulationState(size, seed, storage)
+        self.people = self.state
+        # people are row views over the array-backed population state
         
-        PDCL = [
+        self.typed = typed
+        self.schema = np.asarray(schema, dtype=np.float64)
+        self.batched = self.schema.ndim == (4 if typed else 3)
+        self.batches = len(self.schema) if self.batched else 1
+        self.__schema_table = None
+        self.vectorized = vectorized
+        self.debug = debug
+        self.storage = storage
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
         
-            [0.05, 0, 0.5]  # no skill, low need
-            [0.05, 0.5, 0.5]  # low skill, low need
-            [0.1, 1, 0.5]  # med skill, low need
-            [0.05, 1.5, 0.5]  # high skill, low need
+        if storage is not None and (self.batched or contacts or actions or policy is not None or not vectorized):
+            raise ValueError("out-of-core populations only support the vectorized tick of a single population copy without contacts or actions")
         
-            [0.05, 0, 1]  # no skill, med need
-            [0.1, 0.5, 1]  # low skill, med need
-            [0.2, 1, 1]  # med skill, med need
-            [0.1, 1.5, 1]  # high skill, med need
+        # adds people to population state
+        pdcl = np.array(PDCL)
+        bounds = np.cumsum((pdcl[:, 0] * size).astype(int))
+        count = int(bounds[-1])
+        step = chunk_size if storage is not None else max(count, 1)
+        # out-of-core populations are built one chunk at a time
         
-            [0.05, 0, 1.5]  # no skill, high need
-            [0.1, 0.5, 1.5]  # low skill, high need
-            [0.1, 1, 1.5]  # med skill, high need
-            [0.05, 1.5, 1.5]  # high skill, high need
+        for start in range(0, count, step):
+            agents = np.arange(start, min(start + step, count))
+            p_types = np.searchsorted(bounds, agents, side="right")
+            # people are ordered by PDCL type
             
-        ]
-        # population data construction list
-        
-        self.people = []
-        
-        # adds people to object list
-        for p_types in PDCL:
-            for p_count in range(PDCL[0] * size):
+            infection_state = self.state.rng.uniform(0, "infected", agents) < 0.01
+            # adds disease infection chance to person construction
             
-                infection_state = False
-                
-                # adds disease infection chance to person construction
-                if random() < 0.01:
-                    infection_state = True
-                    
-                self.people.append(Person(age=randint(0, 40), 
-                                    sex="R", 
-                                    infected=infection_state,
-                                    consumption=PDCL[2],
-                                    work_ability=PDCL[1]
-                )
+            ages = np.floor(self.state.rng.uniform(0, "age", agents) * 41)
+            # random integer age from 0 to 40
+            
+            Person.create_many(self.state,
+                               age=ages,
+                               infected=infection_state,
+                               consumption=pdcl[p_types, 2],
+                               work_ability=pdcl[p_types, 1],
+                               ptype=p_types
+            )
+        
+        self.contacts = ContactGraph.build(self.state, self.state.column("ptype")) if contacts else None
+        # contact graph used for disease spread
                 
-        # public community resources
-        self.food = 0
-        self.water = 0
-        self.shelter = 0
-        self.clothing = 0
+        if self.batched:
+            self.state = self.people = self.state.replicate(self.batches)
+            # one copy of the population per schema
+            
+            if self.contacts is not None:
+                self.contacts = self.contacts.replicate(self.batches)
+            
+        if storage is None:
+            self.alive_rows = np.flatnonzero(self.state.column("is_alive"))
+            # compact index of the living rows; time periods only visit these
+        else:
+            self.__alive_index = self.state.storage.allocate("alive_index", np.int64, count)
+            
+            for start in range(0, count, chunk_size):
+                self.__alive_index[start:start + chunk_size] = np.arange(start, min(start + chunk_size, count))
+            
+            self.alive_rows = self.__alive_index[:count]
+            # the alive index of an out-of-core population is a column file too (everyone starts alive)
+        
+        self.free_rows = np.empty(0, dtype=np.int64)
+        # rows of archived dead people, free to be reused
+        
+        self.archive = DeathArchive(archive) if archive is not None else None
+        
+        self.__birth_queue = []
+        # (parent row, parent row) pairs of this time period's births
+        
+        # public community resources (one pool per population copy)
+        self.food = np.zeros(self.batches)
+        self.water = np.zeros(self.batches)
+        self.shelter = np.zeros(self.batches)
+        self.clothing = np.zeros(self.batches)
+        
+        self.scheduler = ActionScheduler(actions or {}, self.contacts, policy) if actions or policy is not None else None
+        # each living person may take 1 additional action per time period
+        
+        self.ledger = Ledger(audit=debug)
+        # resource transfers of the current time period
+        
+        # births and deaths during the latest time period
+        self.births = 0
+        self.deaths = 0
 
 
 
@@ -78,129 +186,431 @@ class Population:
 # ===================
 
 
-    def birth(self):
+    def birth(self, p1, p2):
+        """
+        Requests the birth of a child of two people.
+        Births are queued and materialized together at the end of the time period (see __materialize_births).
+        
+        :param p1: parent
+        :param p2: parent
+        :type p1: Person
+        :type p2: Person
         """
+        
+        self.__birth_queue.append((p1.row, p2.row))
+        
+        
+    def __materialize_births(self):
         """
+        Adds every child requested this time period in one vectorized step.
+        Children reuse the rows of archived dead people of their own population copy first, and the state grows (by doubling) only when none are free.
+        Each child starts at age 0, uninfected, with its mother's person type, work ability and consumption needs, in its mother's population copy.
+        A child placed in a dead person's row takes over that person's contacts, which are all in the same copy, so copies stay unlinked.
+        """
+        
+        if not self.__birth_queue:
+            self.births = 0
+            return
+        
+        parents = np.array(self.__birth_queue)
+        self.__birth_queue = []
+        
+        state = self.state
+        mothers = np.where(state.sex[parents[:, 0]] == SEX_CODES.index("F"), parents[:, 0], parents[:, 1])
+        count = len(mothers)
+        
+        batch = state.batch[mothers].astype(np.int64)
+        free_batch = state.batch[self.free_rows].astype(np.int64)
+        free_order = np.argsort(free_batch, kind="stable")
+        # free rows grouped by copy, oldest first within each copy
+        
+        child_rank = copy_rank(batch)
+        available = np.bincount(free_batch, minlength=self.batches)
+        first_free = np.cumsum(available) - available
+        reusing = child_rank < available[batch]
+        # the k-th child of a copy takes the k-th free row of the same copy, while there are some
+        
+        reused = free_order[first_free[batch[reusing]] + child_rank[reusing]]
+        mothers = np.concatenate((mothers[reusing], mothers[~reusing]))
+        # children placed in free rows come first, as PopulationState.add reuses the free rows it is given before appending
+        
+        rows = Person.create_many(state,
+                                  age=np.zeros(count),
+                                  infected=np.zeros(count, dtype=bool),
+                                  consumption=1 / state.consumption_ratio[mothers],
+                                  work_ability=state.work_ability[mothers],
+                                  batch=state.batch[mothers],
+                                  ptype=state.ptype[mothers],
+                                  free=self.free_rows[reused]
+        )
+        
+        self.free_rows = np.delete(self.free_rows, reused)
+        self.alive_rows = np.sort(np.concatenate((self.alive_rows, rows)))
+        # rows stay in ascending order for sequential column access
+        
+        self.births = count
 
 
 # =======================
 # PERSON ACTION FUNCTIONS
 # =======================
-#
-#
+# actions are applied for everyone at once by the action scheduler (see the actions._a_* functions)
 # =======================
 
 
-    def _a_kill(self, killer, victim):
+# ===================================
+# PERSON OPTIMIZATION LOGIC FUNCTIONS
+# ===================================
+#
+# ===================================
+
+
+
+
+
+
+
+
+# =======================
+# POPULATION TIME HANDLER
+# =======================
+# Defines "run" function to move all people forward 1 unit in time
+# Additional private functions can be called here as well
+# =======================
+    
+    
+    def __get_resource_schema(self, rows):
         """
-        Kill action.
+        Builds the resource schema of every person in 'rows'.
+        The schema is a (copies x types x 4 x 2) table, so each person's schema is a single lookup by population copy and person type.
         
-        :param killer: killer
-        :param victim: victim being killed
+        :param rows: state rows
+        :type rows: numpy.ndarray
+        :return: schema of each row, shape (len(rows), 4, 2)
+        :rtype: numpy.ndarray
         """
         
-        killer.satisfy(uniform(-2, 1))
+        if self.__schema_table is None:
+            table = self.schema if self.batched else self.schema[None]
+            self.__schema_table = table if self.typed else table[:, None]
+            # shared (or per-copy) schemas become a table with a single type
         
-        victim.dissatisy(5)
-        victim.die()
-
-
-# =============================================================================
-# =============================================================================
-
-
-    def _a_sex(self, p1, p2):
+        table = self.__schema_table
+        
+        if table.shape[:2] == (1, 1):
+            return np.broadcast_to(table[0, 0], (len(rows),) + table.shape[2:])
+            # one schema for everyone needs no per-person copy
+        
+        batch = self.state.batch[rows] if table.shape[0] > 1 else 0
+        ptype = self.state.ptype[rows] if table.shape[1] > 1 else 0
+        
+        return table[batch, ptype]
+        
+        
+    def __compact(self):
+        """
+        Drops the people who died this time period from the alive index and archives their final records.
+        """
+        
+        if self.storage is not None:
+            return
+            # out-of-core populations are compacted chunk by chunk during the tick (see __tick_chunked)
+        
+        rows = self.alive_rows
+        alive = self.state.is_alive[rows]
+        
+        if alive.all():
+            return
+        
+        dead = rows[~alive]
+        
+        if self.archive is not None:
+            self.archive.append(self.state, dead)
+            
+        self.alive_rows = rows[alive]
+        self.free_rows = np.concatenate((self.free_rows, dead))
+        
+        
+    def __tick_chunked(self):
         """
+        Ticks an out-of-core population one chunk of living rows at a time, with the same kernel as in-memory populations.
+        Living rows are in ascending order, so each chunk reads and writes a contiguous stretch of every column file, and the next chunks are prefetched while one is processed.
+        Survivors are written back to the front of the alive index as the chunks go, and the dead are archived.
         """
         
-        p1.satisfy(5)
-        p2.satisfy(5)
+        index = self.__alive_index
+        count = len(self.alive_rows)
+        chunk = self.chunk_size
+        storage = self.state.storage
+        kept = 0
         
-        if p1.infected() != -1:
-            p2.infection_progress()
+        for start in range(0, count, chunk):
+            stop = min(start + chunk, count)
+            ahead = min(stop + self.prefetch * chunk, count)
             
-        if p2.infected() != -1:
-            p1.infection_progress()
+            if ahead > stop:
+                storage.prefetch(stop, ahead, ["alive_index"])
+                storage.prefetch(int(index[stop]), int(index[ahead - 1]) + 1, [name for name in storage.files if name != "alive_index"])
+                # the OS reads the next chunks while this one is processed
             
-        if p1.get_sex() != p2.get_sex():  # checks person genders
-            self.birth()
+            rows = np.array(index[start:stop])
+            alive = kernel.tick(self.state, rows, self.__get_resource_schema(rows))
+            
+            if self.archive is not None and not alive.all():
+                self.archive.append(self.state, rows[~alive])
+            
+            survivors = rows[alive]
+            index[kept:kept + len(survivors)] = survivors
+            kept += len(survivors)
+            # survivors never overtake the chunk being read
+        
+        self.alive_rows = index[:kept]
+        
+        
+    def __action_manager(self):
+        """
+        Runs the action phase of the time period for everyone still alive, then settles the time period's resource transfers.
+        """
 
+        pools = {"food": self.food, "water": self.water, "shelter": self.shelter, "clothing": self.clothing}
 
-# =============================================================================
-# =============================================================================
+        if self.scheduler is not None:
+            rows = self.alive_rows[self.state.is_alive[self.alive_rows]]
+            parents = self.scheduler.step(self.state, rows, pools, self.ledger)
+            self.__birth_queue.extend(map(tuple, parents.tolist()))
+        
+        self.ledger.apply(self.state, pools)
+        # every transfer recorded this time period is settled together
 
 
-    def _a_steal_per(self, item, robber, victim):
+    def run(self, schema=None):
         """
+        Moves every person in the population forward 1 unit in time.
+        
+        :param schema: replaces the population's resource schema (same layout as the constructor's)
+        :type schema: list or numpy.ndarray
         """
         
+        if schema is not None:
+            self.schema = np.asarray(schema, dtype=np.float64)
+            self.__schema_table = None
+        
+        alive_count = self.state.totals["alive"].sum()
+        rows = self.alive_rows
+        
+        if self.contacts is not None:
+            self.contacts.transmit(self.state, rows)
+            # contact spread happens before each person's own infection progression
+        
+        if self.storage is not None:
+            self.__tick_chunked()
+            
+        elif self.vectorized:
+            kernel.tick(self.state, rows, self.__get_resource_schema(rows))
+            # tick over the living
+            
+        else:
+            resource_schema = self.__get_resource_schema(rows)
+            # defines resource consumption/production decision schema
+            
+            for index, row in enumerate(rows.tolist()):
+                person = self.people[row]
+                person.run(np.asarray(resource_schema[index]).tolist())
+        
+        self.__action_manager()
+        # every person may take 1 additional action per time period (actions are batched for both paths)
+        
+        self.deaths = int(alive_count - self.state.totals["alive"].sum())
+        self.__compact()
+        self.__materialize_births()
+        self.state.tick += 1
         
-# =============================================================================
-# =============================================================================
+        if self.debug:
+            self.state.verify_totals()
 
 
-    def _a_steal_pop(self, item, robber):
+    def scores(self):
         """
+        Returns the total satisfaction of the people alive in each population copy.
+        
+        :return: one score per copy (EXTINCT_SCORE for copies with no one alive)
+        :rtype: numpy.ndarray
         """
-   
-
-# =============================================================================
-# =============================================================================
-
+        
+        totals = self.state.totals
 
-    def _a_donate_per(self, item, giver, receiver):
+        return np.where(totals["alive"] > 0, totals["satisfaction"], EXTINCT_SCORE)
+        # kept up to date by the running aggregates; an extinct copy's running sum (0 up to rounding error) is not used
+        
+        
+    def alive_values(self, name):
         """
+        Yields a column's values for the people alive, one chunk of 'chunk_size' people at a time (so an out-of-core population's columns are never read whole).
+        
+        :param name: column name
+        :type name: str
+        :return: iterator over the values of consecutive chunks of living rows
+        :rtype: generator
         """
-
-
-# =============================================================================
-# =============================================================================
-
-
-    def _a_donate_pop(self, item, giver, receiver):
+        
+        column = getattr(self.state, name)
+        rows = self.alive_rows
+        
+        for start in range(0, len(rows), self.chunk_size):
+            yield column[np.array(rows[start:start + self.chunk_size])]
+        
+        
+    def close(self):
         """
+        Closes the population's death archive, and the column files of an out-of-core population.
         """
+        
+        if self.archive is not None:
+            self.archive.close()
+        
+        self.state.close()
 
 
-# ===================================
-# PERSON OPTIMIZATION LOGIC FUNCTIONS
-# ===================================
-#
-# ===================================
-
-
-
-
-
-
+# ===========
+# CHECKPOINTS
+# ===========
 
 
-# =======================
-# POPULATION TIME HANDLER
-# =======================
-# Defines "run" function to move all people forward 1 unit in time
-# Additional private functions can be called here as well
-# =======================
-    
-    
-    def __get_resource_schema(self):
-        return [[]]
+    def checkpoint(self, path):
+        """
+        Atomically writes the whole population (people, contact graph, action policy, community pools) to a checkpoint file.
+        Checkpoints are taken between time periods.
         
+        :param path: checkpoint file
+        :type path: str
+        """
         
-    def __action_manager(self):
-        pass
-    
-
-    def run(self):
+        arrays, state_meta = self.state.snapshot()
+        
+        arrays.update({
+            "schema": self.schema,
+            "alive_rows": self.alive_rows,
+            "free_rows": self.free_rows,
+            "pools": np.stack([self.food, self.water, self.shelter, self.clothing])
+        })
+        
+        meta = {
+            "state": state_meta,
+            "typed": self.typed,
+            "vectorized": self.vectorized,
+            "debug": self.debug,
+            "births": self.births,
+            "deaths": self.deaths,
+            "contacts": None,
+            "chances": None,
+            "policy": False,
+            "archive": None,
+            "storage": None
+        }
+        
+        if self.storage is not None:
+            meta["storage"] = {"path": self.storage, "chunk_size": self.chunk_size, "prefetch": self.prefetch}
+            # out-of-core populations are restored into their storage directory
+        
+        if self.contacts is not None:
+            meta["contacts"] = {"size": self.contacts.size, "betas": {}}
+            
+            for name, (indptr, indices, beta) in self.contacts.layers.items():
+                arrays["contacts." + name + ".indptr"] = indptr
+                arrays["contacts." + name + ".indices"] = indices
+                meta["contacts"]["betas"][name] = beta
+        
+        if self.scheduler is not None:
+            meta["chances"] = self.scheduler.chances.tolist()
+            policy = self.scheduler.policy
+            
+            if policy is not None:
+                meta["policy"] = True
+                
+                for name in ("feature", "threshold", "left", "right", "value"):
+                    arrays["policy." + name] = getattr(policy, name)
+        
+        if self.archive is not None:
+            self.archive.flush()
+            meta["archive"] = {"path": self.archive.path, "bytes": self.archive.file.tell()}
+            # records archived after this checkpoint are dropped on restore, so they are not archived twice
+        
+        write_checkpoint(path, arrays, meta)
+        
+        
+    @classmethod
+    def restore(cls, path, mmap=True):
         """
+        Rebuilds a population from a checkpoint file.
+        An out-of-core population is restored out-of-core: its columns are copied, one chunk at a time, back into the column files of its storage directory.
+        
+        :param path: checkpoint file
+        :param mmap: memory-map the person columns of an in-memory population (copy-on-write) instead of reading them into memory
+        :type path: str
+        :type mmap: bool
+        :return: restored population
+        :rtype: Population
         """
         
-        resource_schema = self.__get_resource_schema()
-        # defines resource consumption/production decision schema
+        arrays, meta = read_checkpoint(path)
+        storage = meta["storage"] or {"path": None, "chunk_size": CHUNK_SIZE, "prefetch": PREFETCH}
+        
+        if storage["path"] is None and not mmap:
+            arrays = {name: np.array(array) for name, array in arrays.items()}
+            # an out-of-core population always reads the mapped checkpoint (chunk by chunk, into its storage), so its columns are never read whole
+        
+        population = cls.__new__(cls)
+        population.state = population.people = PopulationState.restore(arrays, meta["state"], storage["path"])
+        
+        population.typed = meta["typed"]
+        population.schema = np.array(arrays["schema"])
+        population.batched = population.schema.ndim == (4 if population.typed else 3)
+        population.batches = population.state.batches
+        population._Population__schema_table = None
+        population.vectorized = meta["vectorized"]
+        population.debug = meta["debug"]
+        population.storage = storage["path"]
+        population.chunk_size = storage["chunk_size"]
+        population.prefetch = storage["prefetch"]
         
-        for per_index in range(len(self.people)):
-            self.person[per_index].run(basic_schema[per_index])
+        if population.storage is not None:
+            population._Population__alive_index = population.alive_rows = population.state.storage.load("alive_index", arrays["alive_rows"])
+        else:
+            population.alive_rows = np.array(arrays["alive_rows"])
+        
+        population.free_rows = np.array(arrays["free_rows"])
+        population.food, population.water, population.shelter, population.clothing = np.array(arrays["pools"])
+        population.births = meta["births"]
+        population.deaths = meta["deaths"]
+        population._Population__birth_queue = []
+        population.ledger = Ledger(audit=population.debug)
+        
+        population.contacts = None
+        
+        if meta["contacts"] is not None:
+            layers = {
+                name: (arrays["contacts." + name + ".indptr"], arrays["contacts." + name + ".indices"], beta)
+                for name, beta in meta["contacts"]["betas"].items()
+            }
+            population.contacts = ContactGraph(layers, meta["contacts"]["size"])
+        
+        population.scheduler = None
+        
+        if meta["chances"] is not None:
+            policy = None
             
-            self.__action_manager(self.person[per_index])
-            # manages person run action
-            # person may take 1 additional action per time period
\ No newline at end of file
+            if meta["policy"]:
+                policy = DT.DT(*(arrays["policy." + name] for name in ("feature", "threshold", "left", "right", "value")))
+            
+            chances = {name: chance for name, chance in zip(ACTIONS, meta["chances"]) if chance}
+            population.scheduler = ActionScheduler(chances, population.contacts, policy)
+        
+        population.archive = None
+        
+        if meta["archive"] is not None:
+            with open(meta["archive"]["path"], "r+b") as file:
+                file.truncate(meta["archive"]["bytes"])
+            
+            population.archive = DeathArchive(meta["archive"]["path"])
+        
+        return population
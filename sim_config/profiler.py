@@ -0,0 +1,214 @@
+"""
+Per-phase profiling hooks.
+Enabling the profiler replaces the time handler phases of Person and Population, the tick kernel and action scheduler functions, and every _c_*/_p_*/_a_* function with timing wrappers; disabling it puts the original functions back, so a disabled profiler costs nothing.
+Times are inclusive: a phase's time includes the functions it calls (e.g. person.run includes person.resource_manager, which includes person._c_food).
+"""
+
+
+import functools
+from time import perf_counter
+import numpy as np
+from . import kernel, actions
+from .person import Person
+from .population import Population
+from .contact import ContactGraph
+from .ledger import Ledger
+from .actions import ActionScheduler
+# module imports
+
+
+PHASES = (
+    (Person, "run", "person.run"),
+    (Person, "_Person__death_age_chance", "person.death_age_chance"),
+    (Person, "_Person__rest_handle", "person.rest_handle"),
+    (Person, "_Person__infection_handle", "person.infection_handle"),
+    (Person, "_Person__resource_manager", "person.resource_manager"),
+    (Population, "run", "population.run"),
+    (Population, "_Population__get_resource_schema", "population.resource_schema"),
+    (Population, "_Population__action_manager", "population.action_manager"),
+    (Population, "_Population__compact", "population.compact"),
+    (Population, "_Population__materialize_births", "population.births"),
+    (ContactGraph, "transmit", "contacts.transmit"),
+    (ActionScheduler, "step", "actions.step"),
+    (ActionScheduler, "choose", "actions.choose"),
+    (ActionScheduler, "partners", "actions.partners"),
+    (ActionScheduler, "resolve", "actions.resolve"),
+    (Ledger, "apply", "ledger.apply"),
+    (kernel, "tick", "kernel.tick"),
+    (kernel, "resource_manager", "kernel.resource_manager")
+)
+# (owner, attribute, label) of every timed phase
+
+
+def _functions(owner, prefix, prefixes):
+    # (owner, attribute, label) of the owner's functions whose names start with one of 'prefixes'
+    return tuple(
+        (owner, name, prefix + name)
+        for name in sorted(vars(owner))
+        if name.startswith(prefixes) and callable(vars(owner)[name])
+    )
+
+
+TARGETS = (
+    PHASES
+    + _functions(Person, "person.", ("_c_", "_p_"))
+    + _functions(kernel, "kernel.", ("_c_", "_p_"))
+    + _functions(actions, "actions.", ("_a_",))
+)
+# every timed function (kernel._c_*/_p_* are the vectorized counterparts of person._c_*/_p_*, and actions._a_* apply each action for everyone who chose it)
+
+
+class Profiler:
+
+    def __init__(self, targets=TARGETS):
+        """
+        Profiler constructor; the profiler starts disabled.
+
+        :param targets: (owner, attribute, label) of every function to time
+        :type targets: tuple
+        """
+
+        self.targets = targets
+        self.labels = [label for _, _, label in targets]
+        self.enabled = False
+
+        self.seconds = [0.0] * len(targets)
+        self.calls = [0] * len(targets)
+        # running totals since the profiler was last reset
+
+        self.__marks = (list(self.seconds), list(self.calls))
+        # totals at the end of the previous tick (see collect)
+
+        self.__originals = []
+
+
+    def enable(self):
+        """
+        Starts timing every target.
+        """
+
+        if self.enabled:
+            return
+
+        for index, (owner, attribute, _) in enumerate(self.targets):
+            original = vars(owner)[attribute]
+            self.__originals.append((owner, attribute, original))
+
+            if isinstance(original, staticmethod):
+                setattr(owner, attribute, staticmethod(self.__wrap(original.__func__, index)))
+            else:
+                setattr(owner, attribute, self.__wrap(original, index))
+
+        self.enabled = True
+
+
+    def disable(self):
+        """
+        Stops timing and restores the original functions (recorded times are kept).
+        """
+
+        for owner, attribute, original in reversed(self.__originals):
+            setattr(owner, attribute, original)
+
+        self.__originals = []
+        self.enabled = False
+
+
+    def reset(self):
+        """
+        Clears every recorded time and call count.
+        """
+
+        self.seconds[:] = [0.0] * len(self.targets)
+        self.calls[:] = [0] * len(self.targets)
+        # cleared in place, since the wrappers hold these lists
+
+        self.__marks = (list(self.seconds), list(self.calls))
+
+
+    def __wrap(self, function, index):
+        """
+        Builds the timing wrapper of a target.
+
+        :param function: original function
+        :param index: target index
+        :type function: callable
+        :type index: int
+        :return: wrapper recording the time and calls of 'function' under target 'index'
+        :rtype: callable
+        """
+
+        seconds = self.seconds
+        calls = self.calls
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds[index] += perf_counter() - start
+                calls[index] += 1
+
+        return wrapper
+
+
+# =======
+# EXPORTS
+# =======
+
+
+    def dtype(self):
+        """
+        Returns the dtype of the per-tick breakdown records (see collect).
+
+        :return: record dtype with a tick field and a seconds and calls field per target
+        :rtype: numpy.dtype
+        """
+
+        fields = [("tick", np.int64)]
+
+        for label in self.labels:
+            fields += [(label + ".seconds", np.float64), (label + ".calls", np.int64)]
+
+        return np.dtype(fields)
+
+
+    def collect(self, tick):
+        """
+        Returns the time and calls of every target since the previous call, as a breakdown record of one tick.
+
+        :param tick: tick of the record
+        :type tick: int
+        :return: breakdown record (see dtype)
+        :rtype: tuple
+        """
+
+        seconds, calls = list(self.seconds), list(self.calls)
+        last_seconds, last_calls = self.__marks
+        self.__marks = (seconds, calls)
+
+        record = [tick]
+
+        for index in range(len(self.targets)):
+            record += [seconds[index] - last_seconds[index], calls[index] - last_calls[index]]
+
+        return tuple(record)
+
+
+    def summary(self):
+        """
+        Returns the recorded totals of every target that was called.
+
+        :return: label -> {"seconds", "calls"}, slowest first
+        :rtype: dict
+        """
+
+        order = sorted(range(len(self.targets)), key=lambda index: -self.seconds[index])
+
+        return {self.labels[index]: {"seconds": self.seconds[index], "calls": self.calls[index]} for index in order if self.calls[index]}
+
+
+PROFILER = Profiler()
+# shared profiler (the timed functions are class and module attributes, so there is one per process)
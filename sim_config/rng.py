@@ -0,0 +1,203 @@
+"""
+Counter-based random number service.
+Every draw is addressed by (seed, tick, agent, purpose): a Philox stream is keyed by the seed, its counter encodes the tick and purpose, and agent ids index into the stream.
+Dense sets of agent ids are drawn from NumPy's Philox generator; sparse ones evaluate the same Philox4x64-10 blocks for the requested agents only, so draws cost O(requested agents) rather than O(id span).
+Results are therefore the same however the population is split into chunks, batches or worker processes.
+"""
+
+
+import numpy as np
+# module imports
+
+
+PURPOSES = {
+    "sex": 0,
+    "age": 1,
+    "infected": 2,
+    "age_death": 3,
+    "infection_death": 4,
+    "infection_recover": 5,
+    "accident": 6,
+    "kill": 7,
+    "household": 8,
+    "workplace": 9,
+    "contact": 10,
+    "action": 11,
+    "partner": 12,
+    "item": 13
+}
+# purpose name -> stream id (new purposes must be appended so existing streams keep their ids)
+
+
+PHILOX_M = (0xD2E7470EE14C6C93, 0xCA5A826395121157)
+PHILOX_W = (0x9E3779B97F4A7C15, 0xBB67AE8584CAA73B)
+PHILOX_ROUNDS = 10
+MASK32 = 0xFFFFFFFF
+MASK64 = 0xFFFFFFFFFFFFFFFF
+# Philox4x64-10 constants (multipliers and Weyl key increments), as used by numpy.random.Philox
+
+DENSE_SPAN = 8
+# ids spanning up to this many times their count are drawn as a contiguous stream
+
+
+def _mulhilo(a, b):
+    """
+    Full 128-bit product of 64-bit words, emulated on uint64 arrays with 32-bit halves.
+
+    :param a: words
+    :param b: constant word
+    :type a: numpy.ndarray
+    :type b: int
+    :return: high and low 64 bits of a * b
+    :rtype: tuple
+    """
+
+    a_lo, a_hi = a & MASK32, a >> 32
+    b_lo, b_hi = b & MASK32, b >> 32
+
+    lh = a_lo * b_hi
+    hl = a_hi * b_lo
+    middle = ((a_lo * b_lo) >> 32) + (lh & MASK32) + (hl & MASK32)
+
+    return a_hi * b_hi + (lh >> 32) + (hl >> 32) + (middle >> 32), a * b
+    # uint64 products wrap, so a * b is the low word
+
+
+def philox(counter, key):
+    """
+    Philox4x64-10 block function (bit-identical to numpy.random.Philox).
+
+    :param counter: 4 counter words (Python ints, or uint64 arrays for one block per element)
+    :param key: 2 key words
+    :type counter: tuple
+    :type key: tuple of int
+    :return: 4 output words
+    :rtype: tuple
+    """
+
+    c0, c1, c2, c3 = counter
+    k0, k1 = key
+    m0, m1 = PHILOX_M
+
+    if isinstance(c0, int):
+        for _ in range(PHILOX_ROUNDS):
+            p0 = c0 * m0
+            p1 = c2 * m1
+            c0, c1, c2, c3 = (p1 >> 64) ^ c1 ^ k0, p1 & MASK64, (p0 >> 64) ^ c3 ^ k1, p0 & MASK64
+            k0 = (k0 + PHILOX_W[0]) & MASK64
+            k1 = (k1 + PHILOX_W[1]) & MASK64
+
+        return c0, c1, c2, c3
+        # single blocks skip the array helper's overhead
+
+    for _ in range(PHILOX_ROUNDS):
+        hi0, lo0 = _mulhilo(c0, PHILOX_M[0])
+        hi1, lo1 = _mulhilo(c2, PHILOX_M[1])
+        c0, c1, c2, c3 = hi1 ^ c1 ^ k0, lo1, hi0 ^ c3 ^ k1, lo0
+        k0 = (k0 + PHILOX_W[0]) & MASK64
+        k1 = (k1 + PHILOX_W[1]) & MASK64
+
+    return c0, c1, c2, c3
+
+
+class RNGService:
+
+    def __init__(self, seed=None):
+        """
+        RNGService constructor.
+
+        :param seed: base seed (None draws fresh entropy)
+        :type seed: int
+        """
+
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.key = self.seed_sequence.generate_state(2, dtype=np.uint64)
+
+
+    def uniform_range(self, tick, purpose, start, count):
+        """
+        Draws uniform [0, 1) values for a contiguous range of agent ids.
+
+        :param tick: time period
+        :param purpose: purpose name (see PURPOSES)
+        :param start: first agent id
+        :param count: number of agents
+        :type tick: int
+        :type purpose: str
+        :type start: int
+        :type count: int
+        :return: one value per agent id in [start, start + count)
+        :rtype: numpy.ndarray
+        """
+
+        block, offset = divmod(int(start), 4)
+        # Philox produces 4 outputs per counter value
+
+        counter = np.array([block, tick, PURPOSES[purpose], 0], dtype=np.uint64)
+        raw = np.random.Philox(key=self.key, counter=counter).random_raw(offset + count)[offset:]
+
+        return (raw >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+        # top 53 bits as a double in [0, 1)
+
+
+    def uniform(self, tick, purpose, agents):
+        """
+        Draws uniform [0, 1) values for arbitrary agent ids.
+
+        :param tick: time period
+        :param purpose: purpose name (see PURPOSES)
+        :param agents: agent ids
+        :type tick: int
+        :type purpose: str
+        :type agents: numpy.ndarray
+        :return: one value per agent id
+        :rtype: numpy.ndarray
+        """
+
+        agents = np.asarray(agents)
+
+        if len(agents) == 0:
+            return np.empty(0)
+
+        low = agents.min()
+        span = agents.max() - low + 1
+
+        if span <= DENSE_SPAN * len(agents):
+            values = self.uniform_range(tick, purpose, low, span)
+            return values[agents - low]
+            # the generator's stream is cheaper than per-agent blocks when few ids are skipped
+
+        agents = agents.astype(np.uint64)
+        zeros = np.zeros(len(agents), dtype=np.uint64)
+        words = philox((agents // np.uint64(4) + np.uint64(1), zeros + tick, zeros + PURPOSES[purpose], zeros), self.__key())
+        # the generator advances its counter before each block, so agent a gets word a % 4 of block a // 4 + 1
+
+        raw = np.choose((agents % np.uint64(4)).astype(np.intp), words)
+
+        return (raw >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+
+
+    def draw(self, tick, purpose, agent):
+        """
+        Draws the uniform [0, 1) value of a single agent.
+
+        :param tick: time period
+        :param purpose: purpose name (see PURPOSES)
+        :param agent: agent id
+        :type tick: int
+        :type purpose: str
+        :type agent: int
+        :return: uniform value
+        :rtype: float
+        """
+
+        agent = int(agent)
+        words = philox((agent // 4 + 1, tick, PURPOSES[purpose], 0), self.__key())
+
+        return (words[agent % 4] >> 11) * (1.0 / 9007199254740992.0)
+        # single blocks run on Python ints, which is much cheaper than a generator or length-1 arrays
+
+
+    def __key(self):
+        # key words as Python ints
+        return int(self.key[0]), int(self.key[1])
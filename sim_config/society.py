@@ -1,11 +1,566 @@
 """
 Defines the conditions of a society containing many people.
+The society "genes" are the resource schema values that the GA seeks to optimize.
 
 :author: Max Milazzo
 """
 
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from time import perf_counter
+import numpy as np
+from .population import Population, TYPE_COUNT
+from .checkpoint import write_checkpoint, read_checkpoint
+from .storage import CHUNK_SIZE, PREFETCH
+from .optimization.GA import GA
+from .optimization.cache import FitnessCache
+# module imports
+
+
+GENE_COUNT = TYPE_COUNT * 8
+# [consumption, production] values for each of the 4 resources, for each PDCL person type
+
+
+def genome_to_schema(genome):
+    """
+    Converts a flat genome into a population resource schema.
+
+    :param genome: society genes
+    :type genome: list of floats
+    :return: per-type resource schema ([consumption, production] pairs for the 4 resources of every PDCL person type)
+    :rtype: numpy.ndarray
+    """
+
+    return np.reshape(np.abs(genome), (TYPE_COUNT, 4, 2))
+    # negative work or consumption amounts are not meaningful
+
+
+def candidate_seed(seed, digest):
+    """
+    Derives the simulation seed of a single GA candidate.
+    Seeds depend only on the base seed and the candidate's (quantized) genes, so results do not depend on how evaluation is split between workers, and a candidate carried into a later generation is scored identically.
+
+    :param seed: base optimization seed
+    :param digest: candidate genome digest (see FitnessCache.genome_digest)
+    :type seed: int
+    :type digest: bytes
+    :return: candidate seed
+    :rtype: int
+    """
+
+    words = np.frombuffer(digest, dtype=np.uint32)
+
+    return int(np.random.SeedSequence([seed, *words.tolist()]).generate_state(1)[0])
+
+
+def build(genome, size, seed):
+    """
+    Builds the population used to score a genome.
+
+    :param genome: society genes, or a stack of per-type resource schemas for a batched population
+    :param size: population size
+    :param seed: simulation seed
+    :type genome: list of floats or numpy.ndarray
+    :type size: int
+    :type seed: int
+    :return: population following the genome's schema
+    :rtype: Population
+    """
+
+    schema = genome if np.ndim(genome) == 4 else genome_to_schema(genome)
+
+    return Population(size, schema=schema, seed=seed, typed=True)
+
+
+def scores(population):
+    """
+    Scores every copy of a population.
+
+    :param population: simulated population
+    :type population: Population
+    :return: total satisfaction of the people alive in each copy (population.EXTINCT_SCORE for copies with no one alive)
+    :rtype: numpy.ndarray
+    """
+
+    return population.scores()
+
+
+def score(population):
+    """
+    Scores a population.
+
+    :param population: simulated population
+    :type population: Population
+    :return: total satisfaction of the people alive (population.EXTINCT_SCORE if no one is alive)
+    :rtype: float
+    """
+
+    return float(scores(population)[0])
+
+
+def evaluate(genome, size, ticks, seed):
+    """
+    Scores a genome by simulating a population that follows its schema.
+    Module level so that it can be sent to worker processes.
+
+    :param genome: society genes
+    :param size: population size
+    :param ticks: number of time periods simulated
+    :param seed: simulation seed
+    :type genome: list of floats
+    :type size: int
+    :type ticks: int
+    :type seed: int
+    :return: total satisfaction of the people alive at the end of the simulation (population.EXTINCT_SCORE if no one is alive)
+    :rtype: float
+    """
+
+    population = build(genome, size, seed)
+
+    for _ in range(ticks):
+        population.run()
+
+    return score(population)
+
+
+def evaluate_batch(genomes, size, ticks, seed):
+    """
+    Scores several genomes in one vectorized run over a population with one copy per genome.
+    Every copy starts from the same people and sees the same random draws, so each score equals evaluate(genome, size, ticks, seed).
+
+    :param genomes: society genes of every candidate
+    :param size: population size
+    :param ticks: number of time periods simulated
+    :param seed: simulation seed shared by the candidates
+    :type genomes: list of list of floats
+    :type size: int
+    :type ticks: int
+    :type seed: int
+    :return: fitness of every candidate and simulation seconds per candidate
+    :rtype: tuple
+    """
+
+    start = perf_counter()
+    schemas = np.abs(np.asarray(genomes, dtype=np.float64)).reshape(-1, TYPE_COUNT, 4, 2)
+    population = build(schemas, size, seed)
+
+    for _ in range(ticks):
+        population.run()
+
+    return scores(population).tolist(), (perf_counter() - start) / len(schemas)
+
+
+def timed_evaluate(genome, size, ticks, seed):
+    """
+    Runs evaluate() and also returns how long the simulation took.
+
+    :return: fitness and simulation seconds
+    :rtype: tuple
+    """
+
+    start = perf_counter()
+    fitness = evaluate(genome, size, ticks, seed)
+
+    return fitness, perf_counter() - start
+
+
+class CandidateEvaluator:
+
+    def __init__(self, size, ticks, seed):
+        """
+        CandidateEvaluator constructor; scores whole generations with its own fitness cache (e.g. inside a GA island process).
+
+        :param size: population size
+        :param ticks: number of time periods simulated
+        :param seed: base optimization seed
+        :type size: int
+        :type ticks: int
+        :type seed: int
+        """
+
+        self.size = size
+        self.ticks = ticks
+        self.seed = seed
+        self.cache = FitnessCache()
+
+
+    def __call__(self, genomes):
+        """
+        Scores a generation, simulating only the candidates whose fitness is not cached.
+
+        :param genomes: generation candidates
+        :type genomes: numpy.ndarray
+        :return: candidate fitness values
+        :rtype: list of floats
+        """
+
+        config = (self.size, self.ticks)
+        fitness = []
+
+        for genome in genomes:
+            seed = candidate_seed(self.seed, self.cache.genome_digest(genome))
+            key = self.cache.key(genome, config, seed)
+            value = self.cache.get(key)
+
+            if value is None:
+                value, seconds = timed_evaluate(genome, self.size, self.ticks, seed)
+                self.cache.put(key, value, seconds)
+
+            fitness.append(value)
+
+        return fitness
+
+
+def evaluate_horizon(spec, ticks, alive_floor, satisfaction_floor):
+    """
+    Simulates a successive-halving candidate from the start up to a rung horizon (see SuccessiveHalving.run).
+    The whole simulation stays in the calling process (e.g. one worker); only the spec and the result are passed between processes.
+
+    :param spec: (genome, size, seed) of the candidate
+    :param ticks: rung horizon (time periods from the start)
+    :param alive_floor: abort if the alive fraction drops below this value
+    :param satisfaction_floor: abort if the mean satisfaction of the living drops below this value (None disables the check)
+    :type spec: tuple
+    :type ticks: int
+    :type alive_floor: float
+    :type satisfaction_floor: float
+    :return: score, whether the simulation was aborted, and simulation seconds
+    :rtype: tuple
+    """
+
+    start = perf_counter()
+    population = build(*spec)
+    totals = population.state.totals
+    aborted = False
+
+    for _ in range(ticks):
+        population.run()
+
+        alive_count = totals["alive"][0]
+
+        if alive_count == 0 or alive_count < alive_floor * len(population.state):
+            aborted = True
+        elif satisfaction_floor is not None:
+            aborted = totals["satisfaction"][0] / alive_count < satisfaction_floor
+
+        if aborted:
+            break
+
+    return score(population), aborted, perf_counter() - start
+
+
 class Society:
 
-    def __init__(self):
+    def __init__(self, size=1000, ticks=100, generation_size=50, workers=1, seed=0, cache=None, halving=None, batch_size=None, archive=None, islands=None, storage=None, chunk_size=CHUNK_SIZE, prefetch=PREFETCH):
+        """
+        Society class constructor.
+
+        :param size: population size
+        :param ticks: number of time periods simulated to score each GA candidate
+        :param generation_size: number of candidates in the initial GA generation
+        :param workers: number of worker processes used for candidate evaluation (None uses every core)
+        :param seed: base seed for optimization and simulation
+        :param cache: fitness cache shared between generations (and runs, if it has a path); a new in-memory cache is used if not given
+        :param halving: successive-halving evaluator (None simulates every candidate for the full 'ticks' horizon)
+        :param batch_size: number of candidates simulated together in one batched population run (None simulates each candidate separately; ignored with halving)
+        :param archive: path of the death archive of the simulated society (candidate evaluations are never archived)
+        :param islands: island model that runs the GA as several islands in separate processes (each island evaluates its own candidates, so workers, halving and batch_size do not apply)
+        :param storage: directory of the simulated society's memory-mapped person columns, for populations larger than memory (candidate evaluations always run in memory)
+        :param chunk_size: people per chunk of an out-of-core population
+        :param prefetch: chunks read ahead of the one being processed
+        :type size: int
+        :type ticks: int
+        :type generation_size: int
+        :type workers: int
+        :type seed: int
+        :type cache: FitnessCache
+        :type halving: SuccessiveHalving
+        :type batch_size: int
+        :type archive: str
+        :type islands: IslandModel
+        :type storage: str
+        :type chunk_size: int
+        :type prefetch: int
+        """
+
+        if cache is None:
+            cache = FitnessCache()
+
+        self.size = size
+        self.ticks = ticks
+        self.generation_size = generation_size
+        self.workers = workers
+        self.seed = seed
+        self.cache = cache
+        self.halving = halving
+        self.batch_size = batch_size
+        self.archive = archive
+        self.islands = islands
+        self.storage = storage
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
+
+        self.ga = GA(seed=seed)
+        self.genome = None
+        self.fitness = None
+        self.population = None
+
+
+# ============
+# OPTIMIZATION
+# ============
+
+
+    def __evaluate(self, genomes, executor, workers):
+        """
+        Scores every candidate of a generation, simulating only those whose fitness is not cached.
+
+        :param genomes: generation candidates
+        :param executor: worker pool (None evaluates in this process)
+        :param workers: number of processes in the worker pool
+        :type genomes: numpy.ndarray
+        :type executor: concurrent.futures.Executor
+        :type workers: int
+        :return: candidate fitness values
+        :rtype: list of floats
         """
-        """
\ No newline at end of file
+
+        config = (self.size, self.ticks)
+        fitness = [None] * len(genomes)
+        pending = {}
+        # cache key -> (candidate indices, genome, seed) of the candidates that must be simulated
+
+        batched = self.batch_size is not None and self.halving is None
+        shared_seed = candidate_seed(self.seed, b"")
+        # batched candidates share one starting population, and so one seed
+
+        for index, genome in enumerate(genomes):
+            if batched:
+                seed = shared_seed
+            else:
+                seed = candidate_seed(self.seed, self.cache.genome_digest(genome))
+
+            key = self.cache.key(genome, config, seed)
+
+            if key in pending:
+                pending[key][0].append(index)
+                continue
+                # duplicate genome within this generation is simulated once
+
+            fitness[index] = self.cache.get(key)
+
+            if fitness[index] is None:
+                pending[key] = ([index], genome, seed)
+
+        jobs = list(pending.values())
+        mapper = map
+
+        if executor is not None:
+            chunksize = max(1, len(jobs) // (4 * workers))
+            mapper = lambda *args: executor.map(*args, chunksize=chunksize)
+            # a few chunks per worker balances load without per-candidate messaging
+
+        if batched:
+            groups = [jobs[start:start + self.batch_size] for start in range(0, len(jobs), self.batch_size)]
+            args = ([[job[1] for job in group] for group in groups], repeat(self.size), repeat(self.ticks), repeat(shared_seed))
+            results = [(value, seconds) for values, seconds in mapper(evaluate_batch, *args) for value in values]
+            complete = [True] * len(jobs)
+
+        elif self.halving is None:
+            args = ([job[1] for job in jobs], repeat(self.size), repeat(self.ticks), [job[2] for job in jobs])
+            results = list(mapper(timed_evaluate, *args))
+            complete = [True] * len(jobs)
+
+        else:
+            specs = [(job[1], self.size, job[2]) for job in jobs]
+            values, complete, durations = self.halving.run(specs, self.ticks, evaluate_horizon, mapper)
+            results = list(zip(values, durations))
+            # culled candidates are ranked against this generation only, so only full-horizon results are cached
+
+        for key, job, (value, seconds), cacheable in zip(pending, jobs, results, complete):
+
+            if cacheable:
+                self.cache.put(key, value, seconds)
+
+            for index in job[0]:
+                fitness[index] = value
+
+        return fitness
+
+
+    def optimize(self, runs=1000, workers=None, checkpoint=None, checkpoint_every=10):
+        """
+        Runs the GA to find the schema genes that maximize societal satisfaction.
+
+        :param runs: number of GA generations (at least 1)
+        :param workers: number of worker processes (overrides the constructor value if given)
+        :param checkpoint: GA checkpoint file, resumed from if it exists and rewritten as generations complete (not supported with islands)
+        :param checkpoint_every: number of generations between checkpoints (the last generation is always checkpointed)
+        :type runs: int
+        :type workers: int
+        :type checkpoint: str
+        :type checkpoint_every: int
+        :return: best genome found
+        :rtype: list of floats
+        """
+
+        if runs < 1:
+            raise ValueError("the GA must run at least 1 generation")
+
+        if workers is None:
+            workers = self.workers
+
+        if workers is None:
+            workers = os.cpu_count()
+
+        rng = np.random.default_rng(self.seed)
+
+        if self.islands is not None:
+            if checkpoint is not None:
+                raise ValueError("island GA runs cannot be checkpointed")
+
+            initial = [rng.uniform(0, 2, (self.generation_size, GENE_COUNT)) for _ in range(self.islands.islands)]
+            genome, self.fitness, _ = self.islands.run(CandidateEvaluator(self.size, self.ticks, self.seed), runs, initial)
+            self.genome = genome.tolist()
+
+            self.population = Population(self.size, schema=genome_to_schema(self.genome), seed=self.seed, archive=self.archive, typed=True, **self.__storage_options())
+            # society is run with the best schema found on any island
+
+            return self.genome
+
+        start = 0
+
+        if checkpoint is not None and os.path.exists(checkpoint):
+            start, genomes = self.__resume(checkpoint)
+        else:
+            genomes = rng.uniform(0, 2, (self.generation_size, GENE_COUNT))
+            # random initial generation
+
+        executor = None
+
+        if workers != 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+
+        try:
+            for generation in range(start, runs):
+                fitness = self.__evaluate(genomes, executor, workers)
+
+                best = int(np.argmax(fitness))
+
+                if self.fitness is None or fitness[best] > self.fitness:
+                    self.genome = genomes[best].tolist()
+                    self.fitness = fitness[best]
+                    # keeps best candidate seen so far
+
+                genomes = self.ga.run(genomes, fitness)
+
+                if isinstance(genomes, int):
+                    break
+                    # GA can no longer breed
+
+                if checkpoint is not None and ((generation + 1) % checkpoint_every == 0 or generation + 1 == runs):
+                    self.__checkpoint(checkpoint, generation + 1, genomes, fitness)
+
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+            if self.cache.path is not None:
+                self.cache.save()
+
+        self.population = Population(self.size, schema=genome_to_schema(self.genome), seed=self.seed, archive=self.archive, typed=True, **self.__storage_options())
+        # society is run with the best schema found
+
+        return self.genome
+
+
+    def __checkpoint(self, path, generation, genomes, fitness):
+        """
+        Writes the GA state reached after 'generation' generations (and saves the fitness cache if it has a path).
+
+        :param path: checkpoint file
+        :param generation: number of completed generations
+        :param genomes: next generation to evaluate
+        :param fitness: fitness of the latest evaluated generation
+        :type path: str
+        :type generation: int
+        :type genomes: numpy.ndarray
+        :type fitness: list of floats
+        """
+
+        arrays = {
+            "genomes": np.asarray(genomes, dtype=np.float64),
+            "fitness": np.asarray(fitness, dtype=np.float64),
+            "best_genome": np.asarray(self.genome if self.genome is not None else [], dtype=np.float64)
+        }
+
+        meta = {
+            "generation": generation,
+            "best_fitness": self.fitness,
+            "ga_rng": self.ga.rng.bit_generator.state
+        }
+
+        write_checkpoint(path, arrays, meta)
+
+        if self.cache.path is not None:
+            self.cache.save()
+
+
+    def __resume(self, path):
+        """
+        Restores the GA state from a checkpoint.
+
+        :param path: checkpoint file
+        :type path: str
+        :return: number of completed generations and the next generation to evaluate
+        :rtype: tuple
+        """
+
+        arrays, meta = read_checkpoint(path, mmap=False)
+
+        self.ga.rng.bit_generator.state = meta["ga_rng"]
+        self.fitness = meta["best_fitness"]
+        self.genome = arrays["best_genome"].tolist() if meta["best_fitness"] is not None else None
+
+        return meta["generation"], arrays["genomes"]
+
+
+# ============
+# TIME HANDLER
+# ============
+
+
+    def run(self):
+        """
+        Moves the society forward 1 unit in time.
+        """
+
+        self.populate()
+        self.population.run()
+
+
+    def populate(self):
+        """
+        Creates the simulated society's population (with the default schema) if neither optimization nor a checkpoint provided one.
+
+        :return: simulated population
+        :rtype: Population
+        """
+
+        if self.population is None:
+            self.population = Population(self.size, seed=self.seed, archive=self.archive, **self.__storage_options())
+
+        return self.population
+
+
+    def __storage_options(self):
+        """
+        Returns the storage keyword arguments of the simulated society's population.
+
+        :return: Population storage keyword arguments
+        :rtype: dict
+        """
+
+        return {"storage": self.storage, "chunk_size": self.chunk_size, "prefetch": self.prefetch}
@@ -0,0 +1,438 @@
+"""
+Array-backed (structure-of-arrays) storage for per-person state.
+Every person attribute is held in its own contiguous NumPy column, and a
+Person object is only a lightweight view over a single row.
+"""
+
+
+import numpy as np
+from .rng import RNGService
+from .storage import ColumnStore
+# module imports
+
+
+# ==============
+# COLUMN LAYOUT
+# ==============
+# column name -> dtype
+# sex is stored as an index into SEX_CODES, ptype as an index into the population's PDCL person types
+# agent is a person's id within its population copy, batch the copy it belongs to (see replicate)
+# ==============
+
+
+COLUMNS = {
+    "agent": np.int64,
+    "batch": np.uint32,
+    "age": np.float64,
+    "sex": np.uint8,
+    "ptype": np.uint8,
+    "satisfaction": np.float64,
+    "rested": np.float64,
+    "rest_init": np.float64,
+    "infection": np.int32,
+    "is_alive": np.bool_,
+    "consumption_ratio": np.float64,
+    "work_ability": np.float64,
+    "work_intolerance": np.float64,
+    "food": np.float64,
+    "water": np.float64,
+    "shelter": np.float64,
+    "clothing": np.float64
+}
+
+SEX_CODES = ("M", "F")
+
+TOTALS = ("alive", "satisfaction", "infected", "food", "water", "shelter", "clothing")
+# running aggregates over the living, kept per population copy
+
+
+def copy_rank(batch):
+    """
+    Numbers rows within their population copy, in order.
+
+    :param batch: population copy of each row
+    :type batch: numpy.ndarray
+    :return: position of each row among the rows of its copy
+    :rtype: numpy.ndarray
+    """
+
+    order = np.argsort(batch, kind="stable")
+    rank = np.empty(len(batch), dtype=np.int64)
+    rank[order] = np.arange(len(batch)) - np.searchsorted(batch[order], batch[order])
+
+    return rank
+
+
+class PopulationState:
+
+    def __init__(self, capacity=0, seed=None, storage=None):
+        """
+        PopulationState constructor.
+
+        :param capacity: number of rows to preallocate
+        :param seed: seed of the state's random number service
+        :param storage: directory of memory-mapped column files (None keeps the columns in memory)
+        :type capacity: int
+        :type seed: int
+        :type storage: str
+        """
+
+        self.size = 0
+        self.capacity = capacity
+        self.batches = 1
+        self.agents = np.zeros(self.batches, dtype=np.int64)
+        # next agent id of each population copy
+
+        self.totals = {name: np.zeros(self.batches) for name in TOTALS}
+        # updated from deltas wherever person state changes (see update_totals)
+
+        self.rng = RNGService(seed)
+        self.tick = 0
+
+        self.storage = ColumnStore(storage) if storage is not None else None
+
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, self.__allocate(name, dtype, capacity))
+            # allocates one contiguous column per attribute
+
+
+    def __allocate(self, name, dtype, capacity):
+        """
+        Allocates a zeroed column, in memory or as a memory-mapped file.
+
+        :param name: column name
+        :param dtype: column dtype
+        :param capacity: number of rows
+        :type name: str
+        :type dtype: numpy.dtype
+        :type capacity: int
+        :return: column
+        :rtype: numpy.ndarray
+        """
+
+        if self.storage is not None:
+            return self.storage.allocate(name, dtype, capacity)
+
+        return np.zeros(capacity, dtype=dtype)
+
+
+# =============
+# ROW CREATION
+# =============
+
+
+    def reserve(self, capacity):
+        """
+        Grows every column so that at least 'capacity' rows are available.
+        Capacity is at least doubled so repeated growth is amortized.
+
+        :param capacity: minimum number of rows required
+        :type capacity: int
+        """
+
+        if capacity <= self.capacity:
+            return
+
+        capacity = max(capacity, 2 * self.capacity)
+
+        for name in COLUMNS:
+            old = getattr(self, name)
+
+            if self.storage is not None:
+                setattr(self, name, self.storage.allocate(name, old.dtype, capacity))
+                continue
+                # column files grow in place
+
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+        self.capacity = capacity
+
+
+    def add(self, count=1, free=None, batch=0):
+        """
+        Adds new rows to the state, reusing free rows first and appending the rest.
+        Rows are not reset; callers initialize every column of the rows they get.
+
+        :param count: number of rows to add
+        :param free: free rows (e.g. of archived dead people) that may be reused
+        :param batch: population copies the new rows belong to (scalar or one per row)
+        :type count: int
+        :type free: numpy.ndarray
+        :type batch: int or numpy.ndarray
+        :return: indices of the new rows
+        :rtype: numpy.ndarray
+        """
+
+        reused = np.empty(0, dtype=np.int64) if free is None else np.asarray(free[:count], dtype=np.int64)
+        appended = count - len(reused)
+
+        self.reserve(self.size + appended)
+        # capacity doubles, so a run with many births reallocates rarely
+
+        rows = np.concatenate((reused, np.arange(self.size, self.size + appended)))
+        self.size += appended
+
+        batch = np.broadcast_to(np.asarray(batch, dtype=np.int64), (count,))
+
+        self.agent[rows] = self.agents[batch] + copy_rank(batch)
+        self.agents += np.bincount(batch, minlength=self.batches)
+        # new people get the next agent ids of their copy, even in reused rows, so each copy numbers its people like an independent population
+
+        return rows
+
+
+    def replicate(self, count):
+        """
+        Builds a state holding 'count' independent copies of this state, one contiguous block per copy.
+        Rows keep their agent id in every copy, and the batch column records which copy a row belongs to.
+
+        :param count: number of copies
+        :type count: int
+        :return: replicated state (always in memory)
+        :rtype: PopulationState
+        """
+
+        state = PopulationState(self.size * count)
+
+        for name in COLUMNS:
+            setattr(state, name, np.tile(self.column(name), count))
+
+        state.batch[:] = np.repeat(np.arange(count, dtype=np.uint32), self.size)
+        state.size = state.capacity = self.size * count
+        state.agents = np.tile(self.agents, count)
+        state.batches = count
+        state.rng = self.rng
+        state.tick = self.tick
+        state.totals = {name: np.tile(total, count) for name, total in self.totals.items()}
+
+        return state
+
+
+# ==========
+# AGGREGATES
+# ==========
+
+
+    def row_totals(self, rows):
+        """
+        Sums the aggregate contributions of the living people among 'rows', per population copy.
+
+        :param rows: state rows
+        :type rows: numpy.ndarray
+        :return: aggregate name -> per-copy sums
+        :rtype: dict
+        """
+
+        rows = rows[self.is_alive[rows]]
+        batch = self.batch[rows]
+
+        sums = {"alive": np.bincount(batch, minlength=self.batches).astype(np.float64)}
+        sums["infected"] = np.bincount(batch, weights=self.infection[rows] != -1, minlength=self.batches)
+
+        for name in ("satisfaction", "food", "water", "shelter", "clothing"):
+            sums[name] = np.bincount(batch, weights=getattr(self, name)[rows], minlength=self.batches)
+
+        return sums
+
+
+    def update_totals(self, before, after):
+        """
+        Applies the change between two row_totals results of the same rows to the running aggregates.
+
+        :param before: aggregate contributions before the change
+        :param after: aggregate contributions after the change
+        :type before: dict
+        :type after: dict
+        """
+
+        for name, total in self.totals.items():
+            total += after[name] - before[name]
+
+
+    def recompute_totals(self):
+        """
+        Computes the aggregates with a full pass over every row.
+
+        :return: aggregate name -> per-copy totals
+        :rtype: dict
+        """
+
+        return self.row_totals(np.arange(self.size))
+
+
+    def verify_totals(self, rtol=1e-6):
+        """
+        Cross-checks the running aggregates against a full recompute (debug mode).
+
+        :param rtol: tolerated relative difference (running sums accumulate rounding error)
+        :type rtol: float
+        """
+
+        for name, expected in self.recompute_totals().items():
+            scale = max(1.0, np.abs(expected).max(initial=0.0))
+
+            if not np.allclose(self.totals[name], expected, rtol=rtol, atol=rtol * scale):
+                raise RuntimeError("PopulationState aggregate '{}' is {} but a full recompute gives {}".format(name, self.totals[name], expected))
+
+
+# ===========
+# CHECKPOINTS
+# ===========
+
+
+    def snapshot(self):
+        """
+        Gathers everything needed to rebuild the state (see restore).
+
+        :return: array name -> array, and JSON-serializable metadata
+        :rtype: tuple
+        """
+
+        arrays = {"column." + name: self.column(name) for name in COLUMNS}
+        arrays.update({"total." + name: total for name, total in self.totals.items()})
+
+        meta = {
+            "size": self.size,
+            "agents": self.agents.tolist(),
+            "batches": self.batches,
+            "tick": self.tick,
+            "entropy": self.rng.seed_sequence.entropy
+        }
+
+        return arrays, meta
+
+
+    @classmethod
+    def restore(cls, arrays, meta, storage=None):
+        """
+        Rebuilds a state from a snapshot; in memory, the columns use the given arrays directly (e.g. memory-mapped ones).
+
+        :param arrays: array name -> array (see snapshot)
+        :param meta: snapshot metadata
+        :param storage: directory of memory-mapped column files the columns are copied into (None keeps the given arrays)
+        :type arrays: dict
+        :type meta: dict
+        :type storage: str
+        :return: restored state
+        :rtype: PopulationState
+        """
+
+        state = cls(0, meta["entropy"], storage)
+        # the same entropy rebuilds the same random number service key
+
+        for name in COLUMNS:
+            column = arrays["column." + name]
+            setattr(state, name, column if storage is None else state.storage.load(name, column))
+
+        state.size = state.capacity = meta["size"]
+        state.agents = np.array(meta["agents"], dtype=np.int64)
+        state.batches = meta["batches"]
+        state.tick = meta["tick"]
+        state.totals = {name: np.array(arrays["total." + name]) for name in TOTALS}
+
+        return state
+
+
+# =============
+# RANDOM DRAWS
+# =============
+
+
+    def uniform(self, purpose, rows):
+        """
+        Draws this tick's uniform values for a set of rows (keyed by their agent ids).
+
+        :param purpose: purpose name (see rng.PURPOSES)
+        :param rows: state rows
+        :type purpose: str
+        :type rows: numpy.ndarray
+        :return: one value per row
+        :rtype: numpy.ndarray
+        """
+
+        return self.rng.uniform(self.tick, purpose, self.agent[rows])
+
+
+    def draw(self, purpose, row):
+        """
+        Draws this tick's uniform value for a single row (the value uniform gives the same row).
+
+        :param purpose: purpose name (see rng.PURPOSES)
+        :param row: state row
+        :type purpose: str
+        :type row: int
+        :return: uniform value
+        :rtype: float
+        """
+
+        return self.rng.draw(self.tick, purpose, self.agent[row])
+
+
+# ===========
+# OUT-OF-CORE
+# ===========
+
+
+    def flush(self):
+        """
+        Writes the memory-mapped columns' changes back to their files (no-op for in-memory columns).
+        """
+
+        if self.storage is None:
+            return
+
+        for name in COLUMNS:
+            getattr(self, name).flush()
+
+
+    def close(self):
+        """
+        Flushes and closes the column files of an out-of-core state.
+        """
+
+        if self.storage is not None:
+            self.flush()
+            self.storage.close()
+
+
+# ============
+# ROW ACCESS
+# ============
+
+
+    def column(self, name):
+        """
+        Returns the live (in-use) part of a column.
+
+        :param name: column name
+        :type name: str
+        :return: column view
+        :rtype: numpy.ndarray
+        """
+
+        return getattr(self, name)[:self.size]
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __getitem__(self, row):
+        from .person import Person
+
+        if row < 0:
+            row += self.size
+
+        if not 0 <= row < self.size:
+            raise IndexError("PopulationState row out of range")
+
+        return Person.view(self, row)
+
+
+    def __iter__(self):
+        from .person import Person
+
+        for row in range(self.size):
+            yield Person.view(self, row)
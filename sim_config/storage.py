@@ -0,0 +1,118 @@
+"""
+Out-of-core column storage.
+Each column of an out-of-core PopulationState is a memory-mapped file in a storage directory, so a population can be larger than RAM: the OS keeps only recently used pages resident.
+Out-of-core populations are processed in chunks of ascending rows, so column files are read and written sequentially, and the chunks ahead are prefetched with read-ahead hints.
+"""
+
+
+import os
+import numpy as np
+# module imports
+
+
+CHUNK_SIZE = 1 << 20
+# rows processed per chunk (about 100 MB of columns)
+
+PREFETCH = 1
+# chunks read ahead of the one being processed
+
+
+class ColumnStore:
+
+    def __init__(self, path):
+        """
+        ColumnStore constructor.
+
+        :param path: directory holding the column files (created if needed; existing column files are overwritten)
+        :type path: str
+        """
+
+        os.makedirs(path, exist_ok=True)
+
+        self.path = path
+        self.files = {}
+        # column name -> (file descriptor, item size)
+
+
+    def allocate(self, name, dtype, capacity):
+        """
+        Maps a column file with room for 'capacity' rows.
+        Allocating an existing column again grows (or keeps) its file without moving its data.
+
+        :param name: column name
+        :param dtype: column dtype
+        :param capacity: number of rows
+        :type name: str
+        :type dtype: numpy.dtype
+        :type capacity: int
+        :return: memory-mapped column
+        :rtype: numpy.memmap
+        """
+
+        dtype = np.dtype(dtype)
+        file = os.path.join(self.path, name + ".col")
+
+        if name not in self.files:
+            self.files[name] = (os.open(file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644), dtype.itemsize)
+
+        fd = self.files[name][0]
+        nbytes = max(capacity, 1) * dtype.itemsize
+
+        if os.fstat(fd).st_size < nbytes:
+            os.ftruncate(fd, nbytes)
+            # new rows read as zeros
+
+        return np.memmap(file, dtype=dtype, mode="r+", shape=(capacity,))
+
+
+    def load(self, name, source, chunk_size=CHUNK_SIZE):
+        """
+        Maps a column file holding a copy of 'source', copied one chunk at a time (so a memory-mapped source is never loaded whole).
+
+        :param name: column name
+        :param source: values of the column
+        :param chunk_size: rows copied at a time
+        :type name: str
+        :type source: numpy.ndarray
+        :type chunk_size: int
+        :return: memory-mapped column
+        :rtype: numpy.memmap
+        """
+
+        column = self.allocate(name, source.dtype, len(source))
+
+        for start in range(0, len(source), chunk_size):
+            column[start:start + chunk_size] = source[start:start + chunk_size]
+
+        return column
+
+
+    def prefetch(self, start, stop, names=None):
+        """
+        Asks the OS to start reading rows [start, stop) of some columns in the background.
+
+        :param start: first row
+        :param stop: row after the last one
+        :param names: columns to read (None reads every column)
+        :type start: int
+        :type stop: int
+        :type names: iterable of str
+        """
+
+        if stop <= start or not hasattr(os, "posix_fadvise"):
+            return
+            # read-ahead hints are only a speed-up, so platforms without them just read on demand
+
+        for fd, itemsize in (self.files[name] for name in (self.files if names is None else names)):
+            os.posix_fadvise(fd, start * itemsize, (stop - start) * itemsize, os.POSIX_FADV_WILLNEED)
+
+
+    def close(self):
+        """
+        Closes the column files (the memory-mapped columns stay usable until they are released).
+        """
+
+        for fd, _ in self.files.values():
+            os.close(fd)
+
+        self.files = {}
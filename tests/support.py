@@ -0,0 +1,57 @@
+"""
+Workloads and assertions shared by the tests.
+"""
+
+
+import numpy as np
+from sim_config.population import TYPE_COUNT
+from sim_config.state import COLUMNS
+from sim_config.ledger import RESOURCES
+# module imports
+
+
+TYPED_SCHEMA = np.random.default_rng(0).uniform(0, 1, (TYPE_COUNT, 4, 2)) * [1.0, 0.1]
+# per-type [consumption, production] pairs with light work, which tires people without killing them all
+
+BATCHED_SCHEMA = np.tile([[1.0, 0.05]], (2, TYPE_COUNT, 4, 1))
+# two copies of a population following the same per-type schema
+
+ACTION_CHANCES = {"kill": 0.01, "sex": 0.3, "steal_per": 0.1, "donate_pop": 0.1}
+
+
+def steady(population):
+    """
+    Makes a population's people young and gives them resource stocks, so that most of them survive the first time periods.
+
+    :param population: newly built population
+    :type population: Population
+    :return: the population
+    :rtype: Population
+    """
+
+    state = population.state
+    rows = len(state)
+    state.age[:rows] = 1.0
+
+    for name in RESOURCES:
+        getattr(state, name)[:rows] = 50.0
+
+    state.totals.update(state.recompute_totals())
+
+    return population
+
+
+def assert_same_people(first, second):
+    """
+    Checks that two populations hold the same people in the same state.
+
+    :param first: population
+    :param second: population
+    :type first: Population
+    :type second: Population
+    """
+
+    assert np.array_equal(first.alive_rows, second.alive_rows)
+
+    for name in COLUMNS:
+        assert np.array_equal(first.state.column(name), second.state.column(name)), name
@@ -0,0 +1,106 @@
+"""
+Compiled decision trees against a recursive walk of the linked Node tree they were compiled from.
+"""
+
+
+import numpy as np
+import pytest
+from sim_config.optimization.DT import DT, Node
+# module imports
+
+
+def walk(node, row):
+    """
+    Evaluates a linked tree for one row by following Node pointers (the reference the compiled tree must match).
+
+    :param node: root node
+    :param row: feature values
+    :type node: Node
+    :type row: numpy.ndarray
+    :return: output values
+    :rtype: numpy.ndarray
+    """
+
+    if node.left is None or node.right is None:
+        return np.atleast_1d(np.asarray(node.value, dtype=np.float64))
+
+    if row[node.feature] <= node.threshold:
+        weight, child = node.left_weight, node.left
+    else:
+        weight, child = node.right_weight, node.right
+
+    return (1.0 if weight is None else weight) * walk(child, row)
+
+
+def random_tree(rng, depth, features, outputs, weighted):
+    """
+    Builds a random linked tree whose branches stop at random depths (below the first few levels).
+
+    :param rng: random generator
+    :param depth: maximum depth
+    :param features: number of features
+    :param outputs: number of outputs of each leaf
+    :param weighted: whether edges carry random weights
+    :type rng: numpy.random.Generator
+    :type depth: int
+    :type features: int
+    :type outputs: int
+    :type weighted: bool
+    :return: root node
+    :rtype: Node
+    """
+
+    if depth == 0 or (depth < 4 and rng.random() < 0.3):
+        return Node(value=rng.normal(size=outputs).tolist())
+
+    node = Node(feature=int(rng.integers(features)), threshold=float(rng.normal()))
+    node.left = random_tree(rng, depth - 1, features, outputs, weighted)
+    node.right = random_tree(rng, depth - 1, features, outputs, weighted)
+
+    if weighted:
+        node.left_weight, node.right_weight = rng.uniform(0.5, 2.0, 2)
+
+    return node
+
+
+@pytest.mark.parametrize("outputs, weighted", [(1, False), (3, False), (3, True)])
+def test_compiled_tree_matches_linked_tree(outputs, weighted):
+    """
+    The flat-array tree predicts exactly what walking the linked tree gives, with or without edge weights.
+    """
+
+    rng = np.random.default_rng(outputs + weighted)
+    root = random_tree(rng, 6, 4, outputs, weighted)
+    X = rng.normal(size=(2000, 4))
+
+    tree = DT.compile(root)
+    expected = np.array([walk(root, row) for row in X])
+
+    assert 1 < tree.depth <= 6
+    assert np.allclose(tree.predict(X), expected, rtol=1e-12, atol=0.0)
+    assert np.array_equal(tree.decide(X), np.argmax(expected, axis=1))
+
+
+def test_single_leaf_tree():
+    """
+    A tree that is just a leaf has depth 0 and gives its value for every row.
+    """
+
+    tree = DT.compile(Node(value=[1.0, 2.0]))
+    X = np.random.default_rng(0).normal(size=(10, 3))
+
+    assert len(tree) == 1 and tree.depth == 0
+    assert np.array_equal(tree.apply(X), np.zeros(10))
+    assert np.array_equal(tree.predict(X), np.tile([1.0, 2.0], (10, 1)))
+
+
+def test_threshold_ties_go_left():
+    """
+    Rows equal to a split threshold go to the left child, like the linked tree.
+    """
+
+    root = Node(feature=0, threshold=1.0)
+    root.left, root.right = Node(value=-1.0), Node(value=1.0)
+    root.left_weight = 3.0
+
+    assert np.array_equal(DT.compile(root).predict([[1.0], [1.5]]).ravel(), [-3.0, 1.0])
@@ -0,0 +1,53 @@
+"""
+Checks of the slot-reusing birth pipeline.
+"""
+
+
+import numpy as np
+from sim_config.population import Population, TYPE_COUNT
+from .support import ACTION_CHANCES, steady
+# module imports
+
+
+SCHEMAS = np.stack([np.tile([[1.0, 0.05]], (TYPE_COUNT, 4, 1)), np.tile([[0.8, 0.02]], (TYPE_COUNT, 4, 1))])
+# per-type schemas of two population copies
+
+
+def test_batched_births_match_independent_runs():
+    """
+    Children of a batched population (with contacts and actions) only reuse rows of their own copy, so each copy evolves exactly like an independent population.
+    """
+
+    options = {"typed": True, "seed": 3, "contacts": True, "actions": ACTION_CHANCES}
+    batched = steady(Population(1500, schema=SCHEMAS, **options))
+    independent = [steady(Population(1500, schema=schema, **options)) for schema in SCHEMAS]
+    births = 0
+
+    for _ in range(6):
+        batched.run()
+        births += batched.births
+
+        for population in independent:
+            population.run()
+
+    assert births > 0
+    assert np.allclose(batched.scores(), [population.scores()[0] for population in independent])
+
+    state = batched.state
+
+    for copy, population in enumerate(independent):
+        rows = batched.alive_rows[state.batch[batched.alive_rows] == copy]
+        order = np.argsort(state.agent[rows])
+        other = population.alive_rows[np.argsort(population.state.agent[population.alive_rows])]
+        # people are matched by agent id, since rows differ between layouts
+
+        assert np.array_equal(state.agent[rows][order], population.state.agent[other])
+        assert np.array_equal(state.satisfaction[rows][order], population.state.satisfaction[other])
+        assert np.array_equal(state.infection[rows][order], population.state.infection[other])
+
+    for indptr, indices, _ in batched.contacts.layers.values():
+        rows = np.arange(len(indptr) - 1)
+        src = np.repeat(rows, np.diff(indptr))
+
+        assert np.array_equal(state.batch[src], state.batch[indices])
+        # no contact links two copies
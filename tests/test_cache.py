@@ -0,0 +1,67 @@
+"""
+Fitness memoization: LRU eviction, persistence, and skipping simulations of cached candidates.
+"""
+
+
+import numpy as np
+import pytest
+from sim_config import society
+from sim_config.optimization.cache import FitnessCache
+# module imports
+
+
+def test_least_recently_used_entries_are_evicted():
+    """
+    Reading an entry makes it the most recently used, so the entry evicted past 'maxsize' is the one untouched longest.
+    """
+
+    cache = FitnessCache(maxsize=2)
+    cache.put(b"a" * 16, 1.0)
+    cache.put(b"b" * 16, 2.0)
+
+    assert cache.get(b"a" * 16) == 1.0
+
+    cache.put(b"c" * 16, 3.0)
+
+    assert list(cache.entries) == [b"a" * 16, b"c" * 16]
+    assert cache.get(b"b" * 16) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_save_and_load(tmp_path):
+    """
+    A saved cache reloads with the same entries in the same LRU order; a cache with another quantum ignores the file.
+    """
+
+    path = str(tmp_path / "fitness.npz")
+    cache = FitnessCache(path=path)
+    keys = [cache.key([float(gene)] * 4, (100, 5), 0) for gene in range(5)]
+
+    for index, key in enumerate(keys):
+        cache.put(key, -float(index), 0.5 * index)
+
+    cache.get(keys[0])
+    cache.save()
+
+    loaded = FitnessCache(path=path)
+
+    assert list(loaded.entries.items()) == list(cache.entries.items())
+    assert len(FitnessCache(path=path, quantum=1e-6)) == 0
+
+
+def test_cache_hits_skip_simulation(monkeypatch):
+    """
+    Candidates scored once are not simulated again: a second generation of the same genomes is answered from the cache.
+    """
+
+    evaluator = society.CandidateEvaluator(size=50, ticks=2, seed=0)
+    genomes = np.random.default_rng(0).uniform(0, 2, (3, society.GENE_COUNT))
+    fitness = evaluator(genomes)
+
+    def simulate(*args):
+        pytest.fail("a cached candidate was simulated")
+
+    monkeypatch.setattr(society, "timed_evaluate", simulate)
+
+    assert evaluator(genomes) == fitness
+    assert evaluator.cache.stats()["hits"] == 3
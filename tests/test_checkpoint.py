@@ -0,0 +1,52 @@
+"""
+Resuming simulations and GA runs from checkpoints.
+"""
+
+
+import numpy as np
+from sim_config.population import Population
+from sim_config.society import Society
+from .support import BATCHED_SCHEMA, ACTION_CHANCES, steady, assert_same_people
+# module imports
+
+
+def test_population_resume_matches_uninterrupted_run(tmp_path):
+    """
+    A population restored from a checkpoint continues exactly like the population that wrote it.
+    """
+
+    path = str(tmp_path / "population.ckpt")
+    population = steady(Population(3000, schema=BATCHED_SCHEMA, typed=True, seed=3, contacts=True, actions=ACTION_CHANCES, debug=True))
+
+    for _ in range(2):
+        population.run()
+
+    population.checkpoint(path)
+    restored = Population.restore(path)
+
+    for _ in range(3):
+        population.run()
+        restored.run()
+
+    assert population.births and population.deaths
+    assert_same_people(population, restored)
+    assert np.array_equal(population.scores(), restored.scores())
+    assert np.array_equal(population.food, restored.food)
+
+
+def test_optimization_resume_matches_uninterrupted_run(tmp_path):
+    """
+    A GA run resumed from a checkpoint finds the same best genome as one that ran without stopping.
+    """
+
+    path = str(tmp_path / "ga.ckpt")
+
+    uninterrupted = Society(size=60, ticks=1, generation_size=6, workers=1, seed=3)
+    uninterrupted.optimize(runs=4)
+
+    Society(size=60, ticks=1, generation_size=6, workers=1, seed=3).optimize(runs=2, checkpoint=path, checkpoint_every=1)
+    resumed = Society(size=60, ticks=1, generation_size=6, workers=1, seed=3)
+    resumed.optimize(runs=4, checkpoint=path)
+
+    assert resumed.genome == uninterrupted.genome
+    assert resumed.fitness == uninterrupted.fitness
@@ -0,0 +1,109 @@
+"""
+Contact graphs: CSR construction, replication over population copies, and disease transmission.
+"""
+
+
+import numpy as np
+from sim_config.contact import ContactGraph, group_members, clique_edges, to_csr, spread
+from sim_config.population import Population
+# module imports
+
+
+def neighbours(indptr, indices, row):
+    """
+    Lists a row's contacts in a CSR layer.
+
+    :param indptr: CSR row pointer array
+    :param indices: CSR column index array
+    :param row: row
+    :type indptr: numpy.ndarray
+    :type indices: numpy.ndarray
+    :type row: int
+    :return: contact rows
+    :rtype: set
+    """
+
+    return set(indices[indptr[row]:indptr[row + 1]].tolist())
+
+
+def test_csr_of_known_edges():
+    """
+    to_csr lists every row's destinations, and spread counts the edges out of a source set into every row.
+    """
+
+    indptr, indices = to_csr(np.array([2, 0, 2, 1]), np.array([0, 1, 1, 2]), 4)
+
+    assert indptr.tolist() == [0, 1, 2, 4, 4]
+    assert indices.tolist() == [1, 2, 0, 1]
+    # edges keep their input order within a row
+    assert spread(indptr, indices, np.array([0, 2]), 4).tolist() == [1, 2, 0, 0]
+
+
+def test_groups_are_cliques():
+    """
+    Groups respect their size and key, and clique edges link every pair of group members exactly once in each direction.
+    """
+
+    keys = np.array([0, 0, 0, 0, 0, 1, 1, -1, 1])
+    groups = group_members(keys, np.random.default_rng(0).random(len(keys)), 3)
+
+    assert groups[7] == -1
+    assert np.bincount(groups[groups >= 0]).max() <= 3
+    assert all(len(set(keys[groups == group])) == 1 for group in np.unique(groups[groups >= 0]))
+
+    src, dst = clique_edges(groups)
+    edges = set(zip(src.tolist(), dst.tolist()))
+
+    assert len(edges) == len(src)
+    assert not (src == dst).any()
+    assert edges == {(a, b) for a in range(9) for b in range(9) if a != b and groups[a] >= 0 and groups[a] == groups[b]}
+
+
+def test_replicated_graph_has_no_cross_copy_links():
+    """
+    Every copy of a replicated graph is the original graph shifted to the copy's rows.
+    """
+
+    graph = Population(300, seed=0, contacts=True).contacts
+    copies = graph.replicate(3)
+
+    assert copies.size == 3 * graph.size
+
+    for name, (indptr, indices, beta) in copies.layers.items():
+        original = graph.layers[name]
+
+        assert beta == original[2]
+        assert len(indices) == 3 * len(original[1])
+
+        for row in range(copies.size):
+            copy, base = divmod(row, graph.size)
+
+            assert neighbours(indptr, indices, row) == {copy * graph.size + contact for contact in neighbours(*original[:2], base)}
+
+
+def test_transmit_reaches_only_susceptible_contacts_in_the_same_copy():
+    """
+    With (nearly) certain transmission, the newly infected people are exactly the susceptible contacts of the infectious, all in the infectious people's copy.
+    """
+
+    population = Population(300, seed=0, contacts=True)
+    state = population.state.replicate(2)
+    graph = population.contacts.replicate(2)
+    graph.layers = {name: (indptr, indices, 1 - 1e-12) for name, (indptr, indices, _) in graph.layers.items()}
+    # every infectious contact transmits (up to a 1e-12 chance per contact)
+
+    state.infection[:] = -1
+    sources = np.array([0, 1, 2])
+    state.infection[sources] = 3
+    state.totals.update(state.recompute_totals())
+
+    rows = np.arange(len(state))
+    new = graph.transmit(state, rows)
+
+    expected = set().union(*(neighbours(indptr, indices, row) for indptr, indices, _ in graph.layers.values() for row in sources)) - set(sources.tolist())
+
+    assert len(expected) > 0
+    assert set(new.tolist()) == expected
+    assert (new < graph.size // 2).all()
+    assert (state.infection[new] == 0).all()
+    state.verify_totals()
@@ -0,0 +1,71 @@
+"""
+Successive-halving evaluation: rung horizons, culling, ranking, and GA runs with worker processes.
+"""
+
+
+import numpy as np
+from sim_config.optimization.halving import SuccessiveHalving
+from sim_config.society import Society
+# module imports
+
+
+def linear(spec, ticks, alive_floor, satisfaction_floor):
+    """
+    Toy simulation: a candidate (rate, lifetime) scores rate * ticks and is aborted if 'ticks' exceeds its lifetime.
+
+    :return: score, whether the simulation was aborted, and simulation seconds
+    :rtype: tuple
+    """
+
+    rate, lifetime = spec
+
+    return rate * min(ticks, lifetime), ticks > lifetime, float(ticks)
+
+
+def test_horizons():
+    """
+    Rung horizons grow by eta and end with the full horizon.
+    """
+
+    assert SuccessiveHalving(min_ticks=2, eta=3).horizons(30) == [2, 6, 18, 30]
+    assert SuccessiveHalving(min_ticks=10).horizons(5) == [5]
+
+
+def test_culling_and_ranking():
+    """
+    Only the best candidates of each rung are simulated again, from the start to the next horizon, and candidates that went further rank above those culled or aborted.
+    """
+
+    calls = []
+
+    def mapper(function, specs, *args):
+        specs = list(specs)
+        calls.append(specs)
+        return map(function, specs, *args)
+
+    specs = [(rate, 100) for rate in (1.0, 5.0, 3.0, 2.0, 4.0, 0.5)] + [(9.0, 3)]
+    fitness, complete, seconds = SuccessiveHalving(min_ticks=2, eta=2).run(specs, 8, linear, mapper)
+
+    assert calls[1] == [(9.0, 3), (5.0, 100), (4.0, 100)]
+    assert calls[2] == [(5.0, 100)]
+    # the third rung extends only the best survivor, since the (9.0, 3) candidate is aborted at the second
+    assert complete.tolist() == [False, True, False, False, False, False, False]
+    assert seconds.tolist() == [2.0, 8.0, 2.0, 2.0, 4.0, 2.0, 4.0]
+    # seconds of the last rung each candidate ran, which simulated it from the start
+
+    assert np.argsort(-fitness, kind="stable").tolist() == [1, 4, 6, 2, 3, 0, 5]
+    # full horizon first, then each earlier rung's candidates by score, aborted ones below those that were not
+
+
+def test_halving_does_not_depend_on_worker_count():
+    """
+    GA runs with successive halving give the same result in this process and with worker processes.
+    """
+
+    results = []
+
+    for workers in (1, 2):
+        society = Society(size=100, ticks=6, generation_size=8, workers=workers, seed=2, halving=SuccessiveHalving(min_ticks=2, eta=2))
+        results.append((society.optimize(runs=2), society.fitness))
+
+    assert results[0] == results[1]
@@ -0,0 +1,88 @@
+"""
+Histogram-based tree training on streamed traces with known targets.
+"""
+
+
+import numpy as np
+from sim_config.optimization.histogram import HistogramTrainer
+from sim_config.optimization.DT import LEAF
+# module imports
+
+
+def chunked(X, y, size):
+    """
+    Makes a trace chunk source (see HistogramTrainer.fit) over in-memory arrays.
+
+    :param X: feature matrix
+    :param y: targets
+    :param size: rows per chunk
+    :type X: numpy.ndarray
+    :type y: numpy.ndarray
+    :type size: int
+    :return: chunk source
+    :rtype: callable
+    """
+
+    return lambda: ((X[start:start + size], y[start:start + size]) for start in range(0, len(X), size))
+
+
+def step_trace(rows=20000, seed=0):
+    """
+    Builds a trace whose two outputs are step functions of the first two features; the third feature is constant.
+
+    :param rows: number of rows
+    :param seed: seed of the features
+    :type rows: int
+    :type seed: int
+    :return: feature matrix and targets of shape (rows, 2)
+    :rtype: tuple
+    """
+
+    X = np.random.default_rng(seed).uniform(-1, 1, (rows, 3))
+    X[:, 2] = 0.5
+    y = np.column_stack((np.where(X[:, 0] > 0.25, 2.0, -1.0), np.where(X[:, 1] > -0.5, 1.0, 0.0)))
+
+    return X, y
+
+
+def test_fit_recovers_multi_output_steps():
+    """
+    A tree trained on step targets predicts both outputs closely, only splits on features that matter, and never on a constant feature.
+    """
+
+    X, y = step_trace()
+    tree = HistogramTrainer(max_depth=3, bins=64, min_samples_leaf=20, reg_lambda=1e-3, seed=0).fit(chunked(X, y, 3000))
+
+    assert tree.value.shape[1] == 2
+    assert np.abs(tree.predict(X) - y).mean() < 0.02
+
+    split_features = set(tree.feature[tree.feature != LEAF].tolist())
+
+    assert split_features == {0, 1}
+
+
+def test_chunking_does_not_change_the_tree():
+    """
+    Training on 1 chunk or on many gives the same predictions.
+    """
+
+    X, y = step_trace(seed=1)
+    y = y[:, 0] + X[:, 1]
+    # a single smooth-plus-step output
+
+    trees = [HistogramTrainer(max_depth=4, seed=0).fit(chunked(X, y, size)) for size in (len(X), 777)]
+
+    assert np.allclose(trees[0].predict(X), trees[1].predict(X))
+
+
+def test_constant_features_give_the_mean():
+    """
+    With only constant features there is nothing to split on, so the tree is a single leaf predicting the mean target.
+    """
+
+    X = np.ones((500, 2))
+    y = np.random.default_rng(2).normal(size=500)
+    tree = HistogramTrainer(seed=0).fit(chunked(X, y, 128))
+
+    assert len(tree) == 1
+    assert np.allclose(tree.predict(X[:3]), y.mean())
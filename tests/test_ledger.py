@@ -0,0 +1,45 @@
+"""
+Transaction ledger settlement.
+"""
+
+
+import numpy as np
+from sim_config.population import Population
+from sim_config.ledger import Ledger, RESOURCES, pool_account
+# module imports
+
+
+def test_ledger_conserves_resources():
+    """
+    Settling random transfers between people and community pools neither creates nor destroys any resource, and never overdraws a balance.
+    """
+
+    population = Population(1000, seed=0)
+    state = population.state
+    rng = np.random.default_rng(0)
+    rows = len(state)
+
+    for name in RESOURCES:
+        getattr(state, name)[:rows] = rng.uniform(0, 10, rows)
+
+    state.totals.update(state.recompute_totals())
+
+    pools = {name: rng.uniform(0, 10, 1) for name in RESOURCES}
+    before = {name: state.column(name).sum() + pools[name].sum() for name in RESOURCES}
+
+    accounts = np.concatenate((np.arange(rows), [pool_account(0)]))
+    count = 5000
+    ledger = Ledger(audit=True)
+    ledger.record(rng.choice(accounts, count), rng.choice(accounts, count), rng.integers(0, len(RESOURCES), count), rng.uniform(0, 5, count))
+    settled = ledger.apply(state, pools)
+
+    assert len(settled) == count
+    assert ledger.log[-1]["capped"] > 0
+    # some accounts were asked for more than they held
+
+    for name in RESOURCES:
+        assert np.isclose(state.column(name).sum() + pools[name].sum(), before[name])
+        assert state.column(name).min() >= -1e-9
+        assert pools[name].min() >= -1e-9
+
+    state.verify_totals()
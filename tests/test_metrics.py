@@ -0,0 +1,81 @@
+"""
+Per-tick metrics streaming: writer round trips, dropped records, and the metrics of a sim.py run.
+"""
+
+
+import json
+import numpy as np
+import sim
+from sim_config.metrics import MetricsWriter, METRICS_DTYPE, read_metrics
+# module imports
+
+
+def records(count):
+    """
+    Builds distinct metrics records.
+
+    :param count: number of records
+    :type count: int
+    :return: records
+    :rtype: numpy.ndarray
+    """
+
+    values = np.zeros(count, dtype=METRICS_DTYPE)
+    values["tick"] = np.arange(count)
+    values["satisfaction_mean"] = np.linspace(0, 1, count)
+
+    return values
+
+
+def test_writer_round_trip(tmp_path):
+    """
+    Every appended record is read back in order, across several chunk files, and a reopened writer continues the chunk numbering.
+    """
+
+    path = str(tmp_path / "metrics")
+    expected = records(250)
+
+    with MetricsWriter(path, capacity=128, chunk=16) as writer:
+        for record in expected[:100]:
+            writer.append(record)
+
+    with MetricsWriter(path, capacity=256, chunk=64) as writer:
+        for record in expected[100:]:
+            writer.append(record)
+
+    assert writer.dropped == 0
+    assert np.array_equal(read_metrics(path), expected)
+
+
+def test_writer_counts_dropped_records(tmp_path):
+    """
+    Records appended while the ring buffer is full are dropped and counted, and the buffered ones are still written.
+    """
+
+    path = str(tmp_path / "metrics")
+    expected = records(10)
+
+    with MetricsWriter(path, capacity=4, chunk=8) as writer:
+        for record in expected:
+            writer.append(record)
+            # a chunk larger than the buffer never wakes the writer thread, so the buffer fills up
+
+    assert writer.dropped == 6
+    assert np.array_equal(read_metrics(path), expected[:4])
+
+
+def test_sim_reports_metrics(tmp_path):
+    """
+    sim.py streams one record per tick and reports the dropped record count in its summary.
+    """
+
+    path = str(tmp_path / "metrics")
+    output = tmp_path / "summary.json"
+
+    assert sim.main(["--size", "200", "--ticks", "3", "--metrics", path, "--output", str(output)]) == 0
+
+    with open(output) as file:
+        summary = json.load(file)
+
+    assert summary["dropped"] == 0
+    assert read_metrics(path)["tick"].tolist() == [1, 2, 3]
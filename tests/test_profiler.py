@@ -0,0 +1,120 @@
+"""
+Per-phase profiling hooks: wrapping and restoring the timed functions, and counting their calls.
+"""
+
+
+from sim_config.profiler import Profiler, TARGETS
+from sim_config.population import Population
+# module imports
+
+
+class Counter:
+
+    def __init__(self):
+        """
+        Counter constructor (a class with a method and a static method to profile).
+        """
+
+        self.count = 0
+
+
+    def step(self):
+        """
+        Increments the counter.
+        """
+
+        self.count += 1
+
+
+    @staticmethod
+    def double(value):
+        """
+        Doubles a value.
+        """
+
+        return 2 * value
+
+
+COUNTER_TARGETS = ((Counter, "step", "counter.step"), (Counter, "double", "counter.double"))
+# timed functions of the test class
+
+
+def test_enable_and_disable_restore_the_original_functions():
+    """
+    Enabling wraps every target (once, even if enabled twice); disabling puts back the very same function objects.
+    """
+
+    originals = [vars(owner)[attribute] for owner, attribute, _ in TARGETS]
+    profiler = Profiler()
+
+    try:
+        profiler.enable()
+        profiler.enable()
+        wrapped = [vars(owner)[attribute] for owner, attribute, _ in TARGETS]
+
+        assert all(current is not original for current, original in zip(wrapped, originals))
+    finally:
+        profiler.disable()
+
+    assert all(vars(owner)[attribute] is original for (owner, attribute, _), original in zip(TARGETS, originals))
+    assert not profiler.enabled
+
+
+def test_summary_counts_calls():
+    """
+    The summary counts every call of a wrapped method or static method, and only while the profiler is enabled.
+    """
+
+    profiler = Profiler(COUNTER_TARGETS)
+    counter = Counter()
+
+    try:
+        profiler.enable()
+
+        for _ in range(5):
+            counter.step()
+
+        assert Counter.double(4) == 8
+    finally:
+        profiler.disable()
+
+    counter.step()
+    summary = profiler.summary()
+
+    assert counter.count == 6
+    assert summary["counter.step"]["calls"] == 5 and summary["counter.double"]["calls"] == 1
+    assert summary["counter.step"]["seconds"] >= 0
+
+    profiler.reset()
+
+    assert profiler.summary() == {}
+
+
+def test_simulation_phases_are_counted():
+    """
+    Profiling a simulation counts one population and kernel tick per time period, and the per-tick breakdowns add up to the totals.
+    """
+
+    profiler = Profiler()
+    population = Population(200, seed=0)
+    records = []
+
+    try:
+        profiler.enable()
+
+        for _ in range(2):
+            population.run()
+            records.append(profiler.collect(population.state.tick))
+    finally:
+        profiler.disable()
+
+    summary = profiler.summary()
+
+    assert summary["population.run"]["calls"] == 2
+    assert summary["kernel.tick"]["calls"] == 2
+    assert "person.run" not in summary
+    # the vectorized path never runs Person objects
+
+    index = profiler.labels.index("kernel.tick")
+
+    assert [record[2 + 2 * index] for record in records] == [1, 1]
@@ -0,0 +1,38 @@
+"""
+Checks that the work of a time period follows the number of people alive rather than the population's size.
+"""
+
+
+from sim_config import kernel
+from sim_config.population import Population
+# module imports
+
+
+SIZE = 50000
+
+
+def test_tick_processes_only_the_living(monkeypatch):
+    """
+    Each time period hands the tick kernel exactly as many rows as people alive at its start, so the work shrinks with the population.
+    """
+
+    processed = []
+    tick = kernel.tick
+
+    def counted_tick(state, rows, schema):
+        processed.append(len(rows))
+        return tick(state, rows, schema)
+
+    monkeypatch.setattr(kernel, "tick", counted_tick)
+
+    population = Population(SIZE, seed=0)
+    alive = []
+
+    for _ in range(3):
+        alive.append(int(population.state.totals["alive"].sum()))
+        population.run()
+
+    assert processed == alive
+    assert processed[0] == SIZE
+    assert processed[2] < SIZE // 20
+    # the default schema kills off most people in the first time periods, and the dead are never processed again
@@ -0,0 +1,74 @@
+"""
+GA parent selection schemes.
+"""
+
+
+import warnings
+import numpy as np
+import pytest
+from sim_config.optimization.selection import SELECTIONS, tournament, proportional, rank
+# module imports
+
+
+@pytest.mark.parametrize("name", sorted(SELECTIONS))
+@pytest.mark.parametrize("count", [0, 1, 7, 40])
+def test_schemes_return_pool_indices(name, count):
+    """
+    Every scheme returns 'count' valid pool indices, including 0 indices without warnings.
+    """
+
+    fitness = np.random.default_rng(0).normal(size=10)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        selected = SELECTIONS[name](fitness, count, np.random.default_rng(1))
+
+    assert selected.shape == (count,)
+    assert np.issubdtype(selected.dtype, np.integer)
+    assert ((selected >= 0) & (selected < len(fitness))).all()
+
+
+def test_proportional_matches_expected_counts():
+    """
+    Stochastic universal sampling gives every candidate exactly its expected number of parents when those are whole numbers; the least fit candidate has zero weight.
+    """
+
+    selected = proportional(np.array([-1.0, 0.0, 0.0, 1.0]), 8, np.random.default_rng(2))
+
+    assert np.bincount(selected, minlength=4).tolist() == [0, 2, 2, 4]
+
+
+def test_proportional_never_selects_infinitely_unfit():
+    """
+    Candidates with -inf fitness are never selected, unless every candidate has it.
+    """
+
+    fitness = np.array([-np.inf, 2.0, -np.inf, 3.0, 1.0])
+    selected = proportional(fitness, 1000, np.random.default_rng(3))
+
+    assert not np.isin(selected, [0, 2]).any()
+    assert len(np.unique(proportional(np.full(4, -np.inf), 1000, np.random.default_rng(3)))) == 4
+
+
+def test_rank_weights():
+    """
+    Rank selection weights candidates by rank (1 for the least fit to n for the fittest), whatever their fitness values.
+    """
+
+    fitness = np.array([10.0, -5.0, 1e6, 0.0])
+    selected = rank(fitness, 10, np.random.default_rng(4))
+
+    assert np.bincount(selected, minlength=4).tolist() == [3, 1, 4, 2]
+
+
+def test_tournament_favours_the_fittest():
+    """
+    The fittest candidate wins every tournament it enters, and the least fit wins only tournaments it fills alone.
+    """
+
+    fitness = np.arange(6, dtype=np.float64)
+    selected = tournament(fitness, 3000, np.random.default_rng(5))
+    counts = np.bincount(selected, minlength=6)
+
+    assert counts[5] > counts[4] > counts[3] > counts[0]
+    assert counts[0] < 3000 / 6 ** 3 * 2
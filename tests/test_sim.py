@@ -0,0 +1,70 @@
+"""
+Command-line runs of sim.py: runs that simulate no time period, and the JSON summary.
+"""
+
+
+import json
+import pytest
+import sim
+# module imports
+
+
+def run(tmp_path, *args):
+    """
+    Runs sim.py with an output file and returns its exit status and summary.
+
+    :param tmp_path: directory of the output file
+    :param args: further command line arguments
+    :type tmp_path: pathlib.Path
+    :type args: str
+    :return: exit status and summary
+    :rtype: tuple
+    """
+
+    output = tmp_path / "summary.json"
+    status = sim.main(["--size", "200", "--runs", "0", "--output", str(output)] + list(args))
+
+    with open(output) as file:
+        return status, json.load(file)
+
+
+def test_zero_ticks(tmp_path):
+    """
+    A run of 0 time periods reports the untouched initial population.
+    """
+
+    status, summary = run(tmp_path, "--ticks", "0")
+
+    assert status == 0
+    assert summary["ran"] == 0
+    assert summary["alive"] == 200
+
+
+def test_resume_past_requested_ticks(tmp_path):
+    """
+    Resuming from a checkpoint that is already at or past the requested time periods runs nothing and still reports.
+    """
+
+    checkpoint = str(tmp_path / "checkpoint")
+
+    assert run(tmp_path, "--ticks", "2", "--checkpoint", checkpoint)[0] == 0
+
+    status, summary = run(tmp_path, "--ticks", "1", "--checkpoint", checkpoint)
+
+    assert status == 0
+    assert summary["ran"] == 0
+
+
+def test_extinct_fitness_is_valid_json(tmp_path):
+    """
+    A best candidate whose population went extinct (fitness -inf) is reported as null, keeping the summary strict JSON.
+    """
+
+    output = tmp_path / "summary.json"
+
+    assert sim.main(["--size", "20", "--runs", "1", "--ticks", "0", "--output", str(output)]) == 0
+
+    with open(output) as file:
+        summary = json.load(file, parse_constant=lambda constant: pytest.fail("non-standard JSON constant " + constant))
+
+    assert summary["fitness"] is None
@@ -0,0 +1,37 @@
+"""
+Society-level scoring and optimization results.
+"""
+
+
+import pytest
+from sim_config.population import Population, EXTINCT_SCORE
+from sim_config.society import Society, score
+# module imports
+
+
+def test_optimize_requires_a_generation():
+    """
+    Optimizing without running a generation is rejected instead of building a population from no genome.
+    """
+
+    society = Society(size=50, ticks=1, generation_size=4, workers=1)
+
+    with pytest.raises(ValueError):
+        society.optimize(runs=0)
+
+    assert society.population is None
+
+
+def test_extinct_copies_score_below_every_survivor():
+    """
+    A population copy with no one alive scores EXTINCT_SCORE, both from Population.scores and from the GA's scoring.
+    """
+
+    population = Population(200, seed=0)
+
+    for _ in range(6):
+        population.run()
+
+    assert population.state.totals["alive"].sum() == 0
+    assert population.scores()[0] == EXTINCT_SCORE
+    assert score(population) == EXTINCT_SCORE
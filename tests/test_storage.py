@@ -0,0 +1,48 @@
+"""
+Out-of-core (memory-mapped) populations.
+"""
+
+
+import numpy as np
+from sim_config.population import Population
+from sim_config.metrics import collect
+from .support import steady, assert_same_people
+# module imports
+
+
+def test_storage_mode_matches_memory_mode(tmp_path):
+    """
+    An out-of-core population, ticked in chunks and resumed from a checkpoint, matches the same population run in memory.
+    """
+
+    schema = [[0.5, 0.0]] * 4
+    memory = steady(Population(5000, schema=schema, seed=4))
+    storage = steady(Population(5000, schema=schema, seed=4, storage=str(tmp_path / "columns"), chunk_size=777, prefetch=2))
+
+    for _ in range(3):
+        memory.run()
+        storage.run()
+
+    path = str(tmp_path / "population.ckpt")
+    storage.checkpoint(path)
+    storage.close()
+    storage = Population.restore(path)
+
+    assert storage.storage is not None and isinstance(storage.state.age, np.memmap)
+    # restored populations stay out-of-core
+
+    for _ in range(3):
+        memory.run()
+        storage.run()
+
+    assert_same_people(memory, storage)
+
+    memory_record, storage_record = collect(memory), collect(storage)
+
+    assert memory_record[1] > 0
+    assert memory_record[3:6] == storage_record[3:6]
+    # satisfaction percentiles, computed chunk by chunk out-of-core, are exact
+    assert np.allclose(memory_record[2:], storage_record[2:])
+    # running aggregates are summed in a different order
+
+    storage.close()